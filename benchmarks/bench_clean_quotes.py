@@ -0,0 +1,94 @@
+"""
+Benchmark de la limpieza de comillas: clean_quotes de la versión original
+(diccionario de reemplazos + expresión regular) frente al clean_quotes actual
+(ver src/extraction.py).
+
+Repite los títulos y resúmenes sin limpiar de la página de ejemplo de
+tests/fixtures hasta --rows filas (100.000 por defecto), limpia título y
+resumen de cada fila como lo hace el parseo y reporta el mejor tiempo de
+--repeat rondas, verificando que ambas versiones den el mismo resultado.
+
+Uso:
+    python benchmarks/bench_clean_quotes.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parsers import load_page  # noqa: E402
+from src.extraction import clean_quotes, get_parser_backend  # noqa: E402
+
+_ORIGINAL_QUOTES_MAP = {
+    '“': '', '‘': '', '’': '', '«': '', '»': '',
+    '„': '', '‚': '', '‹': '', '›': '', '"': '',
+    "'": '', '´': '', '`': '', '′': '', '″': '',
+}
+_ORIGINAL_QUOTES_PATTERN = r'["\'“”‘’«»„‚‹›′″]'
+
+
+def original_clean_quotes(text):
+    # clean_quotes de la versión original
+    if not text:
+        return text
+    cleaned_text = text
+    for quote_char, replacement in _ORIGINAL_QUOTES_MAP.items():
+        cleaned_text = cleaned_text.replace(quote_char, replacement)
+    cleaned_text = re.sub(_ORIGINAL_QUOTES_PATTERN, '', cleaned_text)
+    cleaned_text = cleaned_text.strip()
+    return ' '.join(cleaned_text.split())
+
+
+def load_texts(rows):
+    """
+    Devuelve (títulos, resúmenes) sin limpiar de la página de ejemplo,
+    repetidos hasta completar rows filas.
+    """
+    tbody = get_parser_backend('html.parser')(load_page())
+    titles, summaries = [], []
+    for row in tbody.find_all('tr'):
+        title_cell = row.find('td', class_='views-field views-field-title')
+        title_link = title_cell.find('a') if title_cell else None
+        if not title_link:
+            continue
+        summary_cell = row.find('td', class_='views-field views-field-body')
+        titles.append(title_link.get_text(strip=True))
+        summaries.append(summary_cell.get_text(strip=True) if summary_cell else None)
+    return ([titles[i % len(titles)] for i in range(rows)],
+            [summaries[i % len(summaries)] for i in range(rows)])
+
+
+def clean_rows(func, titles, summaries):
+    # Igual que extract_title_and_link y extract_summary
+    return ([func(title) for title in titles],
+            [func(summary).capitalize() if summary is not None else None for summary in summaries])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='Filas a limpiar')
+    parser.add_argument('--repeat', type=int, default=5, help='Rondas (se toma la mejor)')
+    args = parser.parse_args()
+
+    titles, summaries = load_texts(args.rows)
+    same = (clean_rows(original_clean_quotes, titles, summaries)
+            == clean_rows(clean_quotes, titles, summaries))
+    print(f"Filas: {args.rows} | {args.repeat} rondas | "
+          f"resultados {'idénticos' if same else 'DISTINTOS'}")
+
+    results = {}
+    for name, func in (('original', original_clean_quotes), ('actual', clean_quotes)):
+        timer = timeit.Timer(lambda: clean_rows(func, titles, summaries))
+        best = min(timer.repeat(repeat=args.repeat, number=1))
+        results[name] = best
+        print(f"{name:10s} {best * 1000:8.1f} ms {args.rows / best:12,.0f} filas/s")
+
+    print(f"actual vs original: {results['original'] / results['actual']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
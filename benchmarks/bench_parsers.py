@@ -0,0 +1,71 @@
+"""
+Benchmark de los backends de parseo HTML (ver PARSER_BACKENDS en src/extraction.py).
+
+Parsea la página de ejemplo de tests/fixtures con cada backend y reporta el
+tiempo por página (mejor de --repeat rondas de --number páginas) y la mejora
+respecto de html.parser (parseo de la versión original).
+
+Uso:
+    python benchmarks/bench_parsers.py [--number 50] [--repeat 5] [--rows-factor 1]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.extraction import PARSER_BACKENDS, parse_page_html  # noqa: E402
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures',
+                            'ani_normatividad_page.html')
+BASELINE_BACKEND = 'html.parser'
+
+
+def load_page(rows_factor=1):
+    """
+    Lee la página de ejemplo; con rows_factor > 1 repite las filas de la tabla
+    (el listado real tiene más filas por página que el ejemplo).
+    """
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if rows_factor > 1:
+        # El <tbody> de la tabla (el <script> del encabezado también menciona uno)
+        match = re.compile(r'(<tbody>)(.*?)(</tbody>)', re.S).search(content, content.index('<table'))
+        content = (content[:match.start(2)] + match.group(2) * rows_factor
+                   + content[match.end(2):])
+    return content.encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=50, help='Páginas por ronda')
+    parser.add_argument('--repeat', type=int, default=5, help='Rondas (se toma la mejor)')
+    parser.add_argument('--rows-factor', type=int, default=1, help='Veces que se repiten las filas')
+    args = parser.parse_args()
+
+    content = load_page(args.rows_factor)
+    baseline_records = parse_page_html(content, 0, parser_backend=BASELINE_BACKEND)[1]
+    print(f"Página: {len(content) / 1024:.1f} KiB, {len(baseline_records)} registros | "
+          f"{args.repeat} rondas de {args.number} páginas")
+
+    results = {}
+    for backend in PARSER_BACKENDS:
+        records = parse_page_html(content, 0, parser_backend=backend)[1]
+        same = ([{k: v for k, v in r.items() if k != 'update_at'} for r in records]
+                == [{k: v for k, v in r.items() if k != 'update_at'} for r in baseline_records])
+        timer = timeit.Timer(lambda: parse_page_html(content, 0, parser_backend=backend))
+        best = min(timer.repeat(repeat=args.repeat, number=args.number)) / args.number
+        results[backend] = best
+        print(f"{backend:12s} {best * 1000:8.2f} ms/página {1 / best:8.1f} páginas/s "
+              f"registros {'idénticos' if same else 'DISTINTOS'}")
+
+    baseline = results[BASELINE_BACKEND]
+    for backend, seconds in results.items():
+        if backend != BASELINE_BACKEND:
+            print(f"{backend} vs {BASELINE_BACKEND}: {baseline / seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
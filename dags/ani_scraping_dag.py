@@ -18,9 +18,20 @@ if os.path.exists(src_path):
 # También intentar la ruta absoluta de Airflow
 sys.path.insert(0, '/opt/airflow/src')
 
-from src.extraction import scrape_multiple_pages, ENTITY_VALUE
+from src.config import DEFAULT_NORM_TYPE_ID, NORM_TYPE_IDS
+from src.extraction import (
+    scrape_multiple_pages,
+    scrape_incremental,
+    scrape_norm_types,
+    get_latest_db_date,
+    get_failed_pages,
+    ENTITY_VALUE,
+    PAGE_UNCHANGED,
+)
+from src.http_cache import HttpValidatorStore
+from src.row_fingerprints import RowFingerprintStore
 from src.validation import DataValidator
-from src.persistence import DatabaseManager, insert_new_records
+from src.persistence import DatabaseManager, insert_new_records, update_edited_records
 
 # Configuración por defecto de argumentos del DAG
 default_args = {
@@ -45,6 +56,70 @@ dag = DAG(
 )
 
 
+def _get_connection_params():
+    """
+    Parámetros de conexión a la base de datos.
+    Por defecto, Airflow usa: postgres/airflow/airflow
+    """
+    return {
+        'DB_HOST': os.environ.get('DB_HOST', 'postgres'),
+        'DB_PORT': os.environ.get('DB_PORT', '5432'),
+        'DB_NAME': os.environ.get('DB_NAME', 'airflow'),
+        'DB_USERNAME': os.environ.get('DB_USERNAME', 'airflow'),
+        'DB_PASSWORD': os.environ.get('DB_PASSWORD', 'airflow')
+    }
+
+
+def _get_high_water_mark():
+    """
+    Obtiene la marca de agua (created_at más reciente de la entidad en el tipo
+    de norma por defecto, el único que recorre el scraping incremental).
+    Retorna (conectado, marca_de_agua).
+    """
+    db_manager = DatabaseManager()
+    if not db_manager.connect(connection_params=_get_connection_params()):
+        return False, None
+    try:
+        return True, get_latest_db_date(db_manager, ENTITY_VALUE, type_id=DEFAULT_NORM_TYPE_ID)
+    finally:
+        db_manager.close()
+
+
+def _save_http_validators(result):
+    """
+    Persiste los validadores HTTP (ETag / Last-Modified) que la extracción dejó
+    pendientes en XCom. Se llama solo cuando la escritura terminó sin errores.
+    """
+    validators = (result or {}).get('http_validators')
+    if not validators:
+        return
+    store = HttpValidatorStore()
+    store.merge(validators)
+    print(f"Validadores HTTP guardados: {store.save()}")
+
+
+def _save_row_fingerprints(result):
+    """
+    Persiste las huellas de filas pendientes en XCom (ver _save_http_validators).
+    """
+    fingerprints = (result or {}).get('row_fingerprints')
+    if not fingerprints:
+        return
+    store = RowFingerprintStore()
+    store.merge(fingerprints)
+    print(f"Huellas de filas guardadas: {store.save()}")
+
+
+def _raise_on_failed_pages(result):
+    """
+    Falla la tarea si quedaron páginas con error tras reencolarlas, para que la
+    ejecución no se dé por completa con registros de menos.
+    """
+    failed_pages = (result or {}).get('failed_pages')
+    if failed_pages:
+        raise RuntimeError(f"Páginas con error tras los reintentos: {failed_pages}")
+
+
 def task_extraction(**context):
     """
     Tarea de Extracción: Scrapea las páginas de ANI y extrae los datos.
@@ -52,23 +127,93 @@ def task_extraction(**context):
     print("=== INICIANDO TAREA DE EXTRACCIÓN ===")
     
     # Obtener parámetros del contexto o usar valores por defecto
-    num_pages = context.get('dag_run').conf.get('num_pages_to_scrape', 9) if context.get('dag_run') else 9
+    conf = context.get('dag_run').conf if context.get('dag_run') else {}
+    conf = conf or {}
+    num_pages = conf.get('num_pages_to_scrape', 9)
+    force_scrape = conf.get('force_scrape', False)
+    norm_type_ids = conf.get('norm_type_ids', NORM_TYPE_IDS)
+    multi_type = list(norm_type_ids) != [DEFAULT_NORM_TYPE_ID]
+    incremental = conf.get('incremental', True) and not force_scrape and not multi_type
+    
+    high_water_mark = None
+    if incremental:
+        try:
+            incremental, high_water_mark = _get_high_water_mark()
+            print(f"Marca de agua (fecha más reciente en BD): {high_water_mark}")
+        except Exception as e:
+            print(f"No se pudo obtener la marca de agua, usando modo completo: {e}")
+            incremental = False
     
     print(f"Extrayendo datos de {num_pages} páginas...")
     
-    # Realizar scraping
-    all_normas_data = scrape_multiple_pages(
-        num_pages=num_pages,
-        start_page=0,
-        verbose=True
-    )
+    # Solicitudes condicionales: las páginas sin cambios (304) no se descargan.
+    # Los validadores nuevos viajan por XCom y se guardan tras la escritura.
+    validator_store = None if force_scrape else HttpValidatorStore()
+    # Huellas de filas: las filas ya vistas se omiten antes de extraerlas
+    row_store = None if force_scrape or incremental or multi_type else RowFingerprintStore()
+    page_statuses = {}
+    type_statuses = {}
+    
+    # Realizar scraping (incremental: se detiene al alcanzar la marca de agua)
+    if multi_type:
+        print(f"Tipos de norma: {list(norm_type_ids)}")
+        all_normas_data = scrape_norm_types(
+            norm_type_ids,
+            num_pages=num_pages,
+            verbose=True,
+            type_statuses=type_statuses
+        )
+    elif incremental:
+        all_normas_data = scrape_incremental(
+            high_water_mark,
+            max_pages=num_pages,
+            verbose=True,
+            validator_store=validator_store,
+            page_statuses=page_statuses
+        )
+    else:
+        all_normas_data = scrape_multiple_pages(
+            num_pages=num_pages,
+            start_page=0,
+            verbose=True,
+            validator_store=validator_store,
+            page_statuses=page_statuses,
+            row_store=row_store
+        )
+    http_validators = validator_store.pending() if validator_store else {}
+    # Páginas que siguen con error: viajan por XCom y la escritura falla la ejecución
+    if multi_type:
+        failed_pages = [[type_id, page] for type_id, statuses in type_statuses.items()
+                        for page in get_failed_pages(statuses)]
+    else:
+        failed_pages = get_failed_pages(page_statuses)
+    row_fingerprints = row_store.pending() if row_store is not None else {}
+    edited_links = []
+    if row_store is not None:
+        print(f"Filas omitidas por huella: {row_store.stats['skipped']} | "
+              f"nuevas: {row_store.stats['new']} | editadas: {row_store.stats['edited']}")
+        # Las filas editadas viajan con el resto y se escriben como actualizaciones
+        edited_records = row_store.edited_records()
+        edited_links = sorted({record['external_link'] for record in edited_records})
+        all_normas_data.extend(edited_records)
+    
+    if page_statuses and all(status == PAGE_UNCHANGED for status in page_statuses.values()):
+        print("Ninguna página cambió desde la última ejecución (304)")
+        return {
+            'data': [],
+            'total_records': 0,
+            'content_check': 'not_modified'
+        }
     
     if not all_normas_data:
         print("No se encontraron datos durante la extracción")
         # Guardar resultado vacío en XCom para que las siguientes tareas lo manejen
         return {
             'data': [],
-            'total_records': 0
+            'total_records': 0,
+            'http_validators': http_validators,
+            'row_fingerprints': row_fingerprints,
+            'failed_pages': failed_pages
         }
     
     total_extracted = len(all_normas_data)
@@ -80,7 +225,12 @@ def task_extraction(**context):
     # Guardar datos en XCom para la siguiente tarea
     return {
         'data': all_normas_data,
-        'total_records': total_extracted
+        'total_records': total_extracted,
+        'records_edited': row_store.stats['edited'] if row_store is not None else 0,
+        'edited_links': edited_links,
+        'http_validators': http_validators,
+        'row_fingerprints': row_fingerprints,
+        'failed_pages': failed_pages
     }
 
 
@@ -93,6 +243,10 @@ def task_validation(**context):
     # Obtener datos de la tarea anterior
     ti = context['ti']
     extraction_result = ti.xcom_pull(task_ids='extraction')
+    http_validators = (extraction_result or {}).get('http_validators', {})
+    row_fingerprints = (extraction_result or {}).get('row_fingerprints', {})
+    failed_pages = (extraction_result or {}).get('failed_pages', [])
+    edited_links = (extraction_result or {}).get('edited_links', [])
     
     if not extraction_result or extraction_result.get('total_records', 0) == 0:
         print("No hay datos para validar")
@@ -100,7 +254,10 @@ def task_validation(**context):
             'data': [],
             'total_records': 0,
             'valid_records': 0,
-            'discarded_records': 0
+            'discarded_records': 0,
+            'http_validators': http_validators,
+            'row_fingerprints': row_fingerprints,
+            'failed_pages': failed_pages
         }
     
     all_normas_data = extraction_result.get('data', [])
@@ -111,17 +268,19 @@ def task_validation(**context):
             'data': [],
             'total_records': 0,
             'valid_records': 0,
-            'discarded_records': 0
+            'discarded_records': 0,
+            'failed_pages': failed_pages
         }
     
-    # Crear DataFrame
-    df_normas = pd.DataFrame(all_normas_data)
-    print(f"Validando {len(df_normas)} registros...")
+    print(f"Validando {len(all_normas_data)} registros...")
     
-    # Validar datos
+    # Validar datos: los registros llegan y salen de XCom como dicts, así que
+    # se validan en streaming sin pasar por un DataFrame
     try:
         validator = DataValidator()
-        df_validated, validation_stats = validator.validate_dataframe(df_normas, verbose=True)
+        validation_stats = {}
+        validated_data = list(validator.iter_validate(all_normas_data, validation_stats,
+                                                      sample_errors=10))
         
         print("=" * 60)
         print(f"✅ VALIDACIÓN COMPLETADA")
@@ -130,17 +289,20 @@ def task_validation(**context):
         print(f"❌ DESCARTES POR VALIDACIÓN: {validation_stats['discarded_records']}")
         if validation_stats.get('field_errors'):
             print(f"⚠️  ERRORES POR CAMPO: {validation_stats['field_errors']}")
+        for message in validation_stats.get('error_samples', []):
+            print(f"   - {message}")
         print("=" * 60)
         
-        # Convertir DataFrame validado a lista de diccionarios para XCom
-        validated_data = df_validated.to_dict('records') if not df_validated.empty else []
-        
         return {
             'data': validated_data,
             'total_records': validation_stats['total_records'],
             'valid_records': validation_stats['valid_records'],
             'discarded_records': validation_stats['discarded_records'],
-            'validation_stats': validation_stats
+            'validation_stats': validation_stats,
+            'edited_links': edited_links,
+            'http_validators': http_validators,
+            'row_fingerprints': row_fingerprints,
+            'failed_pages': failed_pages
         }
         
     except Exception as e:
@@ -149,13 +311,16 @@ def task_validation(**context):
         print(traceback.format_exc())
         # En caso de error, continuar con los datos sin validar
         print("Continuando con datos sin validar debido a error...")
-        validated_data = df_normas.to_dict('records')
         return {
-            'data': validated_data,
-            'total_records': len(df_normas),
-            'valid_records': len(df_normas),
+            'data': all_normas_data,
+            'total_records': len(all_normas_data),
+            'valid_records': len(all_normas_data),
             'discarded_records': 0,
-            'validation_error': str(e)
+            'validation_error': str(e),
+            'edited_links': edited_links,
+            'http_validators': http_validators,
+            'row_fingerprints': row_fingerprints,
+            'failed_pages': failed_pages
         }
 
 
@@ -169,6 +334,9 @@ def task_writing(**context):
     
     Si se ejecuta el DAG múltiples veces con los mismos datos, solo se insertarán
     los registros nuevos, evitando duplicados automáticamente.
+    
+    Si la extracción dejó páginas con error (failed_pages), la tarea escribe lo
+    extraído y luego falla, para que la ejecución quede marcada como fallida.
     """
     print("=== INICIANDO TAREA DE ESCRITURA ===")
     
@@ -178,6 +346,9 @@ def task_writing(**context):
     
     if not validation_result or validation_result.get('valid_records', 0) == 0:
         print("No hay datos válidos para escribir")
+        _save_http_validators(validation_result)
+        _save_row_fingerprints(validation_result)
+        _raise_on_failed_pages(validation_result)
         return {
             'records_inserted': 0,
             'message': 'No hay datos válidos para insertar'
@@ -187,6 +358,7 @@ def task_writing(**context):
     
     if not validated_data:
         print("Lista de datos validados vacía")
+        _raise_on_failed_pages(validation_result)
         return {
             'records_inserted': 0,
             'message': 'Lista de datos validados vacía'
@@ -201,16 +373,7 @@ def task_writing(**context):
     db_manager = DatabaseManager()
     
     # Configurar conexión usando variables de entorno de Airflow
-    # Por defecto, Airflow usa: postgres/airflow/airflow
-    connection_params = {
-        'DB_HOST': os.environ.get('DB_HOST', 'postgres'),
-        'DB_PORT': os.environ.get('DB_PORT', '5432'),
-        'DB_NAME': os.environ.get('DB_NAME', 'airflow'),
-        'DB_USERNAME': os.environ.get('DB_USERNAME', 'airflow'),
-        'DB_PASSWORD': os.environ.get('DB_PASSWORD', 'airflow')
-    }
-    
-    if not db_manager.connect(connection_params=connection_params):
+    if not db_manager.connect(connection_params=_get_connection_params()):
         error_msg = 'Error de conexión a la base de datos'
         print(error_msg)
         return {
@@ -220,7 +383,13 @@ def task_writing(**context):
         }
     
     try:
-        # Insertar registros
+        # Actualizar las filas editadas e insertar el resto
+        updated_count, df_validated, update_message = update_edited_records(
+            db_manager,
+            df_validated,
+            ENTITY_VALUE,
+            validation_result.get('edited_links', [])
+        )
         inserted_count, status_message = insert_new_records(
             db_manager, 
             df_validated, 
@@ -230,11 +399,18 @@ def task_writing(**context):
         print("=" * 60)
         print(f"✅ ESCRITURA COMPLETADA")
         print(f"📝 FILAS INSERTADAS: {inserted_count}")
+        print(f"✏️  FILAS ACTUALIZADAS: {updated_count}")
         print(f"📋 Detalles: {status_message}")
         print("=" * 60)
         
-        return {
+        # Guardar validadores HTTP y huellas solo si la escritura no falló
+        if not status_message.startswith('Error') and not update_message.startswith('Error'):
+            _save_http_validators(validation_result)
+            _save_row_fingerprints(validation_result)
+        
+        write_result = {
             'records_inserted': inserted_count,
+            'records_updated': updated_count,
             'message': status_message,
             'success': True
         }
@@ -252,6 +428,10 @@ def task_writing(**context):
         
     finally:
         db_manager.close()
+    
+    # Lo extraído ya se escribió, pero las páginas con error fallan la ejecución
+    _raise_on_failed_pages(validation_result)
+    return write_result
 
 
 # Definición de las tareas
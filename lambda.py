@@ -4,28 +4,233 @@ Mantiene compatibilidad con la función lambda_handler original.
 Flujo: Extracción → Validación → Escritura
 """
 import json
-import pandas as pd
+from src.config import DEFAULT_NORM_TYPE_ID, NORM_TYPE_IDS, HTTP_ARCHIVE_PATH, PARSE_MAX_WORKERS
+from src.archive import HttpArchive, ARCHIVE_REPLAY
 from src.extraction import (
     scrape_multiple_pages,
+    scrape_incremental,
+    scrape_norm_types,
     check_for_new_content,
-    ENTITY_VALUE
+    replay_archive,
+    get_latest_db_date,
+    get_failed_pages,
+    ENTITY_VALUE,
+    PAGE_UNCHANGED
 )
+from src.http_cache import HttpValidatorStore
+from src.row_fingerprints import RowFingerprintStore
+from src.records import RecordColumns, records_to_dataframe
+from src.pipeline import run_streaming_pipeline
+from src.backfill import run_backfill
 from src.validation import DataValidator
 from src.persistence import (
     DatabaseManager,
-    insert_new_records
+    insert_new_records,
+    update_edited_records
 )
 
 
+def run_streaming(num_pages_to_scrape, start_page=0, validator_store=None, page_cache=None,
+                  chunk_size=None):
+    """
+    Modo streaming: extrae, valida y escribe por bloques sin materializar
+    todo el recorrido en memoria (ver src.pipeline.run_streaming_pipeline).
+    """
+    end_page = start_page + num_pages_to_scrape - 1
+    
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Error de conexión a la base de datos',
+                'success': False
+            })
+        }
+    
+    try:
+        stats = run_streaming_pipeline(
+            db_manager,
+            range(start_page, end_page + 1),
+            entity=ENTITY_VALUE,
+            chunk_size=chunk_size,
+            verbose=True,
+            validator_store=validator_store,
+            page_cache=page_cache
+        )
+        
+        # Guardar validadores HTTP solo si ningún bloque falló
+        if validator_store and not stats['errors']:
+            validator_store.save()
+        
+        message = (f"Streaming: {stats['records_inserted']} registros insertados "
+                   f"en {stats['chunks']} bloques")
+        print(f"Operación completada: {message}")
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': message,
+                'records_scraped': stats['records_scraped'],
+                'records_validated': stats['records_validated'],
+                'records_inserted': stats['records_inserted'],
+                'validation_stats': stats['validation_stats'],
+                'pages_processed': f"{start_page}-{end_page}",
+                'failed_pages': stats['failed_pages'],
+                'errors': stats['errors'],
+                'success': not stats['errors']
+            })
+        }
+    finally:
+        db_manager.close()
+
+
+def run_historical_backfill(years=None, chunk_size=None):
+    """
+    Modo backfill: carga el histórico completo por años en paralelo,
+    reanudando desde el checkpoint si una ejecución anterior quedó a medias.
+    """
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Error de conexión a la base de datos',
+                'success': False
+            })
+        }
+    
+    try:
+        stats = run_backfill(db_manager, years=years, chunk_size=chunk_size, verbose=False)
+        message = (f"Backfill: {stats['records_inserted']} registros insertados, "
+                   f"{len(stats['years_completed'])}/{len(stats['years'])} años completos")
+        print(f"Operación completada: {message}")
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': message,
+                'records_scraped': stats['records_scraped'],
+                'records_validated': stats['records_validated'],
+                'records_inserted': stats['records_inserted'],
+                'validation_stats': stats['validation_stats'],
+                'pages_processed': stats['pages_processed'],
+                'years': stats['years'],
+                'years_completed': stats['years_completed'],
+                'errors': stats['errors'],
+                'success': not stats['errors']
+            })
+        }
+    finally:
+        db_manager.close()
+
+
+def run_replay(archive_path=None, type_ids=None, years=None, parse_workers=None):
+    """
+    Modo reproceso: vuelve a extraer las páginas de un archivo HTTP grabado
+    (HTTP_ARCHIVE_MODE='record') sin acceder a la red, las valida y escribe
+    los registros nuevos (ver src.extraction.replay_archive).
+    """
+    archive = HttpArchive(archive_path or HTTP_ARCHIVE_PATH, ARCHIVE_REPLAY)
+    if not len(archive):
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': f"El archivo HTTP {archive.path} no tiene páginas grabadas",
+                'records_scraped': 0,
+                'records_inserted': 0,
+                'success': False
+            })
+        }
+    
+    page_statuses = {}
+    all_normas_data = replay_archive(
+        archive,
+        type_ids=type_ids,
+        years=years,
+        parse_workers=PARSE_MAX_WORKERS if parse_workers is None else parse_workers,
+        page_statuses=page_statuses
+    )
+    failed_pages = get_failed_pages(page_statuses)
+    total_scraped = len(all_normas_data)
+    
+    df_normas = records_to_dataframe(all_normas_data)
+    del all_normas_data
+    df_validated, validation_stats = DataValidator().validate_dataframe(df_normas, verbose=False)
+    
+    inserted_count, status_message = 0, 'Todos los registros fueron descartados durante la validación'
+    if not df_validated.empty:
+        db_manager = DatabaseManager()
+        if not db_manager.connect():
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'message': 'Error de conexión a la base de datos',
+                    'success': False
+                })
+            }
+        try:
+            inserted_count, status_message = insert_new_records(db_manager, df_validated, ENTITY_VALUE)
+        finally:
+            db_manager.close()
+    
+    print(f"Operación completada: {status_message}")
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': status_message,
+            'records_scraped': total_scraped,
+            'records_validated': len(df_validated),
+            'records_inserted': inserted_count,
+            'validation_stats': validation_stats,
+            'pages_processed': len(page_statuses),
+            'failed_pages': failed_pages,
+            'success': not failed_pages and not status_message.startswith('Error')
+        })
+    }
+
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler function para el scraping de normativas ANI.
     Modificado para procesar las páginas más recientes (0-8) y detectar contenido nuevo.
+    Por defecto el scraping es incremental: se detiene al alcanzar la fecha más
+    reciente ya almacenada (evento 'incremental': False para recorrer todas).
+    Con 'streaming': True los registros se validan y escriben por bloques
+    mientras se scrapea (pensado para recorridos largos).
+    Con 'backfill': True se carga el histórico completo por años (ver src.backfill).
+    Con 'replay': True se reprocesa el archivo HTTP grabado sin red
+    ('archive_path', 'norm_type_ids', 'years' y 'parse_workers' opcionales).
+    Con 'row_fingerprints' (activo por defecto) las filas ya vistas se omiten
+    antes de extraerlas y las editadas se actualizan en la BD ('records_edited',
+    'records_updated').
+    Las páginas que siguen con error tras reencolarlas se reportan en
+    'failed_pages' y la respuesta queda con 'success': False.
     """
     try:
+        if event and event.get('backfill'):
+            return run_historical_backfill(
+                years=event.get('years'),
+                chunk_size=event.get('chunk_size')
+            )
+        
+        if event and event.get('replay'):
+            return run_replay(
+                archive_path=event.get('archive_path'),
+                type_ids=event.get('norm_type_ids'),
+                years=event.get('years'),
+                parse_workers=event.get('parse_workers')
+            )
+        
         # Obtener parámetros del evento
         num_pages_to_scrape = event.get('num_pages_to_scrape', 9) if event else 9
         force_scrape = event.get('force_scrape', False) if event else False
+        conditional_requests = event.get('conditional_requests', True) if event else True
+        row_fingerprints = event.get('row_fingerprints', True) if event else True
+        incremental = event.get('incremental', True) if event else True
+        streaming = event.get('streaming', False) if event else False
+        norm_type_ids = event.get('norm_type_ids', NORM_TYPE_IDS) if event else NORM_TYPE_IDS
+        # Varios tipos de norma (o uno distinto del por defecto): recorrido
+        # concurrente de todos los tipos con scrape_norm_types
+        multi_type = list(norm_type_ids) != [DEFAULT_NORM_TYPE_ID]
         
         print(f"Iniciando scraping de ANI - Páginas a procesar: {num_pages_to_scrape}")
         
@@ -33,11 +238,41 @@ def lambda_handler(event, context):
         db_manager = DatabaseManager()
         db_connected = db_manager.connect()
         
+        # Modo incremental: recorrer desde la página 0 hasta la marca de agua de la BD.
+        # Reemplaza la verificación previa de contenido nuevo (la propia
+        # detención temprana responde si hay filas nuevas).
+        use_incremental = (incremental and not streaming and not multi_type
+                           and not force_scrape and db_connected)
+        high_water_mark = None
+        if use_incremental:
+            try:
+                # El recorrido incremental cubre solo el tipo de norma por defecto
+                high_water_mark = get_latest_db_date(db_manager, type_id=DEFAULT_NORM_TYPE_ID)
+                print(f"Marca de agua (fecha más reciente en BD): {high_water_mark}")
+            except Exception as watermark_error:
+                print(f"No se pudo obtener la marca de agua, usando modo completo: {watermark_error}")
+                use_incremental = False
+        
+        # Solicitudes condicionales: las páginas sin cambios (304) no se descargan
+        validator_store = HttpValidatorStore() if conditional_requests and not force_scrape else None
+        
+        # Huellas de filas: las filas sin cambios se omiten antes de extraer sus campos
+        row_store = None
+        if row_fingerprints and not force_scrape and not use_incremental and not multi_type and not streaming:
+            row_store = RowFingerprintStore()
+        
+        # Caché de la ejecución: las páginas que procesa la verificación de
+        # contenido nuevo (con las mismas huellas) se reutilizan en el scraping principal
+        page_cache = {}
+        
         # Verificar si hay contenido nuevo (a menos que se fuerce el scraping)
-        if not force_scrape and db_connected:
+        if not use_incremental and not multi_type and not force_scrape and db_connected:
             has_new_content = check_for_new_content(
                 min(3, num_pages_to_scrape),
-                db_manager=db_manager
+                db_manager=db_manager,
+                page_cache=page_cache,
+                validator_store=validator_store,
+                row_store=row_store
             )
             if not has_new_content:
                 db_manager.close()
@@ -59,16 +294,86 @@ def lambda_handler(event, context):
         start_page = 0
         end_page = num_pages_to_scrape - 1
         
-        print(f"Procesando páginas más recientes desde {start_page} hasta {end_page}")
+        if streaming and not multi_type:
+            return run_streaming(
+                num_pages_to_scrape,
+                start_page=start_page,
+                validator_store=validator_store,
+                page_cache=page_cache,
+                chunk_size=event.get('chunk_size')
+            )
+        
+        page_statuses = {}
+        type_statuses = {}
+        edited_links = set()
         
         # Proceso principal de scraping usando el módulo de extracción
-        all_normas_data = scrape_multiple_pages(
-            num_pages=num_pages_to_scrape,
-            start_page=start_page,
-            verbose=True
-        )
+        if multi_type:
+            print(f"Scraping concurrente de tipos de norma {list(norm_type_ids)} "
+                  f"(máximo {num_pages_to_scrape} páginas por tipo)")
+            all_normas_data = scrape_norm_types(
+                norm_type_ids,
+                num_pages=num_pages_to_scrape,
+                verbose=True,
+                type_statuses=type_statuses
+            )
+        elif use_incremental:
+            print(f"Scraping incremental desde la página {start_page} (máximo {num_pages_to_scrape} páginas)")
+            all_normas_data = scrape_incremental(
+                high_water_mark,
+                max_pages=num_pages_to_scrape,
+                verbose=True,
+                validator_store=validator_store,
+                page_statuses=page_statuses
+            )
+            end_page = max(page_statuses) if page_statuses else start_page
+        else:
+            print(f"Procesando páginas más recientes desde {start_page} hasta {end_page}")
+            all_normas_data = scrape_multiple_pages(
+                num_pages=num_pages_to_scrape,
+                start_page=start_page,
+                verbose=True,
+                validator_store=validator_store,
+                page_statuses=page_statuses,
+                page_cache=page_cache,
+                row_store=row_store,
+                collector=RecordColumns()
+            )
+            if row_store is not None:
+                print(f"Filas omitidas por huella: {row_store.stats['skipped']} | "
+                      f"nuevas: {row_store.stats['new']} | editadas: {row_store.stats['edited']}")
+                # Las filas editadas se validan con el resto y se escriben como
+                # actualizaciones (ver update_edited_records)
+                edited_records = row_store.edited_records()
+                edited_links = {record['external_link'] for record in edited_records}
+                all_normas_data.extend(edited_records)
+        
+        # Páginas que siguen con error tras reencolarlas: se reportan y la
+        # ejecución no se da por exitosa, para no perder registros en silencio
+        if multi_type:
+            failed_pages = [[type_id, page] for type_id, statuses in type_statuses.items()
+                            for page in get_failed_pages(statuses)]
+        else:
+            failed_pages = get_failed_pages(page_statuses)
+        
+        if page_statuses and all(status == PAGE_UNCHANGED for status in page_statuses.values()):
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Ninguna página cambió desde la última ejecución. Scraping omitido.',
+                    'records_scraped': 0,
+                    'records_inserted': 0,
+                    'pages_processed': f"{start_page}-{end_page}",
+                    'content_check': 'not_modified',
+                    'success': True
+                })
+            }
         
         if not all_normas_data:
+            if validator_store:
+                validator_store.save()
+            if row_store is not None:
+                row_store.save()
             return {
                 'statusCode': 200,
                 'body': json.dumps({
@@ -76,7 +381,8 @@ def lambda_handler(event, context):
                     'records_scraped': 0,
                     'records_inserted': 0,
                     'pages_processed': f"{start_page}-{end_page}",
-                    'success': True
+                    'failed_pages': failed_pages,
+                    'success': not failed_pages
                 })
             }
         
@@ -84,7 +390,8 @@ def lambda_handler(event, context):
         total_scraped = len(all_normas_data)
         
         # Crear DataFrame
-        df_normas = pd.DataFrame(all_normas_data)
+        df_normas = records_to_dataframe(all_normas_data)
+        del all_normas_data
         print(f"Total de registros extraídos: {total_scraped}")
         
         # ETAPA DE VALIDACIÓN
@@ -97,6 +404,10 @@ def lambda_handler(event, context):
             print(f"Registros después de validación: {len(df_validated)}")
             
             if df_validated.empty:
+                if validator_store:
+                    validator_store.save()
+                if row_store is not None:
+                    row_store.save()
                 return {
                     'statusCode': 200,
                     'body': json.dumps({
@@ -106,7 +417,8 @@ def lambda_handler(event, context):
                         'records_inserted': 0,
                         'validation_stats': validation_stats,
                         'pages_processed': f"{start_page}-{end_page}",
-                        'success': True
+                        'failed_pages': failed_pages,
+                        'success': not failed_pages
                     })
                 }
             
@@ -132,19 +444,43 @@ def lambda_handler(event, context):
             }
         
         try:
-            # Insertar nuevos registros usando el módulo de persistencia
+            total_validated = len(df_normas)
+            
+            # Actualizar las filas editadas y insertar el resto usando el módulo de persistencia
+            updated_count, df_normas, update_message = update_edited_records(
+                db_manager, df_normas, ENTITY_VALUE, edited_links)
             inserted_count, status_message = insert_new_records(db_manager, df_normas, ENTITY_VALUE)
+            write_failed = status_message.startswith('Error') or update_message.startswith('Error')
+            
+            # Guardar validadores HTTP y huellas solo si la escritura no falló, para
+            # no omitir (304 / huella conocida) filas que no llegaron a la BD
+            if validator_store and not write_failed:
+                validator_store.save()
+            if row_store is not None and not write_failed:
+                row_store.save()
             
             response_body = {
                 'message': status_message,
                 'records_scraped': total_scraped,
-                'records_validated': len(df_normas),
+                'records_validated': total_validated,
                 'records_inserted': inserted_count,
                 'pages_processed': f"{start_page}-{end_page}",
-                'content_check': 'new_content_found' if not force_scrape else 'forced_scrape',
-                'success': True
+                'content_check': (
+                    'forced_scrape' if force_scrape
+                    else 'multi_type' if multi_type
+                    else 'incremental' if use_incremental
+                    else 'new_content_found'
+                ),
+                'failed_pages': failed_pages,
+                'success': not failed_pages
             }
             
+            # Filas editadas: se escriben como actualizaciones
+            if row_store is not None:
+                response_body['records_edited'] = row_store.stats['edited']
+                response_body['records_updated'] = updated_count
+                response_body['update_message'] = update_message
+            
             # Agregar estadísticas de validación si están disponibles
             if validation_stats:
                 response_body['validation_stats'] = validation_stats
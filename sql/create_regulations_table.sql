@@ -13,9 +13,39 @@ CREATE TABLE IF NOT EXISTS regulations (
     external_link TEXT,
     rtype_id INTEGER,
     summary TEXT,
-    classification_id INTEGER
+    classification_id INTEGER,
+    norm_type_id INTEGER
 );
 
+-- Tipo de norma de origen (field_tipos_de_normas__tid) para tablas ya existentes
+ALTER TABLE regulations ADD COLUMN IF NOT EXISTS norm_type_id INTEGER;
+
+-- Hash de contenido (64 bits) de la clave de deduplicación: primeros 8 bytes del
+-- md5 de 'entity|title|created_at|external_link', con '' en los campos NULL. El
+-- cliente calcula el mismo valor (ver content_hashes en src/persistence.py) para
+-- comparar enteros en vez de strings. Es una columna generada: no se envía en los INSERT.
+-- Las tablas creadas con la expresión anterior (sin COALESCE en todos los campos,
+-- hash NULL si title o created_at es NULL) recrean la columna: es derivada, no se
+-- pierden datos
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_attrdef d
+        JOIN pg_attribute a ON a.attrelid = d.adrelid AND a.attnum = d.adnum
+        WHERE d.adrelid = 'regulations'::regclass AND a.attname = 'content_hash'
+          AND pg_get_expr(d.adbin, d.adrelid) NOT LIKE '%COALESCE(title%'
+    ) THEN
+        ALTER TABLE regulations DROP COLUMN content_hash;
+    END IF;
+END $$;
+ALTER TABLE regulations ADD COLUMN IF NOT EXISTS content_hash BIGINT
+    GENERATED ALWAYS AS (
+        ('x' || substr(md5(
+            COALESCE(entity, '') || '|' || COALESCE(title, '') || '|' ||
+            COALESCE(created_at, '') || '|' || COALESCE(external_link, '')
+        ), 1, 16))::bit(64)::bigint
+    ) STORED;
+
 -- Crear la tabla regulations_component si no existe
 CREATE TABLE IF NOT EXISTS regulations_component (
     id SERIAL PRIMARY KEY,
@@ -28,8 +58,25 @@ CREATE INDEX IF NOT EXISTS idx_regulations_entity ON regulations(entity);
 CREATE INDEX IF NOT EXISTS idx_regulations_created_at ON regulations(created_at);
 CREATE INDEX IF NOT EXISTS idx_regulations_title ON regulations(title);
 CREATE INDEX IF NOT EXISTS idx_regulations_external_link ON regulations(external_link);
+CREATE INDEX IF NOT EXISTS idx_regulations_entity_norm_type ON regulations(entity, norm_type_id);
+CREATE INDEX IF NOT EXISTS idx_regulations_entity_content_hash ON regulations(entity, content_hash);
 CREATE INDEX IF NOT EXISTS idx_regulations_component_regulations_id ON regulations_component(regulations_id);
 
+-- Clave única de deduplicación (title + created_at + external_link + entity, ver
+-- insert_new_records): la BD descarta los duplicados con ON CONFLICT DO NOTHING.
+-- Este script no borra datos: si la tabla ya tiene duplicados, la creación del
+-- índice falla. Revisar y ejecutar antes (una sola vez) la migración destructiva
+-- sql/migration_delete_duplicate_regulations.sql
+CREATE UNIQUE INDEX IF NOT EXISTS uq_regulations_dedup_key
+    ON regulations (entity, title, created_at, (COALESCE(external_link, '')));
+
+-- Un componente por regulación una sola vez: los componentes se insertan con
+-- ON CONFLICT DO NOTHING en la misma sentencia que las regulaciones
+-- (ver insert_regulations_with_components). Falla igual que el índice anterior
+-- si hay componentes repetidos (ver la misma migración)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_regulations_component
+    ON regulations_component (regulations_id, components_id);
+
 -- Comentarios en las tablas
 COMMENT ON TABLE regulations IS 'Tabla para almacenar normativas extraídas de ANI';
 COMMENT ON TABLE regulations_component IS 'Tabla de relación entre regulaciones y componentes';
@@ -0,0 +1,40 @@
+-- MIGRACIÓN DESTRUCTIVA (ejecutar una sola vez, manualmente)
+--
+-- Elimina de forma PERMANENTE las regulaciones duplicadas (misma entity + title +
+-- created_at + external_link; se conserva el menor id) junto con sus componentes,
+-- y los componentes repetidos de una misma regulación. Es el paso previo a crear
+-- los índices únicos uq_regulations_dedup_key y uq_regulations_component de
+-- sql/create_regulations_table.sql en una tabla que ya tiene duplicados.
+--
+-- Hacer un respaldo antes de ejecutarla:
+--   docker-compose exec postgres pg_dump -U airflow -d airflow -t regulations -t regulations_component > respaldo.sql
+-- Ejecutar:
+--   docker-compose exec -T postgres psql -v ON_ERROR_STOP=1 -U airflow -d airflow < sql/migration_delete_duplicate_regulations.sql
+
+BEGIN;
+
+-- Regulaciones a eliminar: todas las de cada clave salvo la de menor id
+CREATE TEMP TABLE duplicate_regulations ON COMMIT DROP AS
+SELECT id FROM (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY entity, title, created_at, COALESCE(external_link, '')
+        ORDER BY id
+    ) AS duplicate_rank
+    FROM regulations
+) ranked
+WHERE duplicate_rank > 1;
+
+DELETE FROM regulations_component
+WHERE regulations_id IN (SELECT id FROM duplicate_regulations);
+
+DELETE FROM regulations
+WHERE id IN (SELECT id FROM duplicate_regulations);
+
+-- Componentes repetidos de una misma regulación (se conserva el menor id)
+DELETE FROM regulations_component repeated
+USING regulations_component kept
+WHERE repeated.regulations_id = kept.regulations_id
+  AND repeated.components_id = kept.components_id
+  AND repeated.id > kept.id;
+
+COMMIT;
@@ -0,0 +1,190 @@
+"""
+Módulo de Archivo HTTP (grabación / reproducción)
+Guarda en disco las respuestas crudas del listado para poder reprocesarlas
+sin volver a consultar www.ani.gov.co (p.ej. al cambiar reglas de extracción).
+
+Estructura del archivo:
+- objects/<sha[:2]>/<sha>.gz: cuerpo HTML comprimido con gzip, direccionado por
+  su SHA-256 (páginas idénticas se guardan una sola vez)
+- index.jsonl: una línea por descarga {url, sha256, page_num, year, type_id,
+  headers, fetched_at}; si una URL aparece varias veces vale la última
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from .config import HTTP_ARCHIVE_PATH, HTTP_ARCHIVE_MODE
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    HTTP_ARCHIVE_PATH = os.environ.get("HTTP_ARCHIVE_PATH", "/tmp/ani_http_archive")
+    HTTP_ARCHIVE_MODE = os.environ.get("HTTP_ARCHIVE_MODE", "")
+
+# Modos del archivo
+ARCHIVE_RECORD = 'record'
+ARCHIVE_REPLAY = 'replay'
+
+# Headers de la respuesta que se conservan junto al cuerpo
+ARCHIVED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class ArchivedResponse:
+    """
+    Respuesta reconstruida desde el archivo, con la interfaz de requests.Response
+    que usa la extracción (status_code, content, headers, url).
+    """
+
+    def __init__(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.content = content
+        self.headers = headers or {}
+        self.status_code = 200
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+def read_object(path: str, sha256: str) -> bytes:
+    """
+    Lee y descomprime un cuerpo del archivo a partir de su hash.
+
+    Es una función de módulo para poder usarla desde procesos de parseo
+    recibiendo solo la ruta y el hash.
+    """
+    with gzip.open(os.path.join(path, 'objects', sha256[:2], f"{sha256}.gz"), 'rb') as f:
+        return f.read()
+
+
+class HttpArchive:
+    """
+    Archivo de respuestas HTTP en disco, comprimido y direccionado por contenido.
+    """
+
+    def __init__(self, path: Optional[str] = None, mode: str = ARCHIVE_RECORD):
+        """
+        Inicializa el archivo cargando su índice.
+
+        Args:
+            path: Directorio del archivo. Si es None, usa HTTP_ARCHIVE_PATH
+            mode: ARCHIVE_RECORD (guardar descargas) o ARCHIVE_REPLAY (servir
+                  las páginas desde disco, sin red)
+        """
+        if mode not in (ARCHIVE_RECORD, ARCHIVE_REPLAY):
+            raise ValueError(f"Modo de archivo no soportado: '{mode}'")
+        self.path = path or HTTP_ARCHIVE_PATH
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index = self._load()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, 'index.jsonl')
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Carga el índice. Las líneas corruptas (p.ej. una escritura cortada) se ignoran.
+        """
+        index = {}
+        if not os.path.exists(self.index_path):
+            return index
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    index[entry['url']] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """
+        Itera las entradas del índice (una por URL, la más reciente).
+        """
+        with self._lock:
+            entries = list(self._index.values())
+        return iter(entries)
+
+    def record(self, url: str, response, page_num: Optional[int] = None,
+               year: Optional[int] = None, type_id: Optional[int] = None) -> str:
+        """
+        Guarda el cuerpo de una respuesta 200 y la agrega al índice.
+
+        Args:
+            url: URL solicitada
+            response: Respuesta HTTP (se usan content y headers)
+            page_num, year, type_id: Parámetros de la página (ver build_page_url)
+
+        Returns:
+            str: SHA-256 del cuerpo
+        """
+        content = response.content
+        sha256 = hashlib.sha256(content).hexdigest()
+        object_path = os.path.join(self.path, 'objects', sha256[:2], f"{sha256}.gz")
+
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(content)
+            os.replace(tmp_path, object_path)
+
+        entry = {
+            'url': url,
+            'sha256': sha256,
+            'page_num': page_num,
+            'year': year,
+            'type_id': type_id,
+            'headers': {name: response.headers[name] for name in ARCHIVED_HEADERS
+                        if response.headers.get(name)},
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._index[url] = entry
+        return sha256
+
+    def get(self, url: str) -> Optional[ArchivedResponse]:
+        """
+        Devuelve la respuesta archivada de una URL (None si no está archivada).
+        """
+        with self._lock:
+            entry = self._index.get(url)
+        if entry is None:
+            return None
+        return ArchivedResponse(url, read_object(self.path, entry['sha256']), entry.get('headers'))
+
+
+_http_archive = None
+_http_archive_lock = threading.Lock()
+
+
+def get_http_archive() -> Optional[HttpArchive]:
+    """
+    Devuelve el archivo HTTP activo según HTTP_ARCHIVE_MODE ('' = desactivado).
+    """
+    global _http_archive
+
+    if _http_archive is None and HTTP_ARCHIVE_MODE:
+        with _http_archive_lock:
+            if _http_archive is None:
+                _http_archive = HttpArchive(HTTP_ARCHIVE_PATH, HTTP_ARCHIVE_MODE)
+    return _http_archive
+
+
+def set_http_archive(archive: Optional[HttpArchive]) -> None:
+    """
+    Activa un archivo HTTP para la extracción (None = volver a la configuración).
+    """
+    global _http_archive
+
+    with _http_archive_lock:
+        _http_archive = archive
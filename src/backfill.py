@@ -0,0 +1,324 @@
+"""
+Módulo de Backfill Histórico
+Carga el archivo completo de normativas ANI particionando el listado por año
+(filtro field_fecha__value[value][year] de URL_BASE). Cada año es un shard
+independiente: se recorren en paralelo y su avance se guarda en un checkpoint
+para poder reanudar el backfill donde quedó.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    from .extraction import (
+        fetch_page, parse_page_html, parse_year_options, parse_page_count,
+        iter_pages_pipelined, PAGE_OK, PAGE_ERROR,
+    )
+    from .json_store import JsonFileStore
+    from .pipeline import merge_validation_stats
+    from .records import RecordColumns
+    from .validation import DataValidator
+    from .persistence import insert_new_records
+except ImportError:
+    from extraction import (
+        fetch_page, parse_page_html, parse_year_options, parse_page_count,
+        iter_pages_pipelined, PAGE_OK, PAGE_ERROR,
+    )
+    from json_store import JsonFileStore
+    from pipeline import merge_validation_stats
+    from records import RecordColumns
+    from validation import DataValidator
+    from persistence import insert_new_records
+try:
+    from .config import (
+        ENTITY_VALUE, STREAMING_CHUNK_SIZE, BACKFILL_CHECKPOINT_PATH,
+        BACKFILL_SHARD_WORKERS, BACKFILL_FETCH_WORKERS, BACKFILL_MIN_YEAR,
+    )
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    ENTITY_VALUE = 'Agencia Nacional de Infraestructura'
+    STREAMING_CHUNK_SIZE = int(os.environ.get("STREAMING_CHUNK_SIZE", "1000"))
+    BACKFILL_CHECKPOINT_PATH = os.environ.get("BACKFILL_CHECKPOINT_PATH", "/tmp/ani_backfill_checkpoint.json")
+    BACKFILL_SHARD_WORKERS = int(os.environ.get("BACKFILL_SHARD_WORKERS", "4"))
+    BACKFILL_FETCH_WORKERS = int(os.environ.get("BACKFILL_FETCH_WORKERS", "2"))
+    BACKFILL_MIN_YEAR = int(os.environ.get("BACKFILL_MIN_YEAR", "2000"))
+
+
+class BackfillCheckpoint(JsonFileStore):
+    """
+    Avance del backfill por año, persistido en un archivo JSON.
+
+    Para cada año guarda el número de páginas, la siguiente página pendiente
+    (todas las anteriores ya están escritas en la BD) y si el shard terminó.
+    """
+
+    description = 'checkpoint de backfill'
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(path or BACKFILL_CHECKPOINT_PATH)
+
+    def is_done(self, year: int) -> bool:
+        with self._lock:
+            return self._data.get(str(year), {}).get('done', False)
+
+    def next_page(self, year: int) -> int:
+        with self._lock:
+            return self._data.get(str(year), {}).get('next_page', 0)
+
+    def start_shard(self, year: int, num_pages: int) -> None:
+        """
+        Registra (o actualiza) el número de páginas de un año.
+        """
+        with self._lock:
+            shard = self._data.setdefault(str(year), {'next_page': 0, 'done': False})
+            shard['num_pages'] = num_pages
+
+    def advance(self, year: int, page_num: int) -> None:
+        """
+        Marca como escritas todas las páginas del año hasta page_num inclusive.
+        """
+        with self._lock:
+            shard = self._data.setdefault(str(year), {'next_page': 0, 'done': False})
+            shard['next_page'] = max(shard.get('next_page', 0), page_num + 1)
+
+    def mark_done(self, year: int) -> None:
+        with self._lock:
+            self._data.setdefault(str(year), {'next_page': 0})['done'] = True
+
+    def save(self) -> None:
+        """
+        Persiste el checkpoint de forma atómica.
+        """
+        with self._lock:
+            self._write(self._data)
+
+
+def discover_years(verbose: bool = False) -> list:
+    """
+    Obtiene los años disponibles en el listado, del más reciente al más antiguo.
+
+    Se leen del selector del filtro field_fecha de la página 0; si no aparece,
+    se usa el rango BACKFILL_MIN_YEAR..año actual.
+    """
+    status, response = fetch_page(0, verbose=verbose)
+    years = parse_year_options(response.content) if status == PAGE_OK else []
+    if not years:
+        print("No se encontró el filtro de años en el listado, usando rango por defecto")
+        years = list(range(datetime.now().year, BACKFILL_MIN_YEAR - 1, -1))
+    return years
+
+
+def discover_year_shards(years: Iterable[int], max_workers: Optional[int] = None,
+                         verbose: bool = False) -> Dict[int, Dict[str, Any]]:
+    """
+    Obtiene el número de páginas de cada año a partir de su paginador.
+
+    La página 0 de cada año ya parseada se devuelve para no descargarla ni
+    parsearla dos veces (ver take_cached_page).
+
+    Args:
+        years: Años a considerar (ver discover_years)
+        max_workers: Descargas simultáneas (default: BACKFILL_SHARD_WORKERS)
+        verbose: Si mostrar logs detallados
+
+    Returns:
+        Dict {año: {'num_pages': int, 'first_page': (estado, registros)}},
+        solo con los años que tienen registros
+    """
+    def _discover(year):
+        status, response = fetch_page(0, verbose=verbose, year=year)
+        if status != PAGE_OK:
+            return year, status, 0, None
+        num_pages = parse_page_count(response.content)
+        first_page = parse_page_html(response.content, 0, verbose=verbose)
+        return year, status, num_pages, first_page
+
+    shards = {}
+    with ThreadPoolExecutor(max_workers=max_workers or BACKFILL_SHARD_WORKERS,
+                            thread_name_prefix='ani-discover') as executor:
+        for year, status, num_pages, first_page in executor.map(_discover, list(years)):
+            if status == PAGE_ERROR:
+                print(f"No se pudo descubrir el año {year}, se reintentará en el próximo backfill")
+                continue
+            if num_pages > 0:
+                shards[year] = {'num_pages': num_pages, 'first_page': first_page}
+
+    total_pages = sum(shard['num_pages'] for shard in shards.values())
+    print(f"Años descubiertos: {len(shards)} | Páginas totales: {total_pages}")
+    return shards
+
+
+def run_backfill(db_manager, years: Optional[Iterable[int]] = None, entity: str = ENTITY_VALUE,
+                 shard_workers: Optional[int] = None, fetch_workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, checkpoint_path: Optional[str] = None,
+                 validate: bool = True, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Ejecuta el backfill histórico completo, un shard por año en paralelo.
+
+    Los shards descargan y parsean sus páginas (iter_pages_pipelined) y las
+    pasan por una cola acotada al hilo principal, que valida y escribe por
+    bloques con una única conexión. El checkpoint de cada año solo avanza
+    cuando sus páginas quedaron escritas; si una página falla, el shard se
+    detiene y se reanuda desde ella en la siguiente ejecución.
+
+    Args:
+        db_manager: Instancia de DatabaseManager conectada a la BD
+        years: Años a cargar (None = todos los disponibles)
+        entity: Entidad de los registros (ver insert_new_records)
+        shard_workers: Años recorridos en paralelo (default: BACKFILL_SHARD_WORKERS)
+        fetch_workers: Descargas simultáneas por año (default: BACKFILL_FETCH_WORKERS)
+        chunk_size: Registros por bloque de escritura (default: STREAMING_CHUNK_SIZE)
+        checkpoint_path: Archivo de checkpoint (default: BACKFILL_CHECKPOINT_PATH)
+        validate: Si validar los registros antes de escribirlos
+        verbose: Si mostrar logs detallados
+
+    Returns:
+        Dict con estadísticas: years, years_completed, pages_processed,
+        records_scraped, records_validated, records_inserted, validation_stats y errors
+    """
+    shard_workers = shard_workers or BACKFILL_SHARD_WORKERS
+    fetch_workers = fetch_workers or BACKFILL_FETCH_WORKERS
+    chunk_size = max(1, chunk_size or STREAMING_CHUNK_SIZE)
+    validator = DataValidator() if validate else None
+    checkpoint = BackfillCheckpoint(checkpoint_path)
+
+    if years is None:
+        years = discover_years(verbose=verbose)
+    years = [year for year in years if not checkpoint.is_done(year)]
+    shards = discover_year_shards(years, max_workers=shard_workers, verbose=verbose)
+
+    pending = {}
+    for year, shard in shards.items():
+        checkpoint.start_shard(year, shard['num_pages'])
+        start_page = checkpoint.next_page(year)
+        if start_page >= shard['num_pages']:
+            checkpoint.mark_done(year)
+            continue
+        pending[year] = (start_page, shard)
+    checkpoint.save()
+
+    validation_stats = {
+        'total_records': 0,
+        'valid_records': 0,
+        'discarded_records': 0,
+        'field_errors': {}
+    }
+    result = {
+        'years': sorted(pending),
+        'years_completed': [],
+        'pages_processed': 0,
+        'records_scraped': 0,
+        'records_validated': 0,
+        'records_inserted': 0,
+        'validation_stats': validation_stats,
+        'errors': []
+    }
+    if not pending:
+        print("Backfill completo: no hay años pendientes")
+        return result
+
+    print(f"Backfill de {len(pending)} años con {shard_workers} shards en paralelo")
+
+    out_queue = queue.Queue(maxsize=shard_workers * 8)
+    stop = threading.Event()
+
+    def _crawl_shard(year, start_page, shard):
+        # Productor: recorre un año y entrega (año, página, registros) en orden
+        page_cache = {0: shard['first_page']} if start_page == 0 else None
+        pages = iter_pages_pipelined(range(start_page, shard['num_pages']), verbose=verbose,
+                                     fetch_workers=fetch_workers, parse_workers=0,
+                                     page_cache=page_cache, year=year)
+        failed = False
+        try:
+            for page_num, status, records in pages:
+                if stop.is_set():
+                    break
+                if status == PAGE_ERROR:
+                    out_queue.put((year, page_num, None))
+                    failed = True
+                    break
+                out_queue.put((year, page_num, records))
+        except Exception as e:
+            print(f"Error en el shard {year}: {e}")
+            failed = True
+        finally:
+            pages.close()
+            out_queue.put((year, None, failed))
+
+    buffer = RecordColumns()
+    buffer_pages = {}      # año -> última página incluida en el buffer
+    finished_years = set() # shards terminados sin errores, pendientes de confirmar
+
+    def _flush():
+        # Consumidor: valida y escribe el bloque, luego avanza el checkpoint
+        if len(buffer):
+            df_chunk = buffer.to_dataframe()
+            if validator is not None:
+                df_chunk, chunk_stats = validator.validate_dataframe(df_chunk, verbose=verbose)
+            else:
+                chunk_stats = {'total_records': len(df_chunk), 'valid_records': len(df_chunk),
+                               'discarded_records': 0, 'field_errors': {}}
+            merge_validation_stats(validation_stats, chunk_stats)
+
+            if not df_chunk.empty:
+                inserted_count, status_message = insert_new_records(db_manager, df_chunk, entity)
+                if status_message.startswith('Error'):
+                    raise RuntimeError(status_message)
+                result['records_inserted'] += inserted_count
+
+        for year, page_num in buffer_pages.items():
+            checkpoint.advance(year, page_num)
+        for year in finished_years:
+            checkpoint.mark_done(year)
+            result['years_completed'].append(year)
+        checkpoint.save()
+
+        buffer.clear()
+        buffer_pages.clear()
+        finished_years.clear()
+        print(f"Backfill: {result['pages_processed']} páginas, "
+              f"{result['records_inserted']} registros insertados")
+
+    with ThreadPoolExecutor(max_workers=shard_workers, thread_name_prefix='ani-shard') as executor:
+        for year, (start_page, shard) in pending.items():
+            executor.submit(_crawl_shard, year, start_page, shard)
+
+        remaining = len(pending)
+        while remaining:
+            year, page_num, records = out_queue.get()
+            if page_num is None:
+                remaining -= 1
+                if not records and not stop.is_set():
+                    finished_years.add(year)
+                continue
+            if stop.is_set():
+                continue
+            if records is None:
+                result['errors'].append(f"Año {year}: error en página {page_num}")
+                continue
+
+            result['pages_processed'] += 1
+            buffer.extend(records)
+            buffer_pages[year] = page_num
+            if len(buffer) >= chunk_size:
+                try:
+                    _flush()
+                except Exception as e:
+                    result['errors'].append(str(e))
+                    stop.set()
+
+        if not stop.is_set():
+            try:
+                _flush()
+            except Exception as e:
+                result['errors'].append(str(e))
+
+    result['years_completed'].sort()
+    result['records_scraped'] = validation_stats['total_records']
+    result['records_validated'] = validation_stats['valid_records']
+    print(f"=== BACKFILL FINALIZADO === Años completos: {len(result['years_completed'])}/"
+          f"{len(pending)} | Insertados: {result['records_inserted']} | Errores: {len(result['errors'])}")
+    return result
@@ -0,0 +1,271 @@
+"""
+Módulo de Clasificación
+Asigna el rtype_id de una norma a partir de su título según reglas
+configurables (configs/classification_rules.yaml).
+
+Todas las palabras clave se compilan en una única expresión regular, así que
+el costo por título no crece con el número de tipos de norma. Un lote de
+títulos se clasifica con una sola búsqueda sobre el texto unido.
+"""
+import bisect
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+import yaml
+
+try:
+    from .config import CLASSIFICATION_RULES_PATH
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    CLASSIFICATION_RULES_PATH = os.environ.get("CLASSIFICATION_RULES_PATH")
+
+# Separador de títulos en classify_batch (no puede aparecer en una palabra clave)
+_BATCH_SEPARATOR = '\x00'
+_COMBINING_MARKS = re.compile('[\u0300-\u036f]')
+
+
+class ClassificationError(Exception):
+    """Excepción para reglas de clasificación inválidas"""
+    pass
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Construye una expresión regular con las palabras clave factorizadas por
+    prefijos (un trie): en cada posición del texto se evalúa un solo carácter
+    por nivel en lugar de todas las alternativas. Coincide con la palabra más larga.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def _build(node):
+        is_end = '' in node
+        branches = [re.escape(char) + _build(child)
+                    for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if is_end:
+            # Greedy: primero intenta seguir (palabra más larga)
+            return '(?:' + body + ')?'
+        return body
+
+    return _build(trie)
+
+
+def fold_text(text: str, accent_insensitive: bool = True) -> str:
+    """
+    Normaliza un texto para la búsqueda: minúsculas y, opcionalmente, sin tildes.
+    """
+    text = text.lower()
+    if accent_insensitive:
+        text = _COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', text))
+    return text
+
+
+class ClassificationEngine:
+    """
+    Clasificador de títulos por palabras clave con prioridades.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], default_rtype_id: int,
+                 accent_insensitive: bool = True):
+        """
+        Args:
+            rules: Lista de reglas {'rtype_id', 'keywords', 'priority' (opcional)}
+            default_rtype_id: rtype_id cuando ninguna palabra clave coincide
+            accent_insensitive: Si ignorar tildes al comparar
+        """
+        self.default_rtype_id = default_rtype_id
+        self.accent_insensitive = accent_insensitive
+
+        # (prioridad, orden) de cada palabra clave; una palabra repetida
+        # conserva su mejor regla
+        ranked = {}
+        for order, rule in enumerate(rules):
+            if 'rtype_id' not in rule or not rule.get('keywords'):
+                raise ClassificationError(f"Regla de clasificación incompleta: {rule}")
+            priority = rule.get('priority', 0)
+            for keyword in rule['keywords']:
+                folded = fold_text(str(keyword), accent_insensitive)
+                if not folded or _BATCH_SEPARATOR in folded:
+                    raise ClassificationError(f"Palabra clave inválida: {keyword!r}")
+                candidate = (-priority, order, rule['rtype_id'])
+                if folded not in ranked or candidate < ranked[folded]:
+                    ranked[folded] = candidate
+
+        # Rango de cada palabra (0 = mejor regla). La búsqueda devuelve, en la
+        # posición más a la izquierda, la palabra más larga; las palabras
+        # contenidas en ella también están en el texto, así que se precalcula
+        # el mejor rango entre la palabra y sus subcadenas.
+        keywords = sorted(ranked, key=lambda k: ranked[k][:2])
+        self._rtype_by_rank = [ranked[keyword][2] for keyword in keywords]
+        rank = {keyword: position for position, keyword in enumerate(keywords)}
+        self._rank = {
+            keyword: min(rank[other] for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+        # Palabras cuyo final puede ser el comienzo de otra: tras encontrarlas
+        # la búsqueda sigue desde el carácter siguiente y no desde su final
+        self._overlapping = {
+            keyword for keyword in keywords
+            if any(other.startswith(keyword[start:]) and len(other) > len(keyword) - start
+                   for other in keywords for start in range(1, len(keyword)))
+        }
+        self._pattern = re.compile(_trie_pattern(keywords)) if keywords else None
+
+    @classmethod
+    def from_keywords(cls, keywords: Dict[str, int], default_rtype_id: int,
+                      accent_insensitive: bool = False) -> 'ClassificationEngine':
+        """
+        Crea el motor a partir de un dict {palabra clave: rtype_id}; el orden
+        del dict define la prioridad (como en get_rtype_id original).
+        """
+        rules = [{'rtype_id': rtype_id, 'keywords': [keyword], 'priority': -order}
+                 for order, (keyword, rtype_id) in enumerate(keywords.items())]
+        return cls(rules, default_rtype_id, accent_insensitive)
+
+    @classmethod
+    def from_yaml(cls, config_path: Optional[str] = None) -> 'ClassificationEngine':
+        """
+        Crea el motor desde un archivo YAML (default: CLASSIFICATION_RULES_PATH
+        o configs/classification_rules.yaml).
+        """
+        config_path = config_path or find_rules_path()
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+        except Exception as e:
+            raise ClassificationError(f"Error cargando reglas de clasificación desde {config_path}: {e}")
+
+        if 'default_rtype_id' not in config:
+            raise ClassificationError(f"Falta default_rtype_id en {config_path}")
+        return cls(config.get('rules') or [], config['default_rtype_id'],
+                   config.get('accent_insensitive', True))
+
+    def classify(self, title: str) -> int:
+        """
+        Devuelve el rtype_id de un título.
+        """
+        if not title or self._pattern is None:
+            return self.default_rtype_id
+
+        best = None
+        for _, keyword in self._iter_matches(fold_text(title, self.accent_insensitive)):
+            rank = self._rank[keyword]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.default_rtype_id if best is None else self._rtype_by_rank[best]
+
+    def _iter_matches(self, text: str):
+        # (posición, palabra) de cada coincidencia más larga, de izquierda a derecha
+        search = self._pattern.search
+        overlapping = self._overlapping
+        match = search(text)
+        while match is not None:
+            keyword = match.group()
+            yield match.start(), keyword
+            match = search(text, match.start() + 1 if keyword in overlapping else match.end())
+
+    def classify_batch(self, titles: Iterable[str]) -> List[int]:
+        """
+        Clasifica un lote de títulos con una sola búsqueda sobre el texto unido.
+
+        Returns:
+            list: rtype_id de cada título, en el mismo orden
+        """
+        titles = [title if isinstance(title, str) else '' for title in titles]
+        results = [self.default_rtype_id] * len(titles)
+        if not titles or self._pattern is None:
+            return results
+
+        text = fold_text(_BATCH_SEPARATOR.join(titles), self.accent_insensitive)
+        # Inicio de cada título dentro del texto unido
+        starts = [0]
+        position = text.find(_BATCH_SEPARATOR)
+        while position != -1:
+            starts.append(position + 1)
+            position = text.find(_BATCH_SEPARATOR, position + 1)
+        if len(starts) != len(titles):
+            # Algún título contenía el separador: clasificar uno a uno
+            return [self.classify(title) for title in titles]
+
+        best = [None] * len(titles)
+        for position, keyword in self._iter_matches(text):
+            index = bisect.bisect_right(starts, position) - 1
+            rank = self._rank[keyword]
+            if best[index] is None or rank < best[index]:
+                best[index] = rank
+
+        for index, rank in enumerate(best):
+            if rank is not None:
+                results[index] = self._rtype_by_rank[rank]
+        return results
+
+
+def find_rules_path() -> str:
+    """
+    Busca el archivo de reglas de clasificación (igual que DataValidator).
+    """
+    possible_paths = [
+        'configs/classification_rules.yaml',
+        './configs/classification_rules.yaml',
+        os.path.join(os.path.dirname(__file__), '..', 'configs', 'classification_rules.yaml')
+    ]
+    if CLASSIFICATION_RULES_PATH:
+        possible_paths.insert(0, CLASSIFICATION_RULES_PATH)
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(
+        f"No se encontró el archivo de reglas de clasificación. "
+        f"Buscado en: {possible_paths}"
+    )
+
+
+_classification_engine = None
+_classification_engine_lock = threading.Lock()
+
+
+def get_classification_engine(fallback_keywords: Optional[Dict[str, int]] = None,
+                              fallback_default: Optional[int] = None) -> ClassificationEngine:
+    """
+    Devuelve el motor compartido, cargándolo del YAML la primera vez.
+
+    Si no hay archivo de reglas y se indican palabras clave de respaldo, el
+    motor se construye con ellas (ver ClassificationEngine.from_keywords).
+    """
+    global _classification_engine
+
+    if _classification_engine is None:
+        with _classification_engine_lock:
+            if _classification_engine is None:
+                try:
+                    _classification_engine = ClassificationEngine.from_yaml()
+                except FileNotFoundError:
+                    if fallback_keywords is None:
+                        raise
+                    print("No se encontró classification_rules.yaml, usando palabras clave por defecto")
+                    _classification_engine = ClassificationEngine.from_keywords(
+                        fallback_keywords, fallback_default)
+    return _classification_engine
+
+
+def set_classification_engine(engine: Optional[ClassificationEngine]) -> None:
+    """
+    Reemplaza el motor compartido (None = volver a cargar desde el YAML).
+    """
+    global _classification_engine
+
+    with _classification_engine_lock:
+        _classification_engine = engine
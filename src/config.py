@@ -8,6 +8,94 @@ import os
 ENTITY_VALUE = 'Agencia Nacional de Infraestructura'
 FIXED_CLASSIFICATION_ID = 13
 
+# Tipos de norma del listado (field_tipos_de_normas__tid). NORM_TYPE_IDS es la
+# lista a recorrer, separada por comas (p.ej. "12,13,14")
+DEFAULT_NORM_TYPE_ID = 12
+NORM_TYPE_IDS = [
+    int(type_id) for type_id in os.environ.get("NORM_TYPE_IDS", str(DEFAULT_NORM_TYPE_ID)).split(',')
+    if type_id.strip()
+]
+
+# Concurrencia del scraping (número máximo de páginas descargadas en paralelo)
+SCRAPING_MAX_WORKERS = int(os.environ.get("SCRAPING_MAX_WORKERS", "4"))
+
+# Sesión HTTP compartida (pool de conexiones keep-alive hacia www.ani.gov.co)
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "15"))
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "16"))
+
+# Planificador de descargas (ver src/scheduler.py): límite de tasa (token bucket),
+# concurrencia adaptativa AIMD y reintentos con backoff exponencial con jitter
+HTTP_RATE_LIMIT = float(os.environ.get("HTTP_RATE_LIMIT", "5"))
+HTTP_RATE_BURST = int(os.environ.get("HTTP_RATE_BURST", "5"))
+HTTP_MIN_CONCURRENCY = int(os.environ.get("HTTP_MIN_CONCURRENCY", "1"))
+HTTP_INITIAL_CONCURRENCY = int(os.environ.get("HTTP_INITIAL_CONCURRENCY", "4"))
+HTTP_MAX_CONCURRENCY = int(os.environ.get("HTTP_MAX_CONCURRENCY", "8"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "4"))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_CAP = float(os.environ.get("HTTP_BACKOFF_CAP", "30"))
+HTTP_LATENCY_SPIKE_FACTOR = float(os.environ.get("HTTP_LATENCY_SPIKE_FACTOR", "3"))
+# Rondas en que se reencolan (con backoff) las páginas que siguen con error
+# tras los reintentos del planificador; las que no se recuperan se reportan
+PAGE_RETRY_ROUNDS = int(os.environ.get("PAGE_RETRY_ROUNDS", "2"))
+
+# Almacén de validadores HTTP (ETag / Last-Modified) para solicitudes condicionales
+HTTP_VALIDATORS_PATH = os.environ.get("HTTP_VALIDATORS_PATH", "/tmp/ani_http_validators.json")
+
+# Archivo HTTP (ver src/archive.py): '' = desactivado, 'record' guarda cada
+# página descargada, 'replay' sirve las páginas desde el archivo sin red
+HTTP_ARCHIVE_PATH = os.environ.get("HTTP_ARCHIVE_PATH", "/tmp/ani_http_archive")
+HTTP_ARCHIVE_MODE = os.environ.get("HTTP_ARCHIVE_MODE", "")
+
+# Huellas de filas <tr> ya procesadas (ver src/row_fingerprints.py)
+ROW_FINGERPRINTS_PATH = os.environ.get("ROW_FINGERPRINTS_PATH", "/tmp/ani_row_fingerprints.json")
+
+# Reglas de clasificación de rtype_id (None = buscar configs/classification_rules.yaml)
+CLASSIFICATION_RULES_PATH = os.environ.get("CLASSIFICATION_RULES_PATH")
+
+# Memoización de fechas: máximo de valores distintos en caché (LRU)
+DATE_CACHE_SIZE = int(os.environ.get("DATE_CACHE_SIZE", "4096"))
+
+# Carga masiva (ver DatabaseManager.stage_dataframe): desde BULK_COPY_MIN_ROWS filas
+# se usa COPY FROM STDIN; por debajo, execute_values en lotes de BULK_INSERT_PAGE_SIZE
+BULK_COPY_MIN_ROWS = int(os.environ.get("BULK_COPY_MIN_ROWS", "2000"))
+BULK_INSERT_PAGE_SIZE = int(os.environ.get("BULK_INSERT_PAGE_SIZE", "1000"))
+
+# Componentes (regulations_component.components_id) de cada regulación nueva:
+# DEFAULT_COMPONENT_IDS aplica a todos los rtype_id y RTYPE_COMPONENT_IDS lo
+# reemplaza por tipo, con el formato "rtype:comp,comp;rtype:comp" (p.ej. "15:7,9;14:7";
+# "15:" = sin componentes)
+DEFAULT_COMPONENT_IDS = [int(component_id) for component_id in
+                         os.environ.get("DEFAULT_COMPONENT_IDS", "7").split(',') if component_id.strip()]
+RTYPE_COMPONENT_IDS = {
+    int(rtype_id): [int(component_id) for component_id in component_ids.split(',') if component_id.strip()]
+    for rtype_id, component_ids in (
+        entry.split(':', 1) for entry in os.environ.get("RTYPE_COMPONENT_IDS", "").split(';') if entry.strip()
+    )
+}
+
+# Índice local de content_hash para deduplicar sin leer la tabla (ver
+# src/key_index.py; '' = desactivado) y filas por consulta al sincronizarlo
+KEY_INDEX_PATH = os.environ.get("KEY_INDEX_PATH", "/tmp/ani_key_index")
+KEY_INDEX_SYNC_PAGE_SIZE = int(os.environ.get("KEY_INDEX_SYNC_PAGE_SIZE", "100000"))
+
+# Backend de parseo HTML: 'table' (solo <tbody>), 'lxml' o 'html.parser' (árbol completo)
+HTML_PARSER_BACKEND = os.environ.get("HTML_PARSER_BACKEND", "table")
+
+# Pipeline descarga/parseo: procesos de parseo (0 = parseo en los hilos de descarga)
+# y máximo de páginas en vuelo entre ambas etapas
+PARSE_MAX_WORKERS = int(os.environ.get("PARSE_MAX_WORKERS", "0"))
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "32"))
+
+# Pipeline en streaming: registros por bloque de validación y escritura
+STREAMING_CHUNK_SIZE = int(os.environ.get("STREAMING_CHUNK_SIZE", "1000"))
+
+# Backfill histórico por año (ver src/backfill.py)
+BACKFILL_CHECKPOINT_PATH = os.environ.get("BACKFILL_CHECKPOINT_PATH", "/tmp/ani_backfill_checkpoint.json")
+BACKFILL_SHARD_WORKERS = int(os.environ.get("BACKFILL_SHARD_WORKERS", "4"))
+BACKFILL_FETCH_WORKERS = int(os.environ.get("BACKFILL_FETCH_WORKERS", "2"))
+BACKFILL_MIN_YEAR = int(os.environ.get("BACKFILL_MIN_YEAR", "2000"))
+
 # Configuración de AWS Secrets Manager
 SECRET_NAME = os.environ.get("SECRET_NAME", "Test")
 REGION_NAME = os.environ.get("AWS_REGION", "us-east-1")
@@ -3,23 +3,75 @@ Módulo de Extracción (Scraping)
 Contiene toda la lógica de scraping de la página ANI.
 Mantiene intacta la lógica original sin cambios.
 """
+import os
+import hashlib
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 from datetime import datetime
 import re
+import queue
+import threading
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Any
 try:
-    from .config import ENTITY_VALUE, FIXED_CLASSIFICATION_ID
+    from .scheduler import get_fetch_scheduler
+    from .archive import get_http_archive, read_object, ARCHIVE_REPLAY
+    from .classification import get_classification_engine
+except ImportError:
+    from scheduler import get_fetch_scheduler
+    from archive import get_http_archive, read_object, ARCHIVE_REPLAY
+    from classification import get_classification_engine
+try:
+    from .config import (
+        ENTITY_VALUE, FIXED_CLASSIFICATION_ID, SCRAPING_MAX_WORKERS,
+        HTTP_TIMEOUT, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+        HTML_PARSER_BACKEND, PARSE_MAX_WORKERS, PIPELINE_QUEUE_SIZE,
+        DEFAULT_NORM_TYPE_ID, DATE_CACHE_SIZE, PAGE_RETRY_ROUNDS,
+    )
 except ImportError:
     # Para compatibilidad cuando se ejecuta como script independiente
     ENTITY_VALUE = 'Agencia Nacional de Infraestructura'
     FIXED_CLASSIFICATION_ID = 13
+    SCRAPING_MAX_WORKERS = 4
+    HTTP_TIMEOUT = 15
+    HTTP_POOL_CONNECTIONS = 4
+    HTTP_POOL_MAXSIZE = 16
+    HTML_PARSER_BACKEND = 'table'
+    PARSE_MAX_WORKERS = 0
+    PIPELINE_QUEUE_SIZE = 32
+    DEFAULT_NORM_TYPE_ID = 12
+    DATE_CACHE_SIZE = 4096
+    PAGE_RETRY_ROUNDS = 2
+
+# Brotli es opcional: urllib3 solo decodifica 'br' si el paquete está instalado
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# lxml es opcional: si no está instalado se usa el parser nativo de Python
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
 
 # Constantes para el scraping
-URL_BASE = "https://www.ani.gov.co/informacion-de-la-ani/normatividad?field_tipos_de_normas__tid=12&title=&body_value=&field_fecha__value%5Bvalue%5D%5Byear%5D="
+URL_TEMPLATE = "https://www.ani.gov.co/informacion-de-la-ani/normatividad?field_tipos_de_normas__tid={type_id}&title=&body_value=&field_fecha__value%5Bvalue%5D%5Byear%5D={year}"
+URL_BASE = URL_TEMPLATE.format(type_id=DEFAULT_NORM_TYPE_ID, year='')
 
-# Clasificaciones de documentos
+# Clasificaciones de documentos. Las reglas se leen de
+# configs/classification_rules.yaml (ver src/classification.py); este dict solo
+# se usa si no se encuentra ese archivo
 CLASSIFICATION_KEYWORDS = {
     'resolución': 15,
     'resolucion': 15,
@@ -28,24 +80,110 @@ CLASSIFICATION_KEYWORDS = {
 
 DEFAULT_RTYPE_ID = 14
 
+# Estados de una página scrapeada (ver scrape_page con with_status=True)
+PAGE_OK = 'ok'
+PAGE_EMPTY = 'empty'
+PAGE_UNCHANGED = 'unchanged'
+PAGE_ERROR = 'error'
+
+# Sesión HTTP compartida por todos los caminos de descarga (ver get_http_session)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session(pool_connections=None, pool_maxsize=None):
+    """
+    Devuelve la sesión HTTP compartida del módulo, creándola si no existe.
+    
+    La sesión reutiliza conexiones TCP/TLS (keep-alive) entre páginas y entre
+    scrape_multiple_pages y check_for_new_content, y negocia compresión
+    gzip/brotli. Es segura para usarse desde los hilos de scrape_multiple_pages.
+    
+    Args:
+        pool_connections (int): Número de pools por host (default: HTTP_POOL_CONNECTIONS)
+        pool_maxsize (int): Conexiones máximas por pool (default: HTTP_POOL_MAXSIZE).
+                            Debe ser >= max_workers para no descartar conexiones.
+    
+    Returns:
+        requests.Session: Sesión compartida
+    """
+    global _http_session
+    
+    if _http_session is not None and pool_connections is None and pool_maxsize is None:
+        return _http_session
+    
+    with _http_session_lock:
+        if _http_session is not None and pool_connections is None and pool_maxsize is None:
+            return _http_session
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or HTTP_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or HTTP_POOL_MAXSIZE,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+        })
+        
+        # Si se redimensiona el pool, cerrar la sesión anterior
+        if _http_session is not None:
+            _http_session.close()
+        _http_session = session
+        return _http_session
+
+
+def close_http_session():
+    """
+    Cierra la sesión HTTP compartida y libera sus conexiones.
+    """
+    global _http_session
+    
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+def build_page_url(page_num, year=None, type_id=None):
+    """
+    Construye la URL del listado para un número de página.
+    
+    Args:
+        page_num (int): Número de página
+        year (int): Si se indica, filtra el listado por año (field_fecha)
+        type_id (int): Tipo de norma (field_tipos_de_normas__tid).
+                       Default: DEFAULT_NORM_TYPE_ID
+    """
+    base_url = URL_TEMPLATE.format(
+        type_id=DEFAULT_NORM_TYPE_ID if type_id is None else type_id,
+        year='' if year is None else year,
+    )
+    if page_num == 0:
+        return base_url
+    return f"{base_url}&page={page_num}"
+
+
+# Comillas que se eliminan de títulos y resúmenes (las del diccionario y la
+# expresión regular de la versión original). Se recorren solo las que aparecen
+# en el texto: str.replace en C es más rápido que str.translate o re.sub.
+QUOTE_CHARS = (
+    '\u201C', '\u201D', '\u2018', '\u2019', '\u00AB', '\u00BB', '\u201E', '\u201A',
+    '\u2039', '\u203A', '"', "'", '\u00B4', '`', '\u2032', '\u2033',
+)
+
 
 # Función eliminar comillas
 def clean_quotes(text):
     if not text:
         return text
-    quotes_map = {
-        '\u201C': '', '\u2018': '', '\u2019': '', '\u00AB': '', '\u00BB': '',
-        '\u201E': '', '\u201A': '', '\u2039': '', '\u203A': '', '"': '',
-        "'": '', '´': '', '`': '', '′': '', '″': '',
-    }
-    cleaned_text = text
-    for quote_char, replacement in quotes_map.items():
-        cleaned_text = cleaned_text.replace(quote_char, replacement)
-    quotes_pattern = r'["\'\u201C\u201D\u2018\u2019\u00AB\u00BB\u201E\u201A\u2039\u203A\u2032\u2033]'
-    cleaned_text = re.sub(quotes_pattern, '', cleaned_text)
-    cleaned_text = cleaned_text.strip()
-    cleaned_text = ' '.join(cleaned_text.split())
-    return cleaned_text
+    for quote_char in QUOTE_CHARS:
+        if quote_char in text:
+            text = text.replace(quote_char, '')
+    # split() sin argumentos colapsa los espacios y recorta los extremos
+    return ' '.join(text.split())
 
 
 # Obtener el rtype_id basado en el título del documento
@@ -53,13 +191,14 @@ def get_rtype_id(title):
     """
     Obtiene el rtype_id basado en el título del documento.
     """
-    title_lower = title.lower()
-    
-    for keyword, rtype_id in CLASSIFICATION_KEYWORDS.items():
-        if keyword in title_lower:
-            return rtype_id
-    
-    return DEFAULT_RTYPE_ID
+    return get_classification_engine(CLASSIFICATION_KEYWORDS, DEFAULT_RTYPE_ID).classify(title)
+
+
+def get_rtype_ids(titles):
+    """
+    Obtiene el rtype_id de un lote de títulos en una sola pasada.
+    """
+    return get_classification_engine(CLASSIFICATION_KEYWORDS, DEFAULT_RTYPE_ID).classify_batch(titles)
 
 
 # Validar el campo created_at
@@ -87,6 +226,142 @@ def normalize_datetime(dt):
     return dt
 
 
+# Formatos aceptados para created_at: fecha y hora, o solo la fecha (se
+# toma el primer token del texto)
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_created_at(raw):
+    """
+    Normaliza la fecha cruda del listado a 'YYYY-MM-DD' cuando es posible.
+    
+    Las fechas se repiten mucho entre filas y páginas, así que el resultado se
+    memoriza (LRU acotado a DATE_CACHE_SIZE valores distintos).
+    
+    Args:
+        raw (str): Atributo content del span (ISO con 'T') o texto 'DD/MM/YYYY'
+    
+    Returns:
+        str: Fecha normalizada; el valor original si no tiene un formato conocido
+    """
+    if 'T' in raw:
+        return raw.split('T')[0]
+    if '/' in raw:
+        parts = raw.split('/')
+        if len(parts) != 3:
+            print(f"Fecha con formato no reconocido: '{raw}'")
+            return raw
+        day, month, year = parts
+        return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+    return raw
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_string(value):
+    try:
+        return datetime.strptime(value, DATETIME_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value.split()[0], DATE_FORMAT)
+    except ValueError:
+        # Se informa una sola vez por valor distinto gracias a la memoización
+        print(f"created_at no interpretable: '{value}'")
+        return None
+
+
+def parse_created_at(value):
+    """
+    Convierte un created_at (string 'YYYY-MM-DD' o 'YYYY-MM-DD HH:MM:SS',
+    o datetime) en un datetime naive. Retorna None si no se puede interpretar.
+    """
+    if isinstance(value, datetime):
+        return normalize_datetime(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return _parse_date_string(value)
+
+
+def parse_created_at_batch(values):
+    """
+    Versión vectorizada de parse_created_at para una lista o columna.
+    
+    Usa pd.to_datetime con los formatos explícitos (DATETIME_FORMAT y luego
+    DATE_FORMAT sobre el primer token), sin inferencia de formato.
+    
+    Args:
+        values (iterable): Valores de created_at (str, datetime o None)
+    
+    Returns:
+        tuple: (pd.Series de fechas naive con NaT donde no hay fecha,
+                lista de valores no vacíos que no se pudieron interpretar)
+    """
+    series = pd.Series(list(values), dtype=object)
+    if series.empty:
+        return pd.Series([], dtype='datetime64[ns]'), []
+    
+    is_text = series.map(lambda value: isinstance(value, str) and bool(value.strip()))
+    text = series.where(is_text)
+    
+    # Sin espacios solo puede ser una fecha sin hora (y su primer token es el
+    # propio valor): se evita el intento fallido con DATETIME_FORMAT
+    has_space = text.str.contains(r'\s', regex=True, na=False)
+    parsed = pd.to_datetime(text.where(~has_space), format=DATE_FORMAT, errors='coerce')
+    if has_space.any():
+        with_time = pd.to_datetime(text[has_space], format=DATETIME_FORMAT, errors='coerce')
+        date_only = pd.to_datetime(text[has_space].str.split().str[0], format=DATE_FORMAT,
+                                   errors='coerce')
+        parsed[has_space] = with_time.fillna(date_only)
+    
+    # Valores datetime (p.ej. leídos de la BD): se normalizan uno a uno
+    is_datetime = series.map(lambda value: isinstance(value, datetime))
+    if is_datetime.any():
+        parsed[is_datetime] = [normalize_datetime(value) for value in series[is_datetime]]
+    
+    unparseable = series[parsed.isna() & is_text].tolist()
+    return parsed, unparseable
+
+
+def report_unparseable_dates(unparseable, context):
+    """
+    Informa los created_at que no se pudieron interpretar (en lugar de ignorarlos).
+    """
+    if unparseable:
+        examples = ', '.join(repr(value) for value in list(dict.fromkeys(unparseable))[:3])
+        print(f"{context}: {len(unparseable)} fechas no interpretables (p.ej. {examples})")
+
+
+def get_latest_db_date(db_manager, entity=ENTITY_VALUE, type_id=None):
+    """
+    Obtiene la fecha de creación más reciente almacenada para una entidad
+    (marca de agua para el scraping incremental).
+    
+    Args:
+        db_manager: Instancia de DatabaseManager
+        entity (str): Entidad
+        type_id (int): Si se indica, solo considera ese tipo de norma. Los
+                       registros sin norm_type_id (anteriores a la columna) se
+                       cuentan como DEFAULT_NORM_TYPE_ID
+    
+    Returns:
+        datetime: Fecha más reciente (naive) o None si no hay registros
+    """
+    if type_id is None:
+        query = "SELECT MAX(created_at) FROM regulations WHERE entity = %s"
+        result = db_manager.execute_query(query, (entity,))
+    else:
+        query = ("SELECT MAX(created_at) FROM regulations "
+                 "WHERE entity = %s AND COALESCE(norm_type_id, %s) = %s")
+        result = db_manager.execute_query(query, (entity, DEFAULT_NORM_TYPE_ID, type_id))
+    
+    if not result or not result[0][0]:
+        return None
+    
+    return parse_created_at(result[0][0])
+
+
 def extract_title_and_link(row, norma_data, verbose, row_num):
     """
     Extrae título y enlace de una fila
@@ -162,16 +437,7 @@ def extract_creation_date(row, norma_data, verbose, row_num):
         if fecha_span:
             created_at_raw = fecha_span.get('content', fecha_span.get_text(strip=True))
             # Procesar diferentes formatos de fecha
-            if 'T' in created_at_raw:
-                norma_data['created_at'] = created_at_raw.split('T')[0]
-            elif '/' in created_at_raw:
-                try:
-                    day, month, year = created_at_raw.split('/')
-                    norma_data['created_at'] = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                except:
-                    norma_data['created_at'] = created_at_raw
-            else:
-                norma_data['created_at'] = created_at_raw
+            norma_data['created_at'] = normalize_created_at(created_at_raw)
         else:
             norma_data['created_at'] = fecha_cell.get_text(strip=True)
     else:
@@ -186,121 +452,978 @@ def extract_creation_date(row, norma_data, verbose, row_num):
     return True
 
 
-def scrape_page(page_num, verbose=False):
+def _find_tbody_html_parser(content):
+    # Árbol completo de la página con el parser nativo (comportamiento original)
+    return BeautifulSoup(content, 'html.parser').find('tbody')
+
+
+def _find_tbody_lxml(content):
+    # Árbol completo de la página construido con lxml (C)
+    return BeautifulSoup(content, 'lxml').find('tbody')
+
+
+_TBODY_STRAINER = SoupStrainer('tbody')
+
+
+def _find_tbody_table(content):
+    # Solo se construye el subárbol de <tbody>: navegación, menús y pie de
+    # página del sitio Drupal se descartan durante el parseo
+    soup = BeautifulSoup(content, 'lxml' if HAS_LXML else 'html.parser',
+                         parse_only=_TBODY_STRAINER)
+    return soup.find('tbody')
+
+
+# Backends de parseo disponibles. Todos devuelven el mismo <tbody> como Tag de
+# BeautifulSoup, así que las funciones extract_* producen registros idénticos.
+PARSER_BACKENDS = {
+    'html.parser': _find_tbody_html_parser,
+    'lxml': _find_tbody_lxml,
+    'table': _find_tbody_table,
+}
+
+
+def get_parser_backend(name=None):
     """
-    Scrapea una página específica de ANI
+    Obtiene la función de parseo para un backend.
     
     Args:
-        page_num (int): Número de página a scrapear
+        name (str): 'html.parser', 'lxml' o 'table' (default: HTML_PARSER_BACKEND)
+    
+    Returns:
+        callable: Función content -> Tag <tbody> (o None si no hay tabla)
+    """
+    name = name or HTML_PARSER_BACKEND
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Backend de parseo desconocido: {name}. "
+                         f"Disponibles: {list(PARSER_BACKENDS)}")
+    if name == 'lxml' and not HAS_LXML:
+        print("lxml no disponible, usando html.parser")
+        name = 'html.parser'
+    return PARSER_BACKENDS[name]
+
+
+# Prefijo de las huellas de contenido: las huellas guardadas con otro formato
+# (hash del HTML serializado) no cuentan como filas editadas
+ROW_FINGERPRINT_PREFIX = 'c1:'
+
+
+def row_fingerprint(row):
+    """
+    Calcula la clave y la huella de una fila <tr> sin extraer sus campos.
+    
+    La huella es un hash del contenido ya parseado de la fila (textos, enlaces
+    y fechas) y no de su HTML serializado, que depende de cómo cada backend de
+    parseo repara el HTML mal formado: es la misma con PARSER_BACKENDS.
+    
+    Returns:
+        tuple: (clave, huella). La clave es el primer enlace de la fila (el de
+               la norma); la huella, ROW_FINGERPRINT_PREFIX + hash del contenido.
+    """
+    links = [link['href'] for link in row.find_all('a', href=True)]
+    dates = [span['content'] for span in row.find_all('span', content=True)]
+    content = '\x1f'.join([*row.stripped_strings, '\x1e', *links, '\x1e', *dates])
+    fingerprint = ROW_FINGERPRINT_PREFIX + hashlib.blake2b(content.encode('utf-8'),
+                                                           digest_size=16).hexdigest()
+    return (links[0] if links else fingerprint), fingerprint
+
+
+def parse_page_html(content, page_num, verbose=False, parser_backend=None, type_id=None):
+    """
+    Parsea el HTML de una página del listado y extrae sus registros.
+    
+    Args:
+        content (bytes|str): HTML de la página
+        page_num (int): Número de página (para logs)
         verbose (bool): Si mostrar logs detallados
+        parser_backend (str): Backend de parseo (ver PARSER_BACKENDS)
+        type_id (int): Tipo de norma del listado, se guarda en 'norm_type_id'
+                       (default: DEFAULT_NORM_TYPE_ID)
     
     Returns:
-        list: Lista de diccionarios con los datos extraídos
+        tuple: (estado, lista de diccionarios) con estado PAGE_OK o PAGE_EMPTY
+    """
+    status, page_data, _ = parse_page_changes(content, page_num, None, verbose,
+                                              parser_backend, type_id)
+    return status, page_data
+
+
+def parse_page_changes(content, page_num, known_rows=None, verbose=False, parser_backend=None,
+                       type_id=None):
+    """
+    Igual que parse_page_html, pero descarta antes de extraer sus campos las
+    filas cuya huella ya está en known_rows (ver RowFingerprintStore).
+    
+    Args:
+        known_rows (dict): Huellas conocidas {clave: huella} (None = no filtrar)
+    
+    Returns:
+        tuple: (estado, registros nuevos, cambios) donde cambios es
+               {'skipped': filas ya vistas, 'new': filas nuevas,
+                'fingerprints': {clave: huella} a guardar,
+                'edited': registros de filas conocidas con otra huella}
+    """
+    norm_type_id = DEFAULT_NORM_TYPE_ID if type_id is None else type_id
+    row_changes = {'skipped': 0, 'new': 0, 'fingerprints': {}, 'edited': []}
+
+    tbody = get_parser_backend(parser_backend)(content)
+    
+    if not tbody:
+        if verbose:
+            print(f"No se encontró tabla en página {page_num}")
+        return PAGE_EMPTY, [], row_changes
+    
+    rows = tbody.find_all('tr')
+    if verbose:
+        print(f"Encontradas {len(rows)} filas en página {page_num}")
+    
+    if not rows:
+        return PAGE_EMPTY, [], row_changes
+    
+    # Procesar filas (una sola marca de actualización para toda la página)
+    update_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    page_data = []
+    for i, row in enumerate(rows, 1):
+        try:
+            edited = False
+            if known_rows is not None:
+                row_key, fingerprint = row_fingerprint(row)
+                known_fingerprint = known_rows.get(row_key)
+                if known_fingerprint == fingerprint:
+                    row_changes['skipped'] += 1
+                    continue
+                # Se guarda también la huella de filas descartadas por las
+                # validaciones, para no volver a extraerlas
+                row_changes['fingerprints'][row_key] = fingerprint
+                edited = (known_fingerprint is not None
+                          and known_fingerprint.startswith(ROW_FINGERPRINT_PREFIX))
+            
+            # Estructura base del registro
+            norma_data = {
+                'created_at': None,
+                'update_at': update_at,
+                'is_active': True,
+                'title': None,
+                'gtype': None,
+                'entity': ENTITY_VALUE,
+                'external_link': None,
+                'rtype_id': None,
+                'summary': None,
+                'classification_id': FIXED_CLASSIFICATION_ID,
+                'norm_type_id': norm_type_id,
+            }
+            
+            # Extraer datos
+            if not extract_title_and_link(row, norma_data, verbose, i):
+                continue
+            
+            extract_summary(row, norma_data)
+            
+            if not extract_creation_date(row, norma_data, verbose, i):
+                continue
+            
+            if edited:
+                row_changes['edited'].append(norma_data)
+            else:
+                row_changes['new'] += 1
+                page_data.append(norma_data)
+            
+        except Exception as e:
+            if verbose:
+                print(f"Error procesando fila {i} en página {page_num}: {str(e)}")
+            continue
+    
+    # Establecer rtype_id basado en título, para toda la página a la vez
+    classified = page_data + row_changes['edited']
+    for norma_data, rtype_id in zip(classified, get_rtype_ids([r['title'] for r in classified])):
+        norma_data['rtype_id'] = rtype_id
+    
+    return PAGE_OK, page_data, row_changes
+
+
+# Huellas conocidas dentro de cada proceso del pool de parseo (ver iter_pages_pipelined)
+_worker_known_rows = None
+
+
+def _init_parse_worker(known_rows):
+    global _worker_known_rows
+    _worker_known_rows = known_rows
+
+
+def _parse_page_in_worker(content, page_num, verbose, parser_backend, type_id):
+    return parse_page_changes(content, page_num, _worker_known_rows, verbose, parser_backend, type_id)
+
+
+_YEAR_SELECT_NAME = 'field_fecha__value[value][year]'
+_NORM_TYPE_SELECT_NAME = 'field_tipos_de_normas__tid'
+_PAGER_STRAINER = SoupStrainer('ul', class_='pager')
+_PAGE_PARAM_PATTERN = re.compile(r'[?&]page=(\d+)')
+
+
+def parse_select_options(content, select_name):
+    """
+    Obtiene los valores numéricos de un filtro <select> del listado.
+    
+    Args:
+        content (bytes|str): HTML de una página del listado
+        select_name (str): Atributo name del <select>
+    
+    Returns:
+        list: Valores (int) ordenados de mayor a menor; vacía si no existe el filtro
+    """
+    strainer = SoupStrainer('select', attrs={'name': select_name})
+    soup = BeautifulSoup(content, 'lxml' if HAS_LXML else 'html.parser', parse_only=strainer)
+    select = soup.find('select')
+    if not select:
+        return []
+    
+    values = set()
+    for option in select.find_all('option'):
+        value = (option.get('value') or '').strip()
+        if value.isdigit():
+            values.add(int(value))
+    return sorted(values, reverse=True)
+
+
+def parse_year_options(content):
+    """
+    Obtiene los años disponibles en el filtro field_fecha del listado,
+    ordenados de más reciente a más antiguo.
+    """
+    return parse_select_options(content, _YEAR_SELECT_NAME)
+
+
+def parse_norm_type_options(content):
+    """
+    Obtiene los tipos de norma (tid) del filtro field_tipos_de_normas del listado.
+    """
+    return sorted(parse_select_options(content, _NORM_TYPE_SELECT_NAME))
+
+
+def parse_page_count(content):
+    """
+    Calcula el número de páginas del listado a partir del paginador de Drupal.
+    
+    Args:
+        content (bytes|str): HTML de la página 0 del listado
+    
+    Returns:
+        int: Número de páginas (1 si no hay paginador, 0 si no hay tabla)
+    """
+    parser = 'lxml' if HAS_LXML else 'html.parser'
+    pager = BeautifulSoup(content, parser, parse_only=_PAGER_STRAINER)
+    
+    last_page = -1
+    for link in pager.find_all('a', href=True):
+        match = _PAGE_PARAM_PATTERN.search(link['href'])
+        if match:
+            last_page = max(last_page, int(match.group(1)))
+    
+    if last_page >= 0:
+        return last_page + 1
+    return 1 if get_parser_backend('table')(content) else 0
+
+
+def fetch_page(page_num, verbose=False, validator_store=None, year=None, type_id=None):
+    """
+    Descarga el HTML de una página del listado, sin parsearlo.
+    
+    Args:
+        page_num (int): Número de página a descargar
+        verbose (bool): Si mostrar logs detallados
+        validator_store (HttpValidatorStore): Solicitudes condicionales (ver scrape_page)
+        year (int): Filtro de año del listado (ver build_page_url)
+        type_id (int): Tipo de norma del listado (ver build_page_url)
+    
+    Returns:
+        tuple: (estado, response) con estado PAGE_OK, PAGE_UNCHANGED (304) o
+               PAGE_ERROR; response es None salvo en PAGE_OK
     """
     # Construir URL de la página
-    if page_num == 0:
-        page_url = URL_BASE
-    else:
-        page_url = f"{URL_BASE}&page={page_num}"
+    page_url = build_page_url(page_num, year=year, type_id=type_id)
     
     if verbose:
         print(f"Scrapeando página {page_num}: {page_url}")
     
+    archive = get_http_archive()
+    if archive is not None and archive.mode == ARCHIVE_REPLAY:
+        # Reproducción: la página se sirve desde el disco, sin red
+        try:
+            response = archive.get(page_url)
+        except OSError as e:
+            print(f"Error leyendo página {page_num} del archivo: {e}")
+            return PAGE_ERROR, None
+        if response is None:
+            print(f"Página {page_num} no está en el archivo HTTP")
+            return PAGE_ERROR, None
+        return PAGE_OK, response
+    
     try:
-        # Realizar solicitud HTTP
-        response = requests.get(page_url, timeout=15)
-        response.raise_for_status()
-        
-        # Parsear HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-        tbody = soup.find('tbody')
+        # Realizar solicitud HTTP (condicional si hay validadores guardados)
+        headers = validator_store.conditional_headers(page_url) if validator_store else None
+        # El planificador limita la tasa y reintenta 429/5xx/timeouts con backoff
+        response = get_fetch_scheduler().request(get_http_session(), page_url,
+                                                 timeout=HTTP_TIMEOUT, headers=headers)
         
-        if not tbody:
+        if response.status_code == 304:
             if verbose:
-                print(f"No se encontró tabla en página {page_num}")
-            return []
-        
-        rows = tbody.find_all('tr')
-        if verbose:
-            print(f"Encontradas {len(rows)} filas en página {page_num}")
+                print(f"Página {page_num} sin cambios desde la última ejecución (304)")
+            return PAGE_UNCHANGED, None
         
-        # Procesar filas
-        page_data = []
-        for i, row in enumerate(rows, 1):
+        response.raise_for_status()
+        if archive is not None:
             try:
-                # Estructura base del registro
-                norma_data = {
-                    'created_at': None,
-                    'update_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'is_active': True,
-                    'title': None,
-                    'gtype': None,
-                    'entity': ENTITY_VALUE,
-                    'external_link': None,
-                    'rtype_id': None,
-                    'summary': None,
-                    'classification_id': FIXED_CLASSIFICATION_ID,
-                }
-                
-                # Extraer datos
-                if not extract_title_and_link(row, norma_data, verbose, i):
-                    continue
-                
-                extract_summary(row, norma_data)
-                
-                if not extract_creation_date(row, norma_data, verbose, i):
-                    continue
-                
-                # Establecer rtype_id basado en título
-                norma_data['rtype_id'] = get_rtype_id(norma_data['title'])
-                
-                page_data.append(norma_data)
-                
-            except Exception as e:
-                if verbose:
-                    print(f"Error procesando fila {i} en página {page_num}: {str(e)}")
-                continue
-        
-        return page_data
+                archive.record(page_url, response, page_num=page_num, year=year, type_id=type_id)
+            except OSError as e:
+                print(f"No se pudo archivar la página {page_num}: {e}")
+        return PAGE_OK, response
         
     except requests.RequestException as e:
         print(f"Error HTTP en página {page_num}: {e}")
-        return []
+        return PAGE_ERROR, None
+
+
+def take_cached_page(page_num, page_cache=None, verbose=False):
+    """
+    Retira de la caché de la ejecución el resultado ya procesado de una página
+    (p.ej. por check_for_new_content), para no descargarla ni parsearla otra vez.
+    
+    Args:
+        page_cache (dict): Caché de la ejecución {página: (estado, registros)}
+    
+    Returns:
+        tuple: (estado, registros), o None si la página no está en la caché
+    """
+    cached = page_cache.pop(page_num, None) if page_cache is not None else None
+    if cached is not None and verbose:
+        print(f"Página {page_num} reutilizada de la caché de la ejecución")
+    return cached
+
+
+def scrape_page(page_num, verbose=False, validator_store=None, with_status=False, year=None,
+                type_id=None, row_store=None, page_cache=None):
+    """
+    Scrapea una página específica de ANI
+    
+    Args:
+        page_num (int): Número de página a scrapear
+        verbose (bool): Si mostrar logs detallados
+        validator_store (HttpValidatorStore): Si se proporciona, se envía una
+            solicitud condicional (ETag / If-Modified-Since). Ante un 304 la
+            página no se descarga ni se parsea.
+        with_status (bool): Si True, retorna (estado, datos) donde estado es
+            PAGE_OK, PAGE_EMPTY (sin filas), PAGE_UNCHANGED (304) o PAGE_ERROR
+        year (int): Filtro de año del listado (ver build_page_url)
+        type_id (int): Tipo de norma del listado (ver build_page_url)
+        row_store (RowFingerprintStore): Si se proporciona, se omiten las filas
+            ya vistas y las editadas se registran en el almacén en lugar de
+            devolverse como nuevas
+        page_cache (dict): Caché de la ejecución con páginas ya procesadas con el
+            mismo validator_store y row_store (ver take_cached_page)
+    
+    Returns:
+        list: Lista de diccionarios con los datos extraídos
+              (o tupla (estado, lista) si with_status=True)
+    """
+    def _result(status, data):
+        return (status, data) if with_status else data
+    
+    cached = take_cached_page(page_num, page_cache, verbose)
+    if cached is not None:
+        return _result(*cached)
+    
+    try:
+        status, response = fetch_page(page_num, verbose=verbose, validator_store=validator_store,
+                                      year=year, type_id=type_id)
+        if status != PAGE_OK:
+            return _result(status, [])
+        
+        # Parsear HTML
+        known_rows = row_store.known if row_store is not None else None
+        status, page_data, row_changes = parse_page_changes(response.content, page_num, known_rows,
+                                                            verbose=verbose, type_id=type_id)
+        if row_store is not None:
+            row_store.apply(row_changes)
+        
+        # Solo se registran validadores de páginas procesadas completamente
+        if validator_store and status == PAGE_OK:
+            validator_store.stage(build_page_url(page_num, year=year, type_id=type_id), response.headers)
+        
+        return _result(status, page_data)
+        
     except Exception as e:
         print(f"Error procesando página {page_num}: {e}")
-        return []
+        return _result(PAGE_ERROR, [])
+
+
+def iter_pages_pipelined(page_nums, verbose=False, fetch_workers=None, parse_workers=None,
+                         queue_size=None, validator_store=None, page_cache=None,
+                         parser_backend=None, year=None, type_id=None, row_store=None):
+    """
+    Pipeline de dos etapas: descarga con hilos y parseo en un pool de procesos.
+    
+    Los hilos de E/S descargan el HTML crudo y lo dejan en una cola acotada;
+    el hilo principal envía cada página al pool de procesos (parse_page_html,
+    limitado por CPU y el GIL) y entrega los resultados en orden de página.
+    Como nunca hay más de queue_size páginas en vuelo (descargando, en cola,
+    parseando o esperando su turno), la memoria se mantiene constante aunque
+    el recorrido tenga miles de páginas.
+    
+    Args:
+        page_nums (iterable): Números de página a procesar, en orden
+        verbose (bool): Si mostrar logs detallados
+        fetch_workers (int): Hilos de descarga (default: SCRAPING_MAX_WORKERS)
+        parse_workers (int): Procesos de parseo (default: PARSE_MAX_WORKERS).
+                           Con 0 se parsea en los hilos de descarga, sin pool de
+                           procesos, conservando el orden y la memoria acotada.
+        queue_size (int): Máximo de páginas en vuelo (default: PIPELINE_QUEUE_SIZE)
+        validator_store (HttpValidatorStore): Solicitudes condicionales (ver scrape_page)
+        page_cache (dict): Caché de la ejecución {página: (estado, registros)} (ver take_cached_page)
+        parser_backend (str): Backend de parseo (ver PARSER_BACKENDS)
+        year (int): Filtro de año del listado (ver build_page_url)
+        type_id (int): Tipo de norma del listado (ver build_page_url)
+        row_store (RowFingerprintStore): Filtro de filas ya vistas (ver scrape_page).
+                           Cada proceso de parseo recibe una copia de las huellas
+                           al iniciarse.
+    
+    Yields:
+        tuple: (página, estado, lista de diccionarios) en orden de página
+    """
+    page_nums = list(page_nums)
+    if not page_nums:
+        return
+    
+    fetch_workers = max(1, fetch_workers or SCRAPING_MAX_WORKERS)
+    if parse_workers is None:
+        parse_workers = PARSE_MAX_WORKERS
+    queue_size = max(1, queue_size or PIPELINE_QUEUE_SIZE)
+    # Los envíos al pool de procesos se acotan para no serializar toda la cola a la vez
+    max_inflight = max(1, parse_workers * 2)
+    
+    raw_queue = queue.Queue(maxsize=queue_size)
+    window = threading.Semaphore(queue_size)
+    stop = threading.Event()
+    
+    def _fetch(page_num):
+        # Etapa 1 (hilos): descargar sin parsear. Nunca lanza excepciones.
+        try:
+            cached = take_cached_page(page_num, page_cache, verbose)
+            if cached is not None:
+                raw_queue.put((page_num, cached[0], None, None, cached[1]))
+                return
+            status, response = fetch_page(page_num, verbose=verbose, validator_store=validator_store,
+                                          year=year, type_id=type_id)
+            if status == PAGE_OK and parse_pool is None:
+                # Sin pool de procesos: parsear aquí mismo
+                status, records, row_changes = parse_page_changes(response.content, page_num,
+                                                                  known_rows, verbose,
+                                                                  parser_backend, type_id)
+                if row_store is not None:
+                    row_store.apply(row_changes)
+                if validator_store and status == PAGE_OK:
+                    validator_store.stage(build_page_url(page_num, year=year, type_id=type_id), response.headers)
+                raw_queue.put((page_num, status, None, None, records))
+            elif status == PAGE_OK:
+                raw_queue.put((page_num, status, response.content, response.headers, None))
+            else:
+                raw_queue.put((page_num, status, None, None, []))
+        except Exception as e:
+            print(f"Error descargando página {page_num}: {e}")
+            raw_queue.put((page_num, PAGE_ERROR, None, None, []))
+    
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix='ani-fetch')
+    known_rows = row_store.known if row_store is not None else None
+    parse_pool = None
+    if parse_workers > 0:
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers, initializer=_init_parse_worker,
+                                         initargs=(row_store.snapshot() if row_store is not None else None,))
+    
+    def _feed():
+        # Encola descargas en orden sin superar la ventana de páginas en vuelo
+        for page_num in page_nums:
+            while not window.acquire(timeout=0.1):
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                return
+            fetch_pool.submit(_fetch, page_num)
+    
+    feeder = threading.Thread(target=_feed, name='ani-feeder', daemon=True)
+    feeder.start()
+    
+    done = {}       # página -> (estado, datos), pendiente de entregar en orden
+    inflight = {}   # future de parseo -> (página, headers)
+    next_idx = 0
+    
+    try:
+        while next_idx < len(page_nums):
+            # Entregar en orden lo que ya está listo
+            while next_idx < len(page_nums) and page_nums[next_idx] in done:
+                page_num = page_nums[next_idx]
+                status, records = done.pop(page_num)
+                next_idx += 1
+                window.release()
+                yield page_num, status, records
+            if next_idx >= len(page_nums):
+                break
+            
+            # Etapa 2: pasar HTML crudo al pool de procesos. Solo se bloquea en la
+            # cola si no hay parseos pendientes que esperar.
+            if len(inflight) < max_inflight:
+                try:
+                    item = raw_queue.get() if not inflight else raw_queue.get_nowait()
+                except queue.Empty:
+                    item = None
+                if item is not None:
+                    page_num, status, content, headers, records = item
+                    if content is None:
+                        done[page_num] = (status, records)
+                    else:
+                        future = parse_pool.submit(_parse_page_in_worker, content, page_num,
+                                                   verbose, parser_backend, type_id)
+                        inflight[future] = (page_num, headers)
+                    continue
+            
+            finished, _ = wait(inflight, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in finished:
+                page_num, headers = inflight.pop(future)
+                try:
+                    status, records, row_changes = future.result()
+                    if row_store is not None:
+                        row_store.apply(row_changes)
+                except Exception as e:
+                    print(f"Error procesando página {page_num}: {e}")
+                    status, records = PAGE_ERROR, []
+                if validator_store and status == PAGE_OK:
+                    validator_store.stage(build_page_url(page_num, year=year, type_id=type_id), headers)
+                done[page_num] = (status, records)
+    finally:
+        stop.set()
+        # Liberar huecos por si el alimentador o algún hilo quedaron esperando
+        for _ in range(len(page_nums)):
+            window.release()
+        while True:
+            try:
+                raw_queue.get_nowait()
+            except queue.Empty:
+                break
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def retry_failed_pages(failed, scrape_fn, rounds=None):
+    """
+    Reencola con backoff las páginas que siguen en PAGE_ERROR después de los
+    reintentos en línea del planificador (ver FetchScheduler.requeue_delay).
+    Las páginas se reintentan de a una, para no volver a saturar el sitio.
+    
+    Args:
+        failed (iterable): Páginas (o claves) con error
+        scrape_fn (callable): clave -> (estado, registros)
+        rounds (int): Rondas de reencolado (default: PAGE_RETRY_ROUNDS)
+    
+    Returns:
+        dict: {clave: (estado, registros)} con el último resultado de cada
+              página reintentada; las que siguen en PAGE_ERROR se deben reportar
+    """
+    rounds = PAGE_RETRY_ROUNDS if rounds is None else rounds
+    results = {}
+    pending = list(failed)
+    
+    for retry_round in range(1, rounds + 1):
+        if not pending:
+            break
+        delay = get_fetch_scheduler().requeue_delay(retry_round)
+        print(f"Reencolando {len(pending)} páginas con error en {delay:.1f}s "
+              f"(ronda {retry_round}/{rounds}): {pending}")
+        time.sleep(delay)
+        still_failed = []
+        for key in pending:
+            results[key] = scrape_fn(key)
+            if results[key][0] == PAGE_ERROR:
+                still_failed.append(key)
+        pending = still_failed
+    
+    if pending:
+        print(f"ADVERTENCIA: {len(pending)} páginas siguen con error tras {rounds} "
+              f"rondas de reencolado: {pending}")
+    return results
 
 
-def scrape_multiple_pages(num_pages, start_page=0, verbose=False):
+def get_failed_pages(page_statuses):
+    """
+    Devuelve, ordenadas, las páginas de page_statuses que terminaron en PAGE_ERROR.
+    """
+    return sorted(page for page, status in page_statuses.items() if status == PAGE_ERROR)
+
+
+def scrape_multiple_pages(num_pages, start_page=0, verbose=False, max_workers=None,
+                          validator_store=None, page_statuses=None, page_cache=None,
+                          parse_workers=None, type_id=None, row_store=None, collector=None):
     """
     Scrapea múltiples páginas de ANI
     
+    Las páginas se descargan en paralelo con un número acotado de hilos, pero
+    los resultados se devuelven siempre en orden de página, igual que en la
+    versión secuencial. Cada página sigue aislada en scrape_page: si una falla,
+    el resto continúa, y al final las páginas con error se reencolan con
+    backoff (ver retry_failed_pages); sus registros se agregan al final. Las
+    que no se recuperan quedan en page_statuses con PAGE_ERROR (ver
+    get_failed_pages) para que el llamador no las pierda en silencio.
+    
     Args:
         num_pages (int): Número de páginas a scrapear
         start_page (int): Página inicial (default: 0)
         verbose (bool): Si mostrar logs detallados
+        max_workers (int): Máximo de páginas simultáneas.
+                           Si es None, usa SCRAPING_MAX_WORKERS; 1 = secuencial
+        validator_store (HttpValidatorStore): Almacén de validadores para
+                           solicitudes condicionales (ver scrape_page)
+        page_statuses (dict): Si se proporciona, se llena con {página: estado}
+                           para que el llamador distinga páginas sin cambios
+        page_cache (dict): Caché de la ejecución {página: (estado, registros)},
+                           compartida con check_for_new_content. Las páginas
+                           presentes ya pasaron por el filtro de huellas y se
+                           reutilizan sin descargarlas ni parsearlas de nuevo.
+        parse_workers (int): Si es > 0, el parseo se hace en un pool de procesos
+                           separado de la descarga (ver iter_pages_pipelined).
+                           Si es None, usa PARSE_MAX_WORKERS (0 = desactivado).
+        type_id (int): Tipo de norma del listado (ver build_page_url)
+        row_store (RowFingerprintStore): Filtro de filas ya vistas (ver scrape_page)
+        collector: Contenedor donde acumular los registros (p.ej. RecordColumns,
+                           para no retener un dict por registro). Si es None, una lista.
     
     Returns:
-        list: Lista de diccionarios con todos los datos extraídos
+        list: Lista de diccionarios con todos los datos extraídos (o collector)
     """
-    all_normas_data = []
+    all_normas_data = [] if collector is None else collector
+    
+    if num_pages <= 0:
+        return all_normas_data
     
     end_page = start_page + num_pages - 1
+    page_nums = list(range(start_page, end_page + 1))
+    
+    if max_workers is None:
+        max_workers = SCRAPING_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(page_nums)))
     
-    for page_num in range(start_page, end_page + 1):
+    def _scrape(page_num):
         if verbose:
             print(f"Procesando página {page_num}...")
-        page_data = scrape_page(page_num, verbose=verbose)
+        return scrape_page(page_num, verbose=verbose, validator_store=validator_store,
+                           with_status=True, type_id=type_id, row_store=row_store,
+                           page_cache=page_cache)
+    
+    if parse_workers is None:
+        parse_workers = PARSE_MAX_WORKERS
+    
+    executor = None
+    if parse_workers and parse_workers > 0:
+        pages_data = (
+            (status, page_data)
+            for _, status, page_data in iter_pages_pipelined(
+                page_nums, verbose=verbose, fetch_workers=max_workers,
+                parse_workers=parse_workers, validator_store=validator_store,
+                page_cache=page_cache, type_id=type_id, row_store=row_store)
+        )
+    elif max_workers == 1:
+        pages_data = map(_scrape, page_nums)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ani-scraper')
+        # executor.map conserva el orden de entrada
+        pages_data = executor.map(_scrape, page_nums)
+    
+    statuses = {}
+    try:
+        for page_num, (status, page_data) in zip(page_nums, pages_data):
+            statuses[page_num] = status
+            all_normas_data.extend(page_data)
+            
+            # Indicador de progreso cada 3 páginas
+            if (page_num + 1) % 3 == 0:
+                print(f"Procesadas {page_num + 1}/{num_pages} páginas. Encontrados {len(all_normas_data)} registros válidos.")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    # Reencolar las páginas que agotaron los reintentos del planificador
+    for page_num, (status, page_data) in retry_failed_pages(get_failed_pages(statuses), _scrape).items():
+        statuses[page_num] = status
+        all_normas_data.extend(page_data)
+    
+    if page_statuses is not None:
+        page_statuses.update(statuses)
+    
+    return all_normas_data
+
+
+def _parse_archived_page(args):
+    # Se ejecuta en el pool de procesos: recibe solo la ruta y el hash, y lee
+    # y descomprime el HTML en el propio proceso
+    path, sha256, page_num, type_id, parser_backend = args
+    try:
+        return parse_page_html(read_object(path, sha256), page_num, False, parser_backend, type_id)
+    except Exception as e:
+        print(f"Error procesando página archivada {page_num} ({sha256[:12]}): {e}")
+        return PAGE_ERROR, []
+
+
+def replay_archive(archive, type_ids=None, years=None, parse_workers=None, parser_backend=None,
+                   page_statuses=None):
+    """
+    Reprocesa todas las páginas de un archivo HTTP sin acceder a la red.
+    
+    Cada página se lee, descomprime y parsea en un pool de procesos, por lo que
+    el reproceso queda limitado por CPU y disco local.
+    
+    Args:
+        archive (HttpArchive): Archivo grabado con HTTP_ARCHIVE_MODE='record'
+        type_ids (iterable): Tipos de norma a incluir (None = todos)
+        years (iterable): Años a incluir (None = todos, incluidas las páginas sin filtro de año)
+        parse_workers (int): Procesos de parseo (None = núcleos disponibles, 0 = sin pool)
+        parser_backend (str): Backend de parseo (ver PARSER_BACKENDS)
+        page_statuses (dict): Si se proporciona, se llena con {url: estado}
+    
+    Returns:
+        list: Lista de diccionarios con los datos extraídos, ordenados por tipo
+              de norma, año y página
+    """
+    type_ids = set(type_ids) if type_ids is not None else None
+    years = set(years) if years is not None else None
+    
+    entries = [
+        entry for entry in archive.entries()
+        if (type_ids is None or entry.get('type_id') in type_ids)
+        and (years is None or entry.get('year') in years)
+    ]
+    entries.sort(key=lambda entry: (entry.get('type_id') or 0, -(entry.get('year') or 0),
+                                    entry.get('page_num') or 0))
+    tasks = [(archive.path, entry['sha256'], entry.get('page_num') or 0, entry.get('type_id'),
+              parser_backend) for entry in entries]
+    
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    
+    print(f"Reprocesando {len(tasks)} páginas archivadas con {parse_workers} procesos")
+    all_normas_data = []
+    if parse_workers > 0 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            # chunksize agrupa varias páginas por envío para reducir la serialización
+            chunksize = max(1, len(tasks) // (parse_workers * 4))
+            results = list(executor.map(_parse_archived_page, tasks, chunksize=chunksize))
+    else:
+        results = [_parse_archived_page(task) for task in tasks]
+    
+    for entry, (status, page_data) in zip(entries, results):
+        if page_statuses is not None:
+            page_statuses[entry['url']] = status
         all_normas_data.extend(page_data)
+    
+    print(f"Reproceso finalizado: {len(all_normas_data)} registros válidos")
+    return all_normas_data
+
+
+def discover_norm_types(verbose=False):
+    """
+    Obtiene todos los tipos de norma (tid) del filtro del listado.
+    
+    Returns:
+        list: tids disponibles; [DEFAULT_NORM_TYPE_ID] si no se encuentra el filtro
+    """
+    status, response = fetch_page(0, verbose=verbose)
+    type_ids = parse_norm_type_options(response.content) if status == PAGE_OK else []
+    if not type_ids:
+        print("No se encontró el filtro de tipos de norma, usando el tipo por defecto")
+        return [DEFAULT_NORM_TYPE_ID]
+    return type_ids
+
+
+def scrape_norm_types(type_ids=None, num_pages=None, verbose=False, max_workers=None,
+                      type_statuses=None):
+    """
+    Scrapea varios tipos de norma (field_tipos_de_normas__tid) de forma concurrente.
+    
+    Todas las páginas de todos los tipos comparten un único pool de hilos (y la
+    sesión HTTP compartida), así que el tiempo total se acerca al del tipo más
+    largo. Primero se descarga la página 0 de cada tipo, que indica su número de
+    páginas en el paginador; luego se encolan las páginas restantes.
+    Cada registro queda etiquetado con su tipo en 'norm_type_id'.
+    
+    Args:
+        type_ids (iterable): tids a recorrer (None = todos, ver discover_norm_types)
+        num_pages (int): Máximo de páginas por tipo (None = todas las del paginador)
+        verbose (bool): Si mostrar logs detallados
+        max_workers (int): Páginas simultáneas en total (default: SCRAPING_MAX_WORKERS)
+        type_statuses (dict): Si se proporciona, se llena con
+                           {tid: {página: estado}}; las páginas que siguen con
+                           error tras reencolarlas quedan como PAGE_ERROR
+    
+    Returns:
+        list: Registros ordenados por tipo (en el orden de type_ids) y página
+    """
+    if type_ids is None:
+        type_ids = discover_norm_types(verbose=verbose)
+    type_ids = list(dict.fromkeys(type_ids))
+    if not type_ids:
+        return []
+    
+    max_workers = max(1, max_workers or SCRAPING_MAX_WORKERS)
+    results = {}  # (tid, página) -> (estado, registros)
+    
+    def _first_page(type_id):
+        # Página 0: registros + número de páginas del tipo
+        status, response = fetch_page(0, verbose=verbose, type_id=type_id)
+        if status != PAGE_OK:
+            return type_id, (status, []), 0
+        try:
+            page_result = parse_page_html(response.content, 0, verbose=verbose, type_id=type_id)
+            return type_id, page_result, parse_page_count(response.content)
+        except Exception as e:
+            print(f"Error procesando página 0 del tipo {type_id}: {e}")
+            return type_id, (PAGE_ERROR, []), 0
+    
+    def _page(key):
+        type_id, page_num = key
+        return key, scrape_page(page_num, verbose=verbose, with_status=True, type_id=type_id)
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ani-types') as executor:
+        remaining = []
+        for type_id, page_result, type_pages in executor.map(_first_page, type_ids):
+            results[(type_id, 0)] = page_result
+            if num_pages is not None:
+                type_pages = min(type_pages, num_pages)
+            remaining.extend((type_id, page_num) for page_num in range(1, type_pages))
+            if verbose:
+                print(f"Tipo {type_id}: {type_pages} páginas")
         
-        # Indicador de progreso cada 3 páginas
-        if (page_num + 1) % 3 == 0:
-            print(f"Procesadas {page_num + 1}/{num_pages} páginas. Encontrados {len(all_normas_data)} registros válidos.")
+        for key, page_result in executor.map(_page, remaining):
+            results[key] = page_result
+    
+    # Reencolar las páginas que agotaron los reintentos del planificador. Si se
+    # recupera la página 0 de un tipo, se recorren después sus demás páginas;
+    # si no, el tipo queda reportado con PAGE_ERROR en la página 0
+    recovered_pages = {}
+    
+    def _retry(key):
+        type_id, page_num = key
+        if page_num != 0:
+            return _page(key)[1]
+        _, page_result, type_pages = _first_page(type_id)
+        recovered_pages[type_id] = type_pages
+        return page_result
+    
+    failed = [key for key, (status, _) in results.items() if status == PAGE_ERROR]
+    results.update(retry_failed_pages(failed, _retry))
+    
+    remaining = []
+    for type_id, type_pages in recovered_pages.items():
+        if results[(type_id, 0)][0] == PAGE_ERROR:
+            continue
+        if num_pages is not None:
+            type_pages = min(type_pages, num_pages)
+        remaining.extend((type_id, page_num) for page_num in range(1, type_pages))
+    if remaining:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ani-types') as executor:
+            results.update(executor.map(_page, remaining))
+        failed = [key for key in remaining if results[key][0] == PAGE_ERROR]
+        results.update(retry_failed_pages(failed, lambda key: _page(key)[1]))
     
+    all_normas_data = []
+    for type_id, page_num in sorted(results, key=lambda key: (type_ids.index(key[0]), key[1])):
+        status, page_data = results[(type_id, page_num)]
+        if type_statuses is not None:
+            type_statuses.setdefault(type_id, {})[page_num] = status
+        all_normas_data.extend(page_data)
+    
+    print(f"Tipos de norma procesados: {len(type_ids)} | Registros: {len(all_normas_data)}")
     return all_normas_data
 
 
-def check_for_new_content(num_pages_to_check=3, db_manager=None):
+def scrape_incremental(high_water_mark, max_pages=None, verbose=False,
+                       validator_store=None, page_statuses=None, type_id=None):
+    """
+    Scrapea de forma incremental desde la página 0 hasta alcanzar la marca de agua.
+    
+    El listado de ANI está ordenado del más reciente al más antiguo, así que se
+    pagina hasta encontrar la primera fila con created_at anterior a la marca
+    de agua y se detiene ahí, incluso a mitad de página. Las filas con la misma
+    fecha que la marca se conservan (la deduplicación de persistencia las filtra).
+    
+    Args:
+        high_water_mark (datetime|str): Fecha más reciente ya almacenada
+                           (ver get_latest_db_date). Si es None, se scrapean
+                           max_pages páginas completas.
+        max_pages (int): Límite de páginas a recorrer (None = sin límite)
+        verbose (bool): Si mostrar logs detallados
+        validator_store (HttpValidatorStore): Solicitudes condicionales; una
+                           página sin cambios (304) detiene el recorrido
+        page_statuses (dict): Si se proporciona, se llena con {página: estado}.
+                           Una página que sigue con error después de reencolarla
+                           (ver retry_failed_pages) detiene el recorrido y queda
+                           como PAGE_ERROR
+        type_id (int): Tipo de norma del listado (ver build_page_url)
+    
+    Returns:
+        list: Lista de diccionarios con los registros nuevos, en orden de página
+    """
+    watermark = parse_created_at(high_water_mark) if high_water_mark is not None else None
+    
+    if watermark is None and max_pages is None:
+        raise ValueError("Sin marca de agua se requiere max_pages para acotar el recorrido")
+    
+    new_records = []
+    page_num = 0
+    
+    while max_pages is None or page_num < max_pages:
+        status, page_data = scrape_page(page_num, verbose=verbose, validator_store=validator_store,
+                                        with_status=True, type_id=type_id)
+        if status == PAGE_ERROR:
+            status, page_data = retry_failed_pages(
+                [page_num],
+                lambda key: scrape_page(key, verbose=verbose, validator_store=validator_store,
+                                        with_status=True, type_id=type_id)
+            ).get(page_num, (status, page_data))
+        if page_statuses is not None:
+            page_statuses[page_num] = status
+        
+        # Una página sin cambios (304) solo contiene filas ya vistas, y todas
+        # las siguientes son más antiguas: no hay más contenido nuevo
+        if status == PAGE_UNCHANGED:
+            print(f"Página {page_num} sin cambios (304), fin del scraping incremental")
+            break
+        
+        if status in (PAGE_EMPTY, PAGE_ERROR):
+            print(f"Scraping incremental detenido en página {page_num} (estado: {status})")
+            break
+        
+        reached_watermark = False
+        if watermark is not None and page_data:
+            record_dates, unparseable = parse_created_at_batch(
+                record.get('created_at') for record in page_data)
+            report_unparseable_dates(unparseable, f"Página {page_num}")
+            # Primera fila anterior a la marca de agua (NaT nunca es anterior)
+            older = (record_dates < watermark).to_numpy()
+            if older.any():
+                reached_watermark = True
+                new_records.extend(page_data[:int(older.argmax())])
+            else:
+                new_records.extend(page_data)
+        else:
+            new_records.extend(page_data)
+        
+        if reached_watermark:
+            print(f"Marca de agua {watermark} alcanzada en página {page_num}. "
+                  f"Registros nuevos: {len(new_records)}")
+            break
+        
+        page_num += 1
+    
+    return new_records
+
+
+def check_for_new_content(num_pages_to_check=3, db_manager=None,
+                          page_cache=None, validator_store=None, row_store=None):
     """
     Verifica si hay contenido nuevo en las primeras páginas.
     Retorna True si se detecta nuevo contenido, False en caso contrario.
@@ -308,6 +1431,14 @@ def check_for_new_content(num_pages_to_check=3, db_manager=None):
     Args:
         num_pages_to_check (int): Número de páginas a verificar
         db_manager: Instancia de DatabaseManager para consultar BD
+        page_cache (dict): Si se proporciona, guarda {página: (estado, registros)}
+                           de las páginas revisadas para que scrape_multiple_pages
+                           las reutilice sin descargarlas ni parsearlas otra vez
+                           (las páginas con PAGE_ERROR no se guardan)
+        validator_store (HttpValidatorStore): Solicitudes condicionales (ver scrape_page)
+        row_store (RowFingerprintStore): Filtro de filas ya vistas (ver scrape_page).
+                           Debe ser el mismo del scraping principal: solo las
+                           filas nuevas cuentan como contenido nuevo
     
     Returns:
         bool: True si hay contenido nuevo, False en caso contrario
@@ -320,53 +1451,32 @@ def check_for_new_content(num_pages_to_check=3, db_manager=None):
             return True
         
         # Obtener la fecha de creación más reciente en la base de datos
-        query = "SELECT MAX(created_at) FROM regulations WHERE entity = %s"
-        result = db_manager.execute_query(query, (ENTITY_VALUE,))
-        
-        latest_db_date = None
-        if result and result[0][0]:
-            latest_db_date = result[0][0]
-            
-            # Normalizar fecha de la base de datos
-            if isinstance(latest_db_date, str):
-                try:
-                    latest_db_date = datetime.strptime(latest_db_date, '%Y-%m-%d %H:%M:%S')
-                except:
-                    try:
-                        latest_db_date = datetime.strptime(latest_db_date.split()[0], '%Y-%m-%d')
-                    except:
-                        latest_db_date = None
-            
-            # Normalizar datetime (quitar timezone info)
-            latest_db_date = normalize_datetime(latest_db_date)
+        # Las páginas revisadas son las del tipo de norma por defecto
+        latest_db_date = get_latest_db_date(db_manager, type_id=DEFAULT_NORM_TYPE_ID)
         
         print(f"Fecha más reciente en BD: {latest_db_date}")
         
         # Verificar las primeras páginas en busca de contenido más reciente
         for page_num in range(num_pages_to_check):
             try:
-                page_data = scrape_page(page_num, verbose=False)
+                # Cada página se parsea una sola vez, con huellas y validadores
+                status, page_data = scrape_page(page_num, verbose=False,
+                                                validator_store=validator_store,
+                                                with_status=True, row_store=row_store)
+                # Solo se reutilizan páginas exitosas: una página con error se
+                # vuelve a intentar en el scraping principal
+                if page_cache is not None and status != PAGE_ERROR:
+                    page_cache[page_num] = (status, page_data)
+                
+                web_dates, unparseable = parse_created_at_batch(
+                    record.get('created_at') for record in page_data)
+                report_unparseable_dates(unparseable, f"Página {page_num}")
                 
-                for record in page_data:
-                    created_at_val = record.get('created_at')
-                    
-                    if created_at_val and is_valid_created_at(created_at_val):
-                        web_date = None
-                        try:
-                            web_date = datetime.strptime(created_at_val, '%Y-%m-%d %H:%M:%S')
-                        except:
-                            try:
-                                web_date = datetime.strptime(created_at_val.split()[0], '%Y-%m-%d')
-                            except:
-                                continue
-                        
-                        # Normalizar fecha web (quitar timezone info)
-                        web_date = normalize_datetime(web_date)
-                        
-                        # Si encontramos contenido más reciente que el de la base de datos
-                        if not latest_db_date or web_date > latest_db_date:
-                            print(f"Nuevo contenido detectado - Fecha web: {web_date}, Fecha BD: {latest_db_date}")
-                            return True
+                # Si encontramos contenido más reciente que el de la base de datos
+                web_date = web_dates.max() if not web_dates.empty else pd.NaT
+                if not pd.isna(web_date) and (not latest_db_date or web_date > latest_db_date):
+                    print(f"Nuevo contenido detectado - Fecha web: {web_date}, Fecha BD: {latest_db_date}")
+                    return True
                 
             except Exception as e:
                 print(f"Error verificando página {page_num}: {e}")
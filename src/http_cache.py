@@ -0,0 +1,70 @@
+"""
+Módulo de Caché HTTP
+Guarda los validadores HTTP (ETag / Last-Modified) de cada página del listado
+para hacer solicitudes condicionales en ejecuciones posteriores.
+Si el servidor responde 304 Not Modified, la página no se descarga ni se parsea.
+"""
+import os
+from typing import Dict, Optional
+
+try:
+    from .config import HTTP_VALIDATORS_PATH
+    from .json_store import PendingJsonStore
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    HTTP_VALIDATORS_PATH = os.environ.get("HTTP_VALIDATORS_PATH", "/tmp/ani_http_validators.json")
+    from json_store import PendingJsonStore
+
+
+class HttpValidatorStore(PendingJsonStore):
+    """
+    Almacén persistente (archivo JSON) de validadores HTTP por URL.
+
+    Los validadores nuevos se acumulan como pendientes y solo se escriben en
+    disco al llamar a save(). Así, si la escritura en BD falla, la siguiente
+    ejecución vuelve a descargar las páginas en lugar de recibir un 304.
+    Un archivo ausente o corrupto equivale a un almacén vacío (se descargarán
+    todas las páginas).
+    """
+
+    description = 'almacén de validadores'
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Inicializa el almacén cargando los validadores existentes.
+
+        Args:
+            path: Ruta del archivo JSON. Si es None, usa HTTP_VALIDATORS_PATH
+        """
+        super().__init__(path or HTTP_VALIDATORS_PATH)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Devuelve los headers condicionales para una URL (vacío si no hay validadores).
+        """
+        with self._lock:
+            validators = self._data.get(url)
+
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def stage(self, url: str, response_headers) -> None:
+        """
+        Registra como pendientes los validadores de una respuesta 200.
+
+        Args:
+            url: URL de la página
+            response_headers: Headers de la respuesta HTTP
+        """
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        with self._lock:
+            self._pending[url] = {'etag': etag, 'last_modified': last_modified}
@@ -0,0 +1,103 @@
+"""
+Módulo de Almacenes JSON
+Base común de los estados que se conservan entre ejecuciones en un archivo
+JSON (validadores HTTP, huellas de filas, checkpoint del backfill): carga
+tolerante a archivos ausentes o corruptos y escritura atómica.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict
+
+
+class JsonFileStore:
+    """
+    Diccionario persistido en un archivo JSON.
+
+    Un archivo ausente o corrupto equivale a un almacén vacío. La escritura es
+    atómica (archivo temporal + os.replace): una ejecución interrumpida no deja
+    un archivo a medio escribir.
+    """
+
+    # Nombre del almacén en los mensajes de error
+    description = 'almacén'
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Ruta del archivo JSON
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            print(f"No se pudo leer el {self.description} {self.path}: {e}")
+            return {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """
+        Escribe data en el archivo de forma atómica (con el lock tomado).
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class PendingJsonStore(JsonFileStore):
+    """
+    Almacén JSON cuyas entradas nuevas quedan pendientes y solo se escriben en
+    disco con save(), después de escribir los registros en la BD: si la
+    escritura falla, la siguiente ejecución vuelve a procesar esas páginas.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pending = {}
+
+    def pending(self) -> Dict[str, Any]:
+        """
+        Devuelve una copia de las entradas pendientes de guardar.
+        """
+        with self._lock:
+            return dict(self._pending)
+
+    def merge(self, entries: Dict[str, Any]) -> None:
+        """
+        Agrega entradas pendientes obtenidas en otro proceso (p.ej. vía XCom).
+        """
+        if not entries:
+            return
+        with self._lock:
+            self._pending.update(entries)
+
+    def save(self) -> int:
+        """
+        Persiste las entradas pendientes de forma atómica.
+
+        Returns:
+            int: Número de entradas actualizadas
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+
+            merged = dict(self._data)
+            merged.update(self._pending)
+            self._write(merged)
+
+            updated = len(self._pending)
+            self._data = merged
+            self._pending = {}
+            return updated
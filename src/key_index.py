@@ -0,0 +1,149 @@
+"""
+Módulo de Índice Local de Claves
+Guarda en disco los content_hash (ver content_hashes en persistence) de los
+registros de una entidad, ordenados, junto con el último id de regulations ya
+sincronizado. Cada ejecución solo consulta las filas con id > último id, y el
+índice responde "seguro nuevo / posible duplicado" sin leer la tabla completa.
+
+El índice es solo un filtro: la unicidad la garantiza el índice único de la BD,
+así que un hash que falte (p.ej. por una transacción que confirmó tarde) solo
+hace que ese registro se envíe igual al INSERT ... ON CONFLICT.
+"""
+import hashlib
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+try:
+    from .config import KEY_INDEX_PATH, KEY_INDEX_SYNC_PAGE_SIZE
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    KEY_INDEX_PATH = os.environ.get("KEY_INDEX_PATH", "/tmp/ani_key_index")
+    KEY_INDEX_SYNC_PAGE_SIZE = int(os.environ.get("KEY_INDEX_SYNC_PAGE_SIZE", "100000"))
+
+
+class KeyIndex:
+    """
+    Conjunto ordenado de content_hash (uint64) de una entidad, persistido en un
+    archivo .npz con el último id sincronizado.
+    """
+
+    def __init__(self, entity: str, path: Optional[str] = None):
+        """
+        Inicializa el índice cargando el archivo de la entidad si existe.
+
+        Args:
+            entity: Entidad de los registros
+            path: Directorio del índice. Si es None, usa KEY_INDEX_PATH
+        """
+        self.entity = entity
+        self.path = path or KEY_INDEX_PATH
+        self._lock = threading.Lock()
+        self._hashes, self.last_id = self._load()
+
+    @property
+    def file_path(self) -> str:
+        name = hashlib.sha1(self.entity.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.path, f"{name}.npz")
+
+    def _load(self):
+        empty = (np.empty(0, dtype=np.uint64), 0)
+        if not os.path.exists(self.file_path):
+            return empty
+        try:
+            with np.load(self.file_path) as data:
+                if str(data['entity']) != self.entity:
+                    return empty
+                return data['hashes'].astype(np.uint64), int(data['last_id'])
+        except Exception as e:
+            print(f"No se pudo leer el índice de claves {self.file_path}: {e}")
+            return empty
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def sync(self, db_manager, page_size: Optional[int] = None) -> int:
+        """
+        Agrega los hashes de las filas con id > last_id (por páginas).
+
+        Returns:
+            int: Filas leídas de la BD
+        """
+        page_size = page_size or KEY_INDEX_SYNC_PAGE_SIZE
+        query = """
+            SELECT id, content_hash FROM regulations
+            WHERE entity = %s AND id > %s AND content_hash IS NOT NULL
+            ORDER BY id
+            LIMIT %s
+        """
+        with self._lock:
+            last_id = self.last_id
+            fetched = []
+            while True:
+                rows = db_manager.execute_query(query, (self.entity, last_id, page_size))
+                if not rows:
+                    break
+                page = np.array(rows, dtype=np.int64)
+                # content_hash es BIGINT: mismos 64 bits vistos como uint64
+                fetched.append(page[:, 1].view(np.uint64))
+                last_id = int(page[-1, 0])
+                if len(rows) < page_size:
+                    break
+
+            if fetched:
+                self._hashes = np.unique(np.concatenate([self._hashes] + fetched))
+            self.last_id = last_id
+            return sum(len(hashes) for hashes in fetched)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Máscara de los hashes presentes en el índice (posibles duplicados).
+        Los ausentes son registros nuevos respecto de lo sincronizado.
+        """
+        with self._lock:
+            known = self._hashes
+        if not len(known):
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(known, hashes)
+        positions[positions == len(known)] = 0
+        return known[positions] == hashes
+
+    def save(self) -> None:
+        """
+        Persiste el índice de forma atómica.
+        """
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            tmp_path = f"{self.file_path}.{threading.get_ident()}.tmp.npz"
+            np.savez(tmp_path, hashes=self._hashes, last_id=np.int64(self.last_id),
+                     entity=np.array(self.entity))
+            os.replace(tmp_path, self.file_path)
+
+
+_key_indexes = {}
+_key_indexes_lock = threading.Lock()
+
+
+def get_key_index(entity: str) -> Optional[KeyIndex]:
+    """
+    Devuelve el índice compartido de la entidad (None si KEY_INDEX_PATH = '').
+    """
+    if not KEY_INDEX_PATH:
+        return None
+    with _key_indexes_lock:
+        if entity not in _key_indexes:
+            _key_indexes[entity] = KeyIndex(entity, KEY_INDEX_PATH)
+        return _key_indexes[entity]
+
+
+def set_key_index(entity: str, index: Optional[KeyIndex]) -> None:
+    """
+    Reemplaza el índice de una entidad (None = volver a cargarlo desde disco).
+    """
+    with _key_indexes_lock:
+        if index is None:
+            _key_indexes.pop(entity, None)
+        else:
+            _key_indexes[entity] = index
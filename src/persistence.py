@@ -3,11 +3,46 @@ Módulo de Escritura (Persistencia)
 Contiene toda la lógica de conexión a base de datos y escritura de datos.
 Soporta tanto AWS Secrets Manager como variables de entorno.
 """
+import hashlib
+import numpy as np
 import pandas as pd
 import psycopg2
+from psycopg2.extras import execute_values
 import json
 import os
-from typing import Dict, Any, Tuple, List, Optional
+from typing import Dict, Any, Iterator, Tuple, List, Optional
+try:
+    from .key_index import get_key_index
+except ImportError:
+    from key_index import get_key_index
+try:
+    from .config import (BULK_COPY_MIN_ROWS, BULK_INSERT_PAGE_SIZE,
+                         DEFAULT_COMPONENT_IDS, RTYPE_COMPONENT_IDS)
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    BULK_COPY_MIN_ROWS = int(os.environ.get("BULK_COPY_MIN_ROWS", "2000"))
+    BULK_INSERT_PAGE_SIZE = int(os.environ.get("BULK_INSERT_PAGE_SIZE", "1000"))
+    DEFAULT_COMPONENT_IDS = [7]
+    RTYPE_COMPONENT_IDS = {}
+
+# Métodos de carga de stage_dataframe
+BULK_METHOD_COPY = 'copy'
+BULK_METHOD_VALUES = 'values'
+
+# Formato text de COPY: NULL y escapes de los caracteres especiales
+COPY_NULL = '\\N'
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+# Filas que se formatean a la vez al generar el flujo de COPY
+_COPY_BATCH_ROWS = 5000
+
+# Clave de deduplicación de regulations: debe coincidir con el índice único
+# uq_regulations_dedup_key de sql/create_regulations_table.sql
+REGULATIONS_CONFLICT_TARGET = "(entity, title, created_at, (COALESCE(external_link, '')))"
+# Clave única de regulations_component (índice uq_regulations_component)
+COMPONENTS_CONFLICT_TARGET = "(regulations_id, components_id)"
+
+# Separador de los campos de la clave en content_hash (igual que en el SQL)
+CONTENT_HASH_SEPARATOR = '|'
 
 # Configuración de AWS Secrets Manager (opcional)
 SECRET_NAME = os.environ.get("SECRET_NAME", None)
@@ -129,56 +164,341 @@ class DatabaseManager:
         self.cursor.execute(query, params)
         return self.cursor.fetchall()
 
-    def bulk_insert(self, df, table_name):
+    def stage_dataframe(self, df, table_name, method=None):
+        """
+        Carga un DataFrame en una tabla temporal con las columnas (y tipos) de
+        table_name, que se elimina al confirmar la transacción (ON COMMIT DROP).
+        No confirma: la tabla se usa en sentencias posteriores de la misma transacción.
+        
+        Args:
+            df: DataFrame a cargar (las columnas son las de la tabla)
+            table_name: Tabla de la que se copian las columnas
+            method: BULK_METHOD_COPY, BULK_METHOD_VALUES o None (según filas)
+        
+        Returns:
+            str: Nombre de la tabla temporal
+        """
         if not self.connection or not self.cursor:
             raise Exception("Database not connected")
         
-        try:
+        if method is None:
+            method = BULK_METHOD_COPY if len(df) >= BULK_COPY_MIN_ROWS else BULK_METHOD_VALUES
+        
+        columns_for_sql = ", ".join([f'"{col}"' for col in df.columns])
+        staging_table = f"tmp_{table_name}_load"
+        self.cursor.execute(
+            f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+            f"SELECT {columns_for_sql} FROM {table_name} WITH NO DATA"
+        )
+        if method == BULK_METHOD_COPY:
+            self.cursor.copy_expert(
+                f"COPY {staging_table} ({columns_for_sql}) FROM STDIN WITH (FORMAT text)",
+                CopyRowStream(df)
+            )
+        else:
             df = df.astype(object).where(pd.notnull(df), None)
-            columns_for_sql = ", ".join([f'"{col}"' for col in df.columns])
-            placeholders = ", ".join(["%s"] * len(df.columns))
-            
-            insert_query = f"INSERT INTO {table_name} ({columns_for_sql}) VALUES ({placeholders})"
-            records_to_insert = [tuple(x) for x in df.values]
-            
-            self.cursor.executemany(insert_query, records_to_insert)
-            self.connection.commit()
-            return len(df)
-        except Exception as e:
-            self.connection.rollback()
-            raise Exception(f"Error inserting into {table_name}: {str(e)}")
+            execute_values(self.cursor, f"INSERT INTO {staging_table} ({columns_for_sql}) VALUES %s",
+                           [tuple(x) for x in df.values], page_size=BULK_INSERT_PAGE_SIZE)
+        return staging_table
+
+
+def format_copy_value(value: Any) -> str:
+    """
+    Formatea un valor no nulo para el formato text de COPY.
+    """
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, float) and value.is_integer():
+        # Columnas enteras con NULL llegan como float64 (15.0)
+        return str(int(value))
+    return str(value).translate(_COPY_ESCAPES)
 
 
-def insert_regulations_component(db_manager, new_ids):
+def iter_copy_lines(df: pd.DataFrame, batch_rows: int = _COPY_BATCH_ROWS) -> Iterator[str]:
+    """
+    Genera las líneas de COPY de un DataFrame, formateando por columnas un
+    lote de filas a la vez.
+    """
+    for start in range(0, len(df), batch_rows):
+        batch = df.iloc[start:start + batch_rows]
+        columns = []
+        for _, series in batch.items():
+            nulls = pd.isna(series).to_numpy()
+            columns.append([COPY_NULL if null else format_copy_value(value)
+                            for value, null in zip(series.to_numpy(dtype=object), nulls)])
+        for row in zip(*columns):
+            yield '\t'.join(row) + '\n'
+
+
+class CopyRowStream:
+    """
+    Archivo de solo lectura para cursor.copy_expert: las filas se generan a
+    medida que psycopg2 lee, sin armar todo el contenido en memoria.
     """
-    Inserta los componentes de las regulaciones.
     
-    Nota: Esta función no valida duplicados en la tabla regulations_component.
-    Si se necesita idempotencia para componentes, se debe implementar validación
-    similar a insert_new_records().
+    def __init__(self, df: pd.DataFrame):
+        self._lines = iter_copy_lines(df)
+        self._pending = ''
+    
+    def read(self, size: int = -1) -> str:
+        pieces = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            pieces.append(line)
+            length += len(line)
+        data = ''.join(pieces)
+        if 0 <= size < len(data):
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = ''
+        return data
+    
+    def readline(self, size: int = -1) -> str:
+        if self._pending:
+            line, newline, self._pending = self._pending.partition('\n')
+            return line + newline if newline else line + next(self._lines, '')
+        return next(self._lines, '')
+
+
+def content_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Calcula el content_hash de cada registro como uint64, igual que la
+    columna generada de regulations: primeros 8 bytes (big-endian) del md5 de
+    'entity|title|created_at|external_link' en UTF-8, con '' en los campos
+    nulos (COALESCE en el SQL).
+    
+    Los campos deben estar normalizados como en insert_new_records (title sin
+    espacios en los extremos, created_at como str, external_link '' si falta).
+    
+    Returns:
+        np.ndarray: Hashes uint64, uno por fila
+    """
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    columns = [df[column].fillna('').astype(str).to_numpy(dtype=object)
+               for column in ('entity', 'title', 'created_at', 'external_link')]
+    keys = map(CONTENT_HASH_SEPARATOR.join, zip(*columns))
+    digests = b''.join([hashlib.md5(key.encode('utf-8')).digest()[:8] for key in keys])
+    return np.frombuffer(digests, dtype='>u8').astype(np.uint64)
+
+
+def fetch_existing_hashes(db_manager, entity: str, hashes: np.ndarray) -> np.ndarray:
+    """
+    Devuelve cuáles de los hashes ya están en regulations para la entidad.
+    La consulta usa idx_regulations_entity_content_hash y su costo depende
+    del lote, no del tamaño de la tabla.
+    
+    Returns:
+        np.ndarray: Hashes existentes (uint64)
+    """
+    if len(hashes) == 0:
+        return np.empty(0, dtype=np.uint64)
+    # content_hash es BIGINT (con signo): mismos 64 bits vistos como int64
+    query = "SELECT content_hash FROM regulations WHERE entity = %s AND content_hash = ANY(%s)"
+    rows = db_manager.execute_query(query, (entity, np.unique(hashes).view(np.int64).tolist()))
+    return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)).view(np.uint64)
+
+
+def fetch_existing_keys(db_manager, entity: str, hashes: np.ndarray) -> set:
+    """
+    Devuelve las claves exactas (title, created_at, external_link) de los
+    registros de la entidad con alguno de esos content_hash (ver KeyIndex:
+    confirma los posibles duplicados sin depender de la unicidad del hash).
+    """
+    if len(hashes) == 0:
+        return set()
+    query = """
+        SELECT COALESCE(title, ''), COALESCE(created_at, ''), COALESCE(external_link, '')
+        FROM regulations
+        WHERE entity = %s AND content_hash = ANY(%s)
+    """
+    rows = db_manager.execute_query(query, (entity, np.unique(hashes).view(np.int64).tolist()))
+    return {tuple(row) for row in rows}
+
+
+def component_rows_sql(source: str, component_map: Optional[Dict[int, List[int]]] = None,
+                       default_components: Optional[List[int]] = None) -> str:
+    """
+    Arma el SELECT (regulations_id, components_id) de los componentes de las
+    regulaciones de source (tabla, CTE o subconsulta con columnas id y rtype_id).
+    
+    Los rtype_id de component_map usan su lista de componentes (vacía = ninguno)
+    y el resto, default_components.
     
     Args:
-        db_manager: Instancia de DatabaseManager conectada a la BD
-        new_ids: Lista de IDs de regulaciones para las que insertar componentes
+        source: Relación con las regulaciones (columnas id, rtype_id)
+        component_map: {rtype_id: [components_id]}. Si es None, usa RTYPE_COMPONENT_IDS
+        default_components: Componentes del resto de tipos. Si es None, usa DEFAULT_COMPONENT_IDS
     
     Returns:
-        Tuple (inserted_count, status_message)
+        str: Consulta SQL, o '' si no corresponde ningún componente
     """
-    if not new_ids:
-        return 0, "No new regulation IDs provided"
+    if component_map is None:
+        component_map = RTYPE_COMPONENT_IDS
+    if default_components is None:
+        default_components = DEFAULT_COMPONENT_IDS
+    
+    # Los ids son enteros: se escriben en la consulta como literales
+    mapped_rtypes = sorted(int(rtype_id) for rtype_id in component_map)
+    pairs = [(rtype_id, int(component_id)) for rtype_id in mapped_rtypes
+             for component_id in component_map[rtype_id]]
+    selects = []
+    if pairs:
+        mapping = ", ".join(f"({rtype_id}, {component_id})" for rtype_id, component_id in pairs)
+        selects.append(
+            f"SELECT src.id, mapping.components_id FROM {source} src "
+            f"JOIN (VALUES {mapping}) AS mapping (rtype_id, components_id) "
+            f"ON mapping.rtype_id = src.rtype_id"
+        )
+    if default_components:
+        defaults = ", ".join(f"({int(component_id)})" for component_id in default_components)
+        select = (f"SELECT src.id, defaults.components_id FROM {source} src "
+                  f"CROSS JOIN (VALUES {defaults}) AS defaults (components_id)")
+        if mapped_rtypes:
+            select += (f" WHERE src.rtype_id IS NULL OR src.rtype_id NOT IN "
+                       f"({', '.join(str(rtype_id) for rtype_id in mapped_rtypes)})")
+        selects.append(select)
+    return " UNION ALL ".join(selects)
 
+
+def insert_regulations_with_components(db_manager, df, method=None) -> Tuple[List[int], int]:
+    """
+    Inserta regulaciones y sus componentes en una sola transacción.
+    
+    Los registros se cargan en una tabla temporal (ver stage_dataframe) y una
+    única sentencia con CTEs de modificación inserta las regulaciones
+    (ON CONFLICT DO NOTHING RETURNING id, rtype_id) y, a partir de las filas
+    devueltas, sus componentes según component_rows_sql. Solo las regulaciones
+    nuevas reciben componentes y la sentencia es atómica: no quedan
+    regulaciones sin componentes si algo falla.
+    
+    Args:
+        db_manager: Instancia de DatabaseManager conectada a la BD
+        df: DataFrame de regulaciones (las columnas son las de la tabla)
+        method: BULK_METHOD_COPY, BULK_METHOD_VALUES o None (según filas)
+    
+    Returns:
+        Tuple (new_ids, component_count): IDs de las regulaciones insertadas y
+        número de componentes insertados
+    """
+    table_name = 'regulations'
+    
     try:
-        id_rows = pd.DataFrame(new_ids, columns=['regulations_id'])
-        id_rows['components_id'] = 7
+        staging_table = db_manager.stage_dataframe(df, table_name, method)
+        columns_for_sql = ", ".join([f'"{col}"' for col in df.columns])
         
-        inserted_count = db_manager.bulk_insert(id_rows, 'regulations_component')
-        return inserted_count, f"Successfully inserted {inserted_count} regulation components"
+        component_rows = component_rows_sql('inserted')
+        components_cte = ""
+        component_count = "0"
+        if component_rows:
+            components_cte = f""",
+            components AS (
+                INSERT INTO regulations_component (regulations_id, components_id)
+                {component_rows}
+                ON CONFLICT {COMPONENTS_CONFLICT_TARGET} DO NOTHING
+                RETURNING regulations_id
+            )"""
+            component_count = "(SELECT COUNT(*) FROM components)"
         
+        query = f"""
+            WITH inserted AS (
+                INSERT INTO {table_name} ({columns_for_sql})
+                SELECT {columns_for_sql} FROM {staging_table}
+                ON CONFLICT {REGULATIONS_CONFLICT_TARGET} DO NOTHING
+                RETURNING id, rtype_id
+            ){components_cte}
+            SELECT id, {component_count} FROM inserted
+        """
+        rows = db_manager.execute_query(query)
+        db_manager.connection.commit()
     except Exception as e:
-        return 0, f"Error inserting regulation components: {str(e)}"
+        db_manager.connection.rollback()
+        raise Exception(f"Error inserting into {table_name}: {str(e)}")
+    
+    new_ids = [row[0] for row in rows]
+    return new_ids, int(rows[0][1]) if rows else 0
 
 
-def insert_new_records(db_manager, df, entity):
+def update_edited_records(db_manager, df, entity, edited_links):
+    """
+    Actualiza en la BD las regulaciones de filas editadas en el sitio (ver
+    RowFingerprintStore.edited_records), identificadas por external_link.
+    
+    Los registros editados se cargan en una tabla temporal (ver stage_dataframe)
+    y un único UPDATE ... FROM actualiza, por enlace, la regulación más reciente
+    de la entidad. No se actualiza una fila si su nueva clave
+    (title + created_at + external_link) ya pertenece a otra regulación, para
+    respetar el índice uq_regulations_dedup_key.
+    
+    Args:
+        db_manager: Instancia de DatabaseManager conectada a la BD
+        df: DataFrame con todos los registros a escribir
+        entity: Nombre de la entidad
+        edited_links: Enlaces (external_link) de los registros editados
+    
+    Returns:
+        Tuple (updated_count, remaining_df, status_message):
+        - updated_count: Número de regulaciones actualizadas
+        - remaining_df: Registros a insertar con insert_new_records (los no
+          editados y los editados que no están en la BD). Si la actualización
+          falla no incluye los editados, para no insertarlos como nuevos.
+        - status_message: Mensaje con estadísticas (empieza con 'Error' si falla)
+    """
+    table_name = 'regulations'
+    edited_links = set(edited_links or ())
+    is_edited = (df['entity'] == entity) & df['external_link'].isin(edited_links)
+    if not edited_links or not is_edited.any():
+        return 0, df, f"No edited records for entity {entity}"
+    
+    # Mismos valores normalizados que insert_new_records
+    edited_df = df[is_edited].copy()
+    edited_df['created_at'] = edited_df['created_at'].astype(str)
+    edited_df['title'] = edited_df['title'].astype(str).str.strip()
+    edited_df = edited_df.drop_duplicates('external_link', keep='last')
+    
+    try:
+        print(f"=== ACTUALIZANDO {len(edited_df)} REGISTROS EDITADOS ===")
+        staging_table = db_manager.stage_dataframe(edited_df, table_name)
+        assignments = ", ".join(f'"{col}" = s."{col}"' for col in edited_df.columns
+                                if col not in ('entity', 'external_link'))
+        query = f"""
+            UPDATE {table_name} r SET {assignments}
+            FROM {staging_table} s
+            WHERE r.id = (
+                SELECT MAX(id) FROM {table_name} latest
+                WHERE latest.entity = s.entity AND latest.external_link = s.external_link
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM {table_name} other
+                WHERE other.entity = s.entity AND other.title = s.title
+                  AND other.created_at = s.created_at
+                  AND COALESCE(other.external_link, '') = COALESCE(s.external_link, '')
+                  AND other.id <> r.id
+            )
+            RETURNING s.external_link
+        """
+        updated_links = {row[0] for row in db_manager.execute_query(query)}
+        db_manager.connection.commit()
+    except Exception as e:
+        db_manager.connection.rollback()
+        error_msg = f"Error updating edited records for entity {entity}: {str(e)}"
+        print(f"ERROR CRÍTICO: {error_msg}")
+        return 0, df[~is_edited], error_msg
+    
+    # Los editados sin regulación en la BD se insertan como nuevos
+    remaining_df = df[~(is_edited & df['external_link'].isin(updated_links))]
+    message = (f"Entity {entity}: Edited: {len(edited_df)} | "
+               f"Updated: {len(updated_links)} | Not updated: {len(edited_df) - len(updated_links)}")
+    print(message)
+    return len(updated_links), remaining_df, message
+
+
+def insert_new_records(db_manager, df, entity, key_index=None):
     """
     Inserta nuevos registros en la base de datos evitando duplicados.
     Esta función es IDEMPOTENTE: puede ejecutarse múltiples veces con los mismos
@@ -191,45 +511,42 @@ def insert_new_records(db_manager, df, entity):
       * external_link (enlace externo)
       * entity (entidad)
     
+    La deduplicación contra la BD la hace el índice único uq_regulations_dedup_key
+    (ver sql/create_regulations_table.sql): los registros se insertan con
+    INSERT ... ON CONFLICT DO NOTHING RETURNING id, así que los duplicados se
+    descartan y los IDs nuevos se obtienen en el mismo viaje a la BD, sin leer
+    los registros existentes. El costo no depende del tamaño de la tabla.
+    
+    Las comparaciones del cliente usan el content_hash de 64 bits de cada
+    registro (ver content_hashes) en lugar de concatenar strings.
+    
     La función:
-    1. Consulta registros existentes en la BD para la entidad especificada
-    2. Compara los nuevos registros con los existentes usando una clave única
-    3. Filtra duplicados antes de insertar
-    4. También remueve duplicados internos del DataFrame
-    5. Maneja errores de duplicados en caso de que algunos se escapen
+    1. Filtra los registros de la entidad especificada
+    2. Normaliza los campos de la clave (como quedan guardados en la BD)
+    3. Remueve duplicados internos del DataFrame (por content_hash)
+    4. Descarta los registros que ya están en la BD: con el índice local de
+       claves (ver KeyIndex) solo se consultan en la BD los posibles duplicados;
+       sin él, se consultan los content_hash de todo el lote
+    5. Inserta omitiendo los que ya existen, junto con los componentes de las
+       regulaciones nuevas, en una sola transacción (ver
+       insert_regulations_with_components)
     
     Args:
         db_manager: Instancia de DatabaseManager conectada a la BD
         df: DataFrame con los registros a insertar
         entity: Nombre de la entidad (ej: 'Agencia Nacional de Infraestructura')
+        key_index: KeyIndex de la entidad. Si es None, usa el compartido
+                   (get_key_index; desactivado si KEY_INDEX_PATH = '')
     
     Returns:
         Tuple (inserted_count, status_message):
         - inserted_count: Número de registros insertados
         - status_message: Mensaje con estadísticas del proceso
-    
-    Optimizada para velocidad y precisión.
     """
     regulations_table_name = 'regulations'
     
     try:
-        # 1. OBTENER REGISTROS EXISTENTES INCLUYENDO EXTERNAL_LINK
-        query = """
-            SELECT title, created_at, entity, COALESCE(external_link, '') as external_link 
-            FROM {} 
-            WHERE entity = %s
-        """.format(regulations_table_name)
-        
-        existing_records = db_manager.execute_query(query, (entity,))
-        
-        if not existing_records:
-            db_df = pd.DataFrame(columns=['title', 'created_at', 'entity', 'external_link'])
-        else:
-            db_df = pd.DataFrame(existing_records, columns=['title', 'created_at', 'entity', 'external_link'])
-        
-        print(f"Registros existentes en BD para {entity}: {len(db_df)}")
-        
-        # 2. PREPARAR DATAFRAME DE LA ENTIDAD
+        # 1. PREPARAR DATAFRAME DE LA ENTIDAD
         entity_df = df[df['entity'] == entity].copy()
         
         if entity_df.empty:
@@ -237,135 +554,78 @@ def insert_new_records(db_manager, df, entity):
         
         print(f"Registros a procesar para {entity}: {len(entity_df)}")
         
-        # 3. NORMALIZAR DATOS PARA COMPARACIÓN CONSISTENTE
-        # Normalizar created_at a string
-        if not db_df.empty:
-            db_df['created_at'] = db_df['created_at'].astype(str)
-            db_df['external_link'] = db_df['external_link'].fillna('').astype(str)
-            db_df['title'] = db_df['title'].astype(str).str.strip()
-        
+        # 2. NORMALIZAR DATOS (mismos valores que compara el índice único)
         entity_df['created_at'] = entity_df['created_at'].astype(str)
         entity_df['external_link'] = entity_df['external_link'].fillna('').astype(str)
         entity_df['title'] = entity_df['title'].astype(str).str.strip()
         
-        # 4. IDENTIFICAR DUPLICADOS DE MANERA OPTIMIZADA
-        print("=== INICIANDO VALIDACIÓN DE DUPLICADOS OPTIMIZADA ===")
-        
-        if db_df.empty:
-            # Si no hay registros existentes, todos son nuevos
-            new_records = entity_df.copy()
-            duplicates_found = 0
-            print("No hay registros existentes, todos son nuevos")
-        else:
-            # Crear claves únicas para comparación super rápida
-            entity_df['unique_key'] = (
-                entity_df['title'] + '|' + 
-                entity_df['created_at'] + '|' + 
-                entity_df['external_link']
-            )
-            
-            db_df['unique_key'] = (
-                db_df['title'] + '|' + 
-                db_df['created_at'] + '|' + 
-                db_df['external_link']
-            )
-            
-            # Usar set para comparación O(1) - súper rápido
-            existing_keys = set(db_df['unique_key'])
-            entity_df['is_duplicate'] = entity_df['unique_key'].isin(existing_keys)
-            
-            new_records = entity_df[~entity_df['is_duplicate']].copy()
-            duplicates_found = len(entity_df) - len(new_records)
-            
-            # Log para debugging
-            if duplicates_found > 0:
-                print(f"Duplicados encontrados: {duplicates_found}")
-                duplicate_records = entity_df[entity_df['is_duplicate']]
-                print("Ejemplos de duplicados:")
-                for idx, row in duplicate_records.head(3).iterrows():
-                    print(f"  - {row['title'][:50]}... | {row['created_at']}")
-        
-        # 5. REMOVER DUPLICADOS INTERNOS DEL DATAFRAME
-        print(f"Antes de remover duplicados internos: {len(new_records)}")
-        new_records = new_records.drop_duplicates(
-            subset=['title', 'created_at', 'external_link'], 
-            keep='first'
-        )
-        internal_duplicates = len(entity_df) - duplicates_found - len(new_records)
+        # 3. REMOVER DUPLICADOS INTERNOS DEL DATAFRAME (por content_hash)
+        hashes = content_hashes(entity_df)
+        is_unique = ~pd.Series(hashes).duplicated(keep='first').to_numpy()
+        new_records = entity_df[is_unique]
+        hashes = hashes[is_unique]
+        internal_duplicates = len(entity_df) - len(new_records)
         if internal_duplicates > 0:
             print(f"Duplicados internos removidos: {internal_duplicates}")
         
-        print(f"Después de remover duplicados internos: {len(new_records)}")
-        print(f"=== DUPLICADOS IDENTIFICADOS: {duplicates_found + internal_duplicates} ===")
-        
-        if new_records.empty:
-            return 0, f"No new records found for entity {entity} after duplicate validation"
-        
-        # 6. LIMPIAR DATAFRAME ANTES DE INSERTAR
-        # Remover columnas auxiliares
-        columns_to_drop = ['unique_key', 'is_duplicate']
-        for col in columns_to_drop:
-            if col in new_records.columns:
-                new_records = new_records.drop(columns=[col])
-        
-        print(f"Registros finales a insertar: {len(new_records)}")
-        
-        # 7. INSERTAR NUEVOS REGISTROS
+        # 4. DESCARTAR LOS QUE YA ESTÁN EN LA BD (comparando enteros)
+        existing_count = 0
+        if key_index is None:
+            key_index = get_key_index(entity)
         try:
-            print(f"=== INSERTANDO {len(new_records)} REGISTROS ===")
-            
-            total_rows_processed = db_manager.bulk_insert(new_records, regulations_table_name)
-            
-            if total_rows_processed == 0:
-                return 0, f"No records were actually inserted for entity {entity}"
-            
-            print(f"Registros insertados exitosamente: {total_rows_processed}")
-            
-        except Exception as insert_error:
-            print(f"Error en inserción: {insert_error}")
-            # Si es error de duplicados, algunos se escaparon
-            if "duplicate" in str(insert_error).lower() or "unique" in str(insert_error).lower():
-                print("Error de duplicados detectado - algunos registros ya existían")
-                return 0, f"Some records for entity {entity} were duplicates and skipped"
+            if key_index is not None:
+                # Ponerse al día (id > último sincronizado) y confirmar en la BD
+                # solo los posibles duplicados
+                synced = key_index.sync(db_manager)
+                key_index.save()
+                candidates = key_index.contains(hashes)
+                print(f"Índice local de claves: {synced} filas sincronizadas, "
+                      f"{int(candidates.sum())} posibles duplicados")
+                is_existing = np.zeros(len(hashes), dtype=bool)
+                if candidates.any():
+                    existing_keys = fetch_existing_keys(db_manager, entity, hashes[candidates])
+                    candidate_rows = new_records[candidates]
+                    is_existing[candidates] = [
+                        key in existing_keys for key in zip(candidate_rows['title'],
+                                                             candidate_rows['created_at'],
+                                                             candidate_rows['external_link'])
+                    ]
             else:
-                raise insert_error
-        
-        # 8. OBTENER IDS DE REGISTROS INSERTADOS - MÉTODO OPTIMIZADO
-        print("=== OBTENIENDO IDS DE REGISTROS INSERTADOS ===")
+                existing = fetch_existing_hashes(db_manager, entity, hashes)
+                is_existing = np.isin(hashes, existing)
+            existing_count = int(is_existing.sum())
+            if existing_count:
+                new_records = new_records[~is_existing]
+                print(f"Duplicados ya existentes en la BD (content_hash): {existing_count}")
+        except Exception as hash_error:
+            # Tabla sin la columna content_hash: el índice único sigue deduplicando
+            db_manager.connection.rollback()
+            print(f"No se pudo consultar content_hash, se omite el prefiltro: {hash_error}")
         
-        # Método simple y eficiente - obtener los últimos N IDs
-        new_ids_query = f"""
-            SELECT id FROM {regulations_table_name}
-            WHERE entity = %s 
-            ORDER BY id DESC
-            LIMIT %s
-        """
+        if new_records.empty:
+            return 0, f"No new records found for entity {entity} after duplicate validation"
         
-        new_ids_result = db_manager.execute_query(
-            new_ids_query, 
-            (entity, total_rows_processed)
-        )
-        new_ids = [row[0] for row in new_ids_result]
+        # 5. INSERTAR REGULACIONES Y COMPONENTES (una transacción, ON CONFLICT DO NOTHING)
+        print(f"=== INSERTANDO {len(new_records)} REGISTROS CON SUS COMPONENTES ===")
+        new_ids, inserted_count_comp = insert_regulations_with_components(db_manager, new_records)
+        total_rows_processed = len(new_ids)
+        conflicts = len(new_records) - total_rows_processed
+        duplicates_found = existing_count + conflicts
         
-        print(f"IDs obtenidos: {len(new_ids)}")
+        if conflicts > 0:
+            print(f"Duplicados descartados por el índice único: {conflicts}")
+        print(f"Registros insertados exitosamente: {total_rows_processed}")
         
-        # 9. INSERTAR COMPONENTES DE REGULACIÓN
-        inserted_count_comp = 0
-        component_message = ""
+        if total_rows_processed == 0:
+            return 0, f"No new records found for entity {entity} after duplicate validation"
         
-        if new_ids:
-            try:
-                inserted_count_comp, component_message = insert_regulations_component(db_manager, new_ids)
-                print(f"Componentes: {component_message}")
-            except Exception as comp_error:
-                print(f"Error insertando componentes: {comp_error}")
-                component_message = f"Error inserting components: {str(comp_error)}"
+        component_message = f"Successfully inserted {inserted_count_comp} regulation components"
+        print(f"Componentes: {component_message}")
         
-        # 10. MENSAJE FINAL CON ESTADÍSTICAS DETALLADAS
+        # 6. MENSAJE FINAL CON ESTADÍSTICAS DETALLADAS
         total_duplicates = duplicates_found + internal_duplicates
         stats = (
             f"Processed: {len(entity_df)} | "
-            f"Existing: {len(db_df)} | "
             f"Duplicates skipped: {total_duplicates} | "
             f"New inserted: {total_rows_processed}"
         )
@@ -385,4 +645,3 @@ def insert_new_records(db_manager, df, entity):
         import traceback
         print(traceback.format_exc())
         return 0, error_msg
-
@@ -0,0 +1,181 @@
+"""
+Módulo de Pipeline en Streaming
+Encadena Extracción → Validación → Escritura con generadores: los registros
+fluyen página a página y se escriben en la BD por bloques (chunks).
+La memoria máxima depende del tamaño del bloque, no del total del recorrido,
+y las primeras filas llegan a 'regulations' antes de que termine el scraping.
+"""
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import os
+
+import pandas as pd
+
+try:
+    from .extraction import PAGE_ERROR, iter_pages_pipelined, retry_failed_pages, scrape_page
+    from .validation import DataValidator
+    from .records import RecordColumns, records_to_dataframe
+    from .persistence import insert_new_records
+except ImportError:
+    from extraction import PAGE_ERROR, iter_pages_pipelined, retry_failed_pages, scrape_page
+    from validation import DataValidator
+    from records import RecordColumns, records_to_dataframe
+    from persistence import insert_new_records
+try:
+    from .config import ENTITY_VALUE, STREAMING_CHUNK_SIZE
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    ENTITY_VALUE = 'Agencia Nacional de Infraestructura'
+    STREAMING_CHUNK_SIZE = int(os.environ.get("STREAMING_CHUNK_SIZE", "1000"))
+
+
+def iter_records(pages: Iterable) -> Iterator[Dict[str, Any]]:
+    """
+    Aplana un iterador de páginas (página, estado, registros) en registros.
+    """
+    for _, _, records in pages:
+        yield from records
+
+
+def iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[RecordColumns]:
+    """
+    Agrupa registros en bloques columnares de como máximo chunk_size elementos.
+    """
+    iterator = iter(records)
+    while True:
+        chunk = RecordColumns(islice(iterator, chunk_size))
+        if not len(chunk):
+            return
+        yield chunk
+
+
+def merge_validation_stats(total: Dict[str, Any], chunk_stats: Dict[str, Any]) -> None:
+    """
+    Acumula las estadísticas de validación de un bloque en el total.
+    """
+    for key in ('total_records', 'valid_records', 'discarded_records'):
+        total[key] += chunk_stats.get(key, 0)
+    for field_name, count in chunk_stats.get('field_errors', {}).items():
+        total['field_errors'][field_name] = total['field_errors'].get(field_name, 0) + count
+
+
+def iter_validated_chunks(chunks: Iterable[RecordColumns], validator: Optional[DataValidator],
+                          stats: Dict[str, Any], verbose: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Valida cada bloque y entrega un DataFrame con los registros válidos.
+
+    Args:
+        chunks: Iterador de bloques de registros (RecordColumns o listas de dicts)
+        validator: DataValidator a usar (None = sin validación)
+        stats: Dict de estadísticas que se actualiza con cada bloque
+        verbose: Si mostrar mensajes detallados
+
+    Yields:
+        pd.DataFrame: Registros válidos del bloque (nunca vacío)
+    """
+    for chunk in chunks:
+        df_chunk = records_to_dataframe(chunk)
+        if validator is not None:
+            df_chunk, chunk_stats = validator.validate_dataframe(df_chunk, verbose=verbose)
+        else:
+            chunk_stats = {
+                'total_records': len(df_chunk),
+                'valid_records': len(df_chunk),
+                'discarded_records': 0,
+                'field_errors': {}
+            }
+        merge_validation_stats(stats, chunk_stats)
+        if not df_chunk.empty:
+            yield df_chunk
+
+
+def run_streaming_pipeline(db_manager, page_nums: Iterable[int], entity: str = ENTITY_VALUE,
+                           chunk_size: Optional[int] = None, validator: Optional[DataValidator] = None,
+                           validate: bool = True, verbose: bool = False,
+                           **scrape_kwargs) -> Dict[str, Any]:
+    """
+    Ejecuta Extracción → Validación → Escritura en streaming.
+
+    Args:
+        db_manager: Instancia de DatabaseManager conectada a la BD
+        page_nums: Números de página a recorrer, en orden
+        entity: Entidad de los registros (ver insert_new_records)
+        chunk_size: Registros por bloque de escritura (default: STREAMING_CHUNK_SIZE)
+        validator: DataValidator a usar (si es None y validate=True se crea uno)
+        validate: Si validar los registros antes de escribirlos
+        verbose: Si mostrar logs detallados
+        **scrape_kwargs: Argumentos para iter_pages_pipelined (fetch_workers,
+                         parse_workers, queue_size, validator_store, ...)
+
+    Las páginas con error se reencolan al final del recorrido (ver
+    retry_failed_pages); las que no se recuperan quedan en failed_pages y en errors.
+
+    Returns:
+        Dict con estadísticas: records_scraped, records_validated,
+        records_inserted, chunks, pages_processed, validation_stats,
+        failed_pages y errors
+    """
+    chunk_size = max(1, chunk_size or STREAMING_CHUNK_SIZE)
+    if validate and validator is None:
+        validator = DataValidator()
+
+    validation_stats = {
+        'total_records': 0,
+        'valid_records': 0,
+        'discarded_records': 0,
+        'field_errors': {}
+    }
+    result = {
+        'records_scraped': 0,
+        'records_validated': 0,
+        'records_inserted': 0,
+        'chunks': 0,
+        'pages_processed': 0,
+        'validation_stats': validation_stats,
+        'failed_pages': [],
+        'errors': []
+    }
+
+    def _retry_page(page_num):
+        return scrape_page(page_num, verbose=verbose, with_status=True,
+                           validator_store=scrape_kwargs.get('validator_store'),
+                           year=scrape_kwargs.get('year'), type_id=scrape_kwargs.get('type_id'),
+                           row_store=scrape_kwargs.get('row_store'))
+
+    def _count_pages(pages):
+        failed = []
+        for page in pages:
+            result['pages_processed'] += 1
+            if page[1] == PAGE_ERROR:
+                failed.append(page[0])
+                continue
+            yield page
+        # Páginas con error: se reencolan con backoff al final del recorrido
+        retried = retry_failed_pages(failed, _retry_page)
+        for page_num in failed:
+            status, records = retried.get(page_num, (PAGE_ERROR, []))
+            if status == PAGE_ERROR:
+                result['failed_pages'].append(page_num)
+            else:
+                yield page_num, status, records
+
+    pages = _count_pages(iter_pages_pipelined(page_nums, verbose=verbose, **scrape_kwargs))
+    chunks = iter_chunks(iter_records(pages), chunk_size)
+    validated_chunks = iter_validated_chunks(chunks, validator, validation_stats, verbose=verbose)
+
+    for df_chunk in validated_chunks:
+        result['chunks'] += 1
+        inserted_count, status_message = insert_new_records(db_manager, df_chunk, entity)
+        result['records_inserted'] += inserted_count
+        if status_message.startswith('Error'):
+            result['errors'].append(status_message)
+        print(f"Bloque {result['chunks']}: {len(df_chunk)} registros válidos, "
+              f"{inserted_count} insertados (acumulado: {result['records_inserted']})")
+
+    if result['failed_pages']:
+        result['errors'].append(f"Páginas con error tras los reintentos: {result['failed_pages']}")
+
+    result['records_scraped'] = validation_stats['total_records']
+    result['records_validated'] = validation_stats['valid_records']
+    return result
@@ -0,0 +1,126 @@
+"""
+Módulo de Registros Columnares
+Acumula los registros extraídos por columnas en lugar de como una lista de
+diccionarios. Cada registro pasa a ocupar una referencia por columna de texto
+y un código de 4 bytes por columna de pocos valores (entity, gtype, is_active,
+update_at, ...), y el DataFrame se arma directamente desde esas columnas sin
+materializar de nuevo un diccionario por fila.
+"""
+from array import array
+from typing import Any, Dict, Iterable, List, Union
+
+import numpy as np
+import pandas as pd
+
+# Columnas de un registro de norma, en el orden de parse_page_changes
+RECORD_FIELDS = (
+    'created_at', 'update_at', 'is_active', 'title', 'gtype', 'entity',
+    'external_link', 'rtype_id', 'summary', 'classification_id', 'norm_type_id',
+)
+
+# Columnas con pocos valores distintos: se guardan como códigos sobre un
+# diccionario de valores (update_at tiene un único valor por página)
+CATEGORICAL_FIELDS = (
+    'update_at', 'is_active', 'gtype', 'entity', 'rtype_id', 'classification_id', 'norm_type_id',
+)
+
+
+class RecordColumns:
+    """
+    Acumulador columnar de registros, con la interfaz de lista que usan los
+    recorridos (append, extend, len) y conversión a DataFrame.
+
+    Los campos que no están en RECORD_FIELDS se ignoran y los que faltan quedan en None.
+    """
+
+    __slots__ = ('_values', '_codes', '_categories', '_length')
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._values = {field: [] for field in RECORD_FIELDS if field not in CATEGORICAL_FIELDS}
+        self._codes = {field: array('i') for field in CATEGORICAL_FIELDS}
+        self._categories = {field: {} for field in CATEGORICAL_FIELDS}
+        self._length = 0
+        self.extend(records)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, record: Dict[str, Any]) -> None:
+        for field, values in self._values.items():
+            values.append(record.get(field))
+        for field, codes in self._codes.items():
+            categories = self._categories[field]
+            value = record.get(field)
+            code = categories.get(value)
+            if code is None:
+                code = categories[value] = len(categories)
+            codes.append(code)
+        self._length += 1
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def clear(self) -> None:
+        for values in self._values.values():
+            values.clear()
+        for field in CATEGORICAL_FIELDS:
+            self._codes[field] = array('i')
+            self._categories[field] = {}
+        self._length = 0
+
+    def _decode(self, field: str):
+        codes = np.frombuffer(self._codes[field], dtype=np.int32)
+        values = list(self._categories[field])
+
+        if values and all(type(value) is bool for value in values):
+            return np.array(values, dtype=bool)[codes]
+        if values and all(type(value) is int for value in values):
+            return np.array(values, dtype=np.int64)[codes]
+        if values and all(isinstance(value, str) or value is None for value in values):
+            # None se representa con el código -1 (NaN en la categoría)
+            labels = []
+            remap = np.empty(len(values), dtype=np.int32)
+            for code, value in enumerate(values):
+                if value is None:
+                    remap[code] = -1
+                else:
+                    remap[code] = len(labels)
+                    labels.append(value)
+            return pd.Categorical.from_codes(remap[codes], categories=labels)
+        # Valores mixtos: pandas infiere el tipo igual que con una lista de dicts
+        return [values[code] for code in codes]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Construye el DataFrame de los registros acumulados. Las columnas de
+        pocos valores se entregan como arrays tipados (bool/int64) o categorías.
+        """
+        if not self._length:
+            return pd.DataFrame()
+        columns = {}
+        for field in RECORD_FIELDS:
+            columns[field] = self._decode(field) if field in self._codes else self._values[field]
+        return pd.DataFrame(columns, copy=False)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve los registros como lista de diccionarios (p.ej. para XCom).
+        """
+        columns = []
+        for field in RECORD_FIELDS:
+            if field in self._values:
+                columns.append(self._values[field])
+            else:
+                values = list(self._categories[field])
+                columns.append([values[code] for code in self._codes[field]])
+        return [dict(zip(RECORD_FIELDS, row)) for row in zip(*columns)]
+
+
+def records_to_dataframe(records: Union[RecordColumns, Iterable[Dict[str, Any]]]) -> pd.DataFrame:
+    """
+    Convierte registros (RecordColumns o lista de dicts) en DataFrame.
+    """
+    if not isinstance(records, RecordColumns):
+        records = RecordColumns(records)
+    return records.to_dataframe()
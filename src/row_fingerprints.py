@@ -0,0 +1,82 @@
+"""
+Módulo de Huellas de Filas
+Guarda una huella (hash del contenido: textos, enlaces y fechas; ver
+row_fingerprint en extraction) de cada fila <tr> del listado, indexada
+por el enlace de la norma. En ejecuciones posteriores las filas con una huella
+ya conocida se descartan antes de extraer sus campos, y las filas cuyo enlace
+existe pero con otra huella se reportan como editadas y se escriben como
+actualizaciones (ver update_edited_records en persistence).
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+try:
+    from .config import ROW_FINGERPRINTS_PATH
+    from .json_store import PendingJsonStore
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    ROW_FINGERPRINTS_PATH = os.environ.get("ROW_FINGERPRINTS_PATH", "/tmp/ani_row_fingerprints.json")
+    from json_store import PendingJsonStore
+
+
+class RowFingerprintStore(PendingJsonStore):
+    """
+    Almacén persistente (archivo JSON) de huellas de filas {clave: huella}.
+
+    Las huellas nuevas quedan pendientes y solo se escriben en disco con
+    save(), después de escribir los registros en la BD (ver PendingJsonStore).
+    """
+
+    description = 'almacén de huellas'
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Inicializa el almacén cargando las huellas existentes.
+
+        Args:
+            path: Ruta del archivo JSON. Si es None, usa ROW_FINGERPRINTS_PATH
+        """
+        super().__init__(path or ROW_FINGERPRINTS_PATH)
+        self._edited = []
+        self.stats = {'skipped': 0, 'new': 0, 'edited': 0}
+
+    @property
+    def known(self) -> Dict[str, str]:
+        """
+        Huellas guardadas {clave: huella}. Es de solo lectura durante la
+        ejecución (lo pendiente no cambia hasta save()), así que los hilos de
+        parseo pueden consultarlo sin lock.
+        """
+        return self._data
+
+    def snapshot(self) -> Dict[str, str]:
+        """
+        Copia de las huellas guardadas, para enviarla a procesos de parseo.
+        """
+        with self._lock:
+            return dict(self._data)
+
+    def apply(self, row_changes: Dict[str, Any]) -> None:
+        """
+        Registra el resultado de clasificar las filas de una página
+        (ver parse_page_changes en extraction).
+
+        Args:
+            row_changes: {'skipped': int, 'new': int, 'fingerprints': {clave: huella},
+                          'edited': [registros editados]}
+        """
+        if not row_changes:
+            return
+        with self._lock:
+            self._pending.update(row_changes.get('fingerprints', {}))
+            self._edited.extend(row_changes.get('edited', []))
+            self.stats['skipped'] += row_changes.get('skipped', 0)
+            self.stats['new'] += row_changes.get('new', 0)
+            self.stats['edited'] += len(row_changes.get('edited', []))
+
+    def edited_records(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve los registros de filas editadas detectadas en la ejecución.
+        """
+        with self._lock:
+            return list(self._edited)
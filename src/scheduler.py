@@ -0,0 +1,231 @@
+"""
+Módulo de Planificación de Descargas
+Controla cuán fuerte se consulta www.ani.gov.co:
+- Token bucket: limita las solicitudes por segundo (con ráfagas acotadas)
+- Concurrencia AIMD: sube de a poco mientras el sitio responde bien y se
+  reduce a la mitad ante 429/5xx, timeouts o picos de latencia
+- Reintentos con backoff exponencial con jitter (respetando Retry-After),
+  para que un 503 o un timeout transitorio no descarte la página
+- Espera para reencolar las páginas que agotaron los reintentos (ver
+  retry_failed_pages en extraction)
+"""
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+
+try:
+    from .config import (
+        HTTP_RATE_LIMIT, HTTP_RATE_BURST, HTTP_MIN_CONCURRENCY, HTTP_INITIAL_CONCURRENCY,
+        HTTP_MAX_CONCURRENCY, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_CAP, HTTP_LATENCY_SPIKE_FACTOR,
+    )
+except ImportError:
+    # Para compatibilidad cuando se ejecuta como script independiente
+    HTTP_RATE_LIMIT = 5.0
+    HTTP_RATE_BURST = 5
+    HTTP_MIN_CONCURRENCY = 1
+    HTTP_INITIAL_CONCURRENCY = 4
+    HTTP_MAX_CONCURRENCY = 8
+    HTTP_MAX_RETRIES = 4
+    HTTP_BACKOFF_BASE = 0.5
+    HTTP_BACKOFF_CAP = 30.0
+    HTTP_LATENCY_SPIKE_FACTOR = 3.0
+
+# Respuestas que indican saturación o fallo transitorio del servidor
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class FetchScheduler:
+    """
+    Planificador de solicitudes HTTP compartido por todos los hilos de descarga.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None,
+                 min_concurrency: Optional[int] = None, initial_concurrency: Optional[int] = None,
+                 max_concurrency: Optional[int] = None, max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_cap: Optional[float] = None, latency_spike_factor: Optional[float] = None):
+        """
+        Args:
+            rate: Solicitudes por segundo sostenidas (default: HTTP_RATE_LIMIT)
+            burst: Tamaño del bucket, ráfaga máxima (default: HTTP_RATE_BURST)
+            min_concurrency: Piso de la concurrencia adaptativa (default: HTTP_MIN_CONCURRENCY)
+            initial_concurrency: Concurrencia inicial (default: HTTP_INITIAL_CONCURRENCY)
+            max_concurrency: Techo de la concurrencia adaptativa (default: HTTP_MAX_CONCURRENCY)
+            max_retries: Reintentos por solicitud (default: HTTP_MAX_RETRIES)
+            backoff_base: Espera base del backoff en segundos (default: HTTP_BACKOFF_BASE)
+            backoff_cap: Espera máxima del backoff en segundos (default: HTTP_BACKOFF_CAP)
+            latency_spike_factor: Una latencia mayor que factor × promedio se
+                                  trata como señal de saturación
+        """
+        self.rate = rate or HTTP_RATE_LIMIT
+        self.burst = burst or HTTP_RATE_BURST
+        self.min_concurrency = min_concurrency or HTTP_MIN_CONCURRENCY
+        self.max_concurrency = max(self.min_concurrency, max_concurrency or HTTP_MAX_CONCURRENCY)
+        self.max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or HTTP_BACKOFF_BASE
+        self.backoff_cap = backoff_cap or HTTP_BACKOFF_CAP
+        self.latency_spike_factor = latency_spike_factor or HTTP_LATENCY_SPIKE_FACTOR
+
+        # Concurrencia AIMD: crece con cada éxito, se reduce ante saturación
+        self._slots = threading.Condition()
+        initial = initial_concurrency or HTTP_INITIAL_CONCURRENCY
+        self._limit = float(min(self.max_concurrency, max(self.min_concurrency, initial)))
+        self._in_flight = 0
+        self._latency_avg = None
+
+        # Token bucket
+        self._bucket_lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'failures': 0}
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._limit)
+
+    def _take_token(self) -> None:
+        # Espera (fuera del lock) hasta que haya un token disponible
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def _acquire(self) -> None:
+        with self._slots:
+            while self._in_flight >= int(self._limit):
+                self._slots.wait()
+            self._in_flight += 1
+            self.stats['requests'] += 1
+        self._take_token()
+
+    def _release(self, healthy: bool, latency: Optional[float] = None) -> None:
+        with self._slots:
+            self._in_flight -= 1
+
+            if healthy and latency is not None:
+                spike = (self._latency_avg is not None
+                         and latency > self.latency_spike_factor * self._latency_avg)
+                self._latency_avg = latency if self._latency_avg is None else (
+                    0.8 * self._latency_avg + 0.2 * latency)
+                healthy = not spike
+
+            if healthy:
+                # Aumento aditivo: ~+1 por cada "ventana" de solicitudes exitosas
+                self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+            else:
+                # Disminución multiplicativa
+                self._limit = max(float(self.min_concurrency), self._limit / 2)
+                self.stats['throttled'] += 1
+
+            self._slots.notify_all()
+
+    def _count(self, key: str) -> None:
+        with self._slots:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        # Full jitter: espera aleatoria en [0, min(cap, base * 2^intento)]
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def requeue_delay(self, retry_round: int) -> float:
+        """
+        Espera antes de reencolar una página que agotó los reintentos de
+        request(): continúa el backoff exponencial después de max_retries, con
+        la mitad fija para que la espera no se acerque a cero.
+
+        Args:
+            retry_round: Ronda de reencolado (1, 2, ...)
+        """
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** (self.max_retries + retry_round)))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        value = response.headers.get('Retry-After') if response is not None else None
+        if value and value.strip().isdigit():
+            return float(value)
+        return None
+
+    def request(self, session, url: str, **kwargs):
+        """
+        Realiza un GET respetando el límite de tasa y la concurrencia adaptativa,
+        reintentando errores transitorios con backoff.
+
+        Args:
+            session: requests.Session a usar
+            url: URL a solicitar
+            **kwargs: Argumentos para session.get (timeout, headers, ...)
+
+        Returns:
+            requests.Response: Última respuesta obtenida (puede ser un 429/5xx si
+            se agotaron los reintentos)
+
+        Raises:
+            requests.RequestException: Si el último intento falló por conexión o timeout
+        """
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            start = time.monotonic()
+            response = None
+            try:
+                response = session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._release(healthy=False)
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    raise
+                print(f"Error transitorio en {url} ({e}), reintento {attempt + 1}/{self.max_retries}")
+            except Exception:
+                self._release(healthy=True)
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self._release(healthy=True, latency=time.monotonic() - start)
+                    return response
+                self._release(healthy=False)
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    return response
+                print(f"HTTP {response.status_code} en {url}, reintento {attempt + 1}/{self.max_retries}")
+
+            self._count('retries')
+            time.sleep(self._backoff(attempt, self._retry_after(response)))
+
+
+_fetch_scheduler = None
+_fetch_scheduler_lock = threading.Lock()
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """
+    Devuelve el planificador compartido del módulo, creándolo si no existe.
+    """
+    global _fetch_scheduler
+
+    if _fetch_scheduler is None:
+        with _fetch_scheduler_lock:
+            if _fetch_scheduler is None:
+                _fetch_scheduler = FetchScheduler()
+    return _fetch_scheduler
+
+
+def set_fetch_scheduler(scheduler: Optional[FetchScheduler]) -> None:
+    """
+    Reemplaza el planificador compartido (None = volver a los valores de configuración).
+    """
+    global _fetch_scheduler
+
+    with _fetch_scheduler_lock:
+        _fetch_scheduler = scheduler
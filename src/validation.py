@@ -3,12 +3,21 @@ Módulo de Validación
 Valida los datos extraídos según reglas configurables.
 - Si un campo no cumple, se deja NULL/vacío
 - Si un campo obligatorio no cumple, se descarta la fila completa
+
+Las reglas se compilan una vez (ver RulePlan) y el plan queda en caché a nivel
+de módulo por ruta y fecha de modificación del archivo: los contenedores Lambda
+"calientes" y los workers de Airflow no vuelven a leer el YAML, y una edición
+del archivo se aplica en el siguiente DataValidator().
 """
 import re
 import yaml
 import os
-from typing import Dict, Any, List, Tuple, Optional
+import operator
+import threading
+from itertools import repeat
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Optional
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 
@@ -17,105 +26,210 @@ class ValidationError(Exception):
     pass
 
 
-class DataValidator:
+TYPE_MAPPING = {
+    'str': str,
+    'int': int,
+    'bool': bool,
+    'float': float
+}
+
+
+class FieldRule:
     """
-    Validador de datos basado en reglas configurables.
+    Reglas de un campo ya compiladas: tipo resuelto, regex compilada y
+    allowed_values como frozenset.
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    __slots__ = ('rules', 'has_type', 'python_type', 'has_regex', 'pattern',
+                 'check_length', 'max_length', 'min_length',
+                 'check_range', 'min_value', 'max_value',
+                 'has_allowed', 'allowed_values', 'allowed_set')
+    
+    def __init__(self, rules: Dict[str, Any]):
+        self.rules = rules
+        
+        self.has_type = 'type' in rules
+        # Tipo no reconocido: solo se exige que el valor no sea None
+        self.python_type = TYPE_MAPPING.get(rules['type']) if self.has_type else None
+        
+        self.has_regex = 'regex' in rules
+        self.pattern = None
+        if self.has_regex:
+            try:
+                self.pattern = re.compile(rules['regex'])
+            except Exception:
+                # Regex inválida: ningún valor la cumple
+                self.pattern = None
+        
+        self.check_length = 'max_length' in rules or 'min_length' in rules
+        self.max_length = rules.get('max_length')
+        self.min_length = rules.get('min_length')
+        
+        self.check_range = 'min_value' in rules or 'max_value' in rules
+        self.min_value = rules.get('min_value')
+        self.max_value = rules.get('max_value')
+        
+        self.has_allowed = 'allowed_values' in rules
+        self.allowed_values = rules.get('allowed_values')
+        try:
+            self.allowed_set = frozenset(self.allowed_values) if self.has_allowed else None
+        except TypeError:
+            self.allowed_set = None
+    
+    def check_type(self, value: Any) -> bool:
+        if value is None:
+            return False
+        return self.python_type is None or isinstance(value, self.python_type)
+    
+    def match(self, value: Any) -> bool:
+        return self.pattern is not None and self.pattern.match(str(value)) is not None
+    
+    def allows(self, value: Any) -> bool:
+        if self.allowed_set is not None:
+            try:
+                return value in self.allowed_set
+            except TypeError:
+                pass
+        return value in self.allowed_values
+    
+    def is_valid(self, value: Any) -> bool:
         """
-        Inicializa el validador con las reglas de configuración.
-        
-        Args:
-            config_path: Ruta al archivo YAML de configuración. 
-                        Si es None, busca en configs/validation_rules.yaml
+        Igual que DataValidator.validate_field, sin construir el mensaje de error.
         """
-        if config_path is None:
-            # Buscar en diferentes ubicaciones posibles
-            possible_paths = [
-                'configs/validation_rules.yaml',
-                './configs/validation_rules.yaml',
-                os.path.join(os.path.dirname(__file__), '..', 'configs', 'validation_rules.yaml')
-            ]
-            
-            config_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    config_path = path
-                    break
-            
-            if config_path is None:
-                raise FileNotFoundError(
-                    f"No se encontró el archivo de configuración. "
-                    f"Buscado en: {possible_paths}"
-                )
-        
-        self.config = self._load_config(config_path)
-        self.required_fields = self.config.get('fields', {}).get('required_fields', [])
+        if self.has_type and not self.check_type(value):
+            return False
+        if self.has_regex and value is not None and not self.match(value):
+            return False
+        if self.check_length:
+            if value is None:
+                return False
+            length = len(str(value))
+            if self.max_length is not None and length > self.max_length:
+                return False
+            if self.min_length is not None and length < self.min_length:
+                return False
+        if self.check_range:
+            if value is None:
+                return False
+            try:
+                num_value = float(value)
+            except (ValueError, TypeError):
+                return False
+            if self.min_value is not None and num_value < self.min_value:
+                return False
+            if self.max_value is not None and num_value > self.max_value:
+                return False
+        if self.has_allowed and not self.allows(value):
+            return False
+        return True
+
+
+class RulePlan:
+    """
+    Plan de validación compilado a partir de un archivo de reglas.
+    """
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config or {}
         self.field_rules = self.config.get('fields', {})
+        self.required_fields = self.field_rules.get('required_fields', [])
+        self.fields = {
+            field_name: FieldRule(rules)
+            for field_name, rules in self.field_rules.items()
+            if isinstance(rules, dict)
+        }
+
+
+# Planes compilados {ruta absoluta: (mtime_ns, RulePlan)} y ruta encontrada por defecto
+_rule_plans = {}
+_rule_plans_lock = threading.Lock()
+_default_config_path = None
+
+
+def find_config_path() -> str:
+    """
+    Busca configs/validation_rules.yaml en las ubicaciones posibles.
+    """
+    global _default_config_path
     
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """
-        Carga la configuración desde un archivo YAML.
+    if _default_config_path is not None and os.path.exists(_default_config_path):
+        return _default_config_path
+    
+    possible_paths = [
+        'configs/validation_rules.yaml',
+        './configs/validation_rules.yaml',
+        os.path.join(os.path.dirname(__file__), '..', 'configs', 'validation_rules.yaml')
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            _default_config_path = path
+            return path
+    
+    raise FileNotFoundError(
+        f"No se encontró el archivo de configuración. "
+        f"Buscado en: {possible_paths}"
+    )
+
+
+def load_rule_plan(config_path: str) -> RulePlan:
+    """
+    Devuelve el plan compilado de un archivo de reglas. Solo se lee y compila
+    el YAML si el archivo cambió (mtime) desde la última carga.
+    
+    Args:
+        config_path: Ruta al archivo YAML
+        
+    Returns:
+        RulePlan compilado
+    """
+    key = os.path.abspath(config_path)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except OSError as e:
+        raise ValidationError(f"Error cargando configuración desde {config_path}: {e}")
+    
+    with _rule_plans_lock:
+        cached = _rule_plans.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         
-        Args:
-            config_path: Ruta al archivo YAML
-            
-        Returns:
-            Dict con la configuración cargada
-        """
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
-            return config
         except Exception as e:
             raise ValidationError(f"Error cargando configuración desde {config_path}: {e}")
-    
-    def _validate_type(self, value: Any, expected_type: str) -> bool:
-        """
-        Valida el tipo de dato de un valor.
-        
-        Args:
-            value: Valor a validar
-            expected_type: Tipo esperado (str, int, bool, etc.)
-            
-        Returns:
-            True si el tipo es correcto, False en caso contrario
-        """
-        if value is None:
-            return False
-        
-        type_mapping = {
-            'str': str,
-            'int': int,
-            'bool': bool,
-            'float': float
-        }
         
-        expected_python_type = type_mapping.get(expected_type)
-        if expected_python_type is None:
-            return True  # Tipo no reconocido, no validar
-        
-        return isinstance(value, expected_python_type)
+        plan = RulePlan(config)
+        _rule_plans[key] = (mtime, plan)
+        return plan
+
+
+class DataValidator:
+    """
+    Validador de datos basado en reglas configurables.
+    """
+    
+    TYPE_MAPPING = TYPE_MAPPING
+    
+    # Filas que se miran para decidir si una columna tiene pocos valores distintos
+    FACTORIZE_SAMPLE_SIZE = 1000
     
-    def _validate_regex(self, value: Any, pattern: str) -> bool:
+    def __init__(self, config_path: Optional[str] = None):
         """
-        Valida un valor contra una expresión regular.
+        Inicializa el validador con las reglas de configuración.
         
         Args:
-            value: Valor a validar
-            pattern: Patrón regex
-            
-        Returns:
-            True si coincide, False en caso contrario
+            config_path: Ruta al archivo YAML de configuración. 
+                        Si es None, busca en configs/validation_rules.yaml
         """
-        if value is None:
-            return False
+        if config_path is None:
+            config_path = find_config_path()
         
-        try:
-            return bool(re.match(pattern, str(value)))
-        except Exception:
-            return False
+        self.config_path = config_path
+        self.plan = load_rule_plan(config_path)
+        self.config = self.plan.config
+        self.required_fields = self.plan.required_fields
+        self.field_rules = self.plan.field_rules
     
     def _validate_length(self, value: Any, max_length: Optional[int] = None, 
                         min_length: Optional[int] = None) -> bool:
@@ -173,23 +287,6 @@ class DataValidator:
         except (ValueError, TypeError):
             return False
     
-    def _validate_allowed_values(self, value: Any, allowed_values: List[Any]) -> bool:
-        """
-        Valida que un valor esté en una lista de valores permitidos.
-        
-        Args:
-            value: Valor a validar
-            allowed_values: Lista de valores permitidos
-            
-        Returns:
-            True si está en la lista, False en caso contrario
-        """
-        if value is None:
-            # None puede estar permitido explícitamente
-            return None in allowed_values
-        
-        return value in allowed_values
-    
     def validate_field(self, field_name: str, value: Any) -> Tuple[bool, Optional[str]]:
         """
         Valida un campo individual según sus reglas.
@@ -202,43 +299,37 @@ class DataValidator:
             Tuple (es_válido, mensaje_error)
         """
         # Si el campo no tiene reglas definidas, se acepta
-        if field_name not in self.field_rules:
+        rule = self.plan.fields.get(field_name)
+        if rule is None:
             return True, None
         
-        rules = self.field_rules[field_name]
+        rules = rule.rules
         
         # Validar tipo
-        if 'type' in rules:
-            if not self._validate_type(value, rules['type']):
-                return False, f"Tipo incorrecto. Esperado: {rules['type']}, obtenido: {type(value).__name__}"
+        if rule.has_type and not rule.check_type(value):
+            return False, f"Tipo incorrecto. Esperado: {rules['type']}, obtenido: {type(value).__name__}"
         
         # Validar regex
-        if 'regex' in rules and value is not None:
-            if not self._validate_regex(value, rules['regex']):
-                return False, f"No cumple con el patrón regex: {rules.get('description', '')}"
+        if rule.has_regex and value is not None and not rule.match(value):
+            return False, f"No cumple con el patrón regex: {rules.get('description', '')}"
         
         # Validar longitud
-        if 'max_length' in rules or 'min_length' in rules:
-            if not self._validate_length(value, 
-                                        max_length=rules.get('max_length'),
-                                        min_length=rules.get('min_length')):
+        if rule.check_length:
+            if not self._validate_length(value, max_length=rule.max_length, min_length=rule.min_length):
                 max_len = rules.get('max_length', 'N/A')
                 min_len = rules.get('min_length', 'N/A')
                 return False, f"Longitud fuera de rango. Min: {min_len}, Max: {max_len}"
         
         # Validar rango (para números)
-        if 'min_value' in rules or 'max_value' in rules:
-            if not self._validate_range(value,
-                                       min_value=rules.get('min_value'),
-                                       max_value=rules.get('max_value')):
+        if rule.check_range:
+            if not self._validate_range(value, min_value=rule.min_value, max_value=rule.max_value):
                 min_val = rules.get('min_value', 'N/A')
                 max_val = rules.get('max_value', 'N/A')
                 return False, f"Valor fuera de rango. Min: {min_val}, Max: {max_val}"
         
         # Validar valores permitidos
-        if 'allowed_values' in rules:
-            if not self._validate_allowed_values(value, rules['allowed_values']):
-                return False, f"Valor no permitido. Permitidos: {rules['allowed_values']}"
+        if rule.has_allowed and not rule.allows(value):
+            return False, f"Valor no permitido. Permitidos: {rules['allowed_values']}"
         
         return True, None
     
@@ -293,10 +384,205 @@ class DataValidator:
         
         return True, validated_record, errors
     
+    def iter_validate(self, records: Iterable[Dict[str, Any]], stats: Optional[Dict[str, Any]] = None,
+                      verbose: bool = False, sample_errors: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Valida registros en streaming, sin pandas: los registros válidos se
+        entregan a medida que se consumen el iterable, con las mismas reglas
+        que validate_record.
+        
+        Un registro válido se entrega tal cual (solo se copia si algún campo
+        queda en NULL). Los errores se cuentan en stats sin construir mensajes;
+        los mensajes solo se formatean con verbose o sample_errors > 0.
+        
+        Args:
+            records: Iterable de registros (dicts)
+            stats: Dict de estadísticas a actualizar, con el formato de
+                   validate_dataframe (si es None se crea uno nuevo)
+            verbose: Si mostrar mensajes detallados
+            sample_errors: Cantidad de mensajes de error a conservar en
+                   stats['error_samples'] (0 = ninguno)
+            
+        Yields:
+            Registros válidos con los campos inválidos en None
+        """
+        if stats is None:
+            stats = {}
+        for key in ('total_records', 'valid_records', 'discarded_records'):
+            stats.setdefault(key, 0)
+        field_errors = stats.setdefault('field_errors', {})
+        samples = stats.setdefault('error_samples', []) if sample_errors > 0 else None
+        
+        fields = self.plan.fields
+        required = [(field_name, fields[field_name]) for field_name in self.required_fields
+                    if field_name in fields]
+        
+        def _describe(field_name, value, suffix=''):
+            # Solo se llama con verbose o muestreo activo
+            message = f"{field_name}: {self.validate_field(field_name, value)[1]}{suffix}"
+            if samples is not None and len(samples) < sample_errors:
+                samples.append(message)
+            if verbose:
+                print(f"Campo '{field_name}' inválido: {message}")
+        
+        for record in records:
+            stats['total_records'] += 1
+            
+            # Campos obligatorios: si alguno falla se descarta el registro
+            discarded = False
+            for field_name, rule in required:
+                if not rule.is_valid(record.get(field_name)):
+                    discarded = True
+                    break
+            if discarded:
+                stats['discarded_records'] += 1
+                for field_name, rule in required:
+                    value = record.get(field_name)
+                    if not rule.is_valid(value):
+                        field_errors[field_name] = field_errors.get(field_name, 0) + 1
+                        if verbose or samples is not None:
+                            _describe(field_name, value)
+                field_errors['Registro descartado'] = field_errors.get('Registro descartado', 0) + 1
+                continue
+            
+            # Resto de campos: los inválidos quedan en NULL
+            validated = record
+            for field_name, value in record.items():
+                rule = fields.get(field_name)
+                if rule is not None and not rule.is_valid(value):
+                    if validated is record:
+                        validated = dict(record)
+                    validated[field_name] = None
+                    if verbose or samples is not None:
+                        _describe(field_name, value, ' (establecido a NULL)')
+            
+            stats['valid_records'] += 1
+            yield validated
+    
+    def _column_mask(self, values: np.ndarray, rule: FieldRule,
+                     missing: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Evalúa las reglas de un campo sobre una columna completa.
+        
+        Equivale a validate_field aplicado a cada valor, pero cada regla se
+        calcula como una máscara booleana sobre toda la columna.
+        
+        Args:
+            values: Valores de la columna (array de objetos)
+            rule: Reglas compiladas del campo
+            missing: Para columnas de texto (no object): máscara de valores
+                     faltantes (NaN); el resto son str y ninguno es None
+            
+        Returns:
+            Array booleano (True = valor válido)
+        """
+        n = len(values)
+        valid = np.ones(n, dtype=bool)
+        
+        if missing is None:
+            is_none = np.fromiter(map(operator.is_, values, repeat(None)), dtype=bool, count=n)
+        else:
+            is_none = np.zeros(n, dtype=bool)
+        
+        if rule.has_type:
+            valid &= ~is_none
+            if rule.python_type is None:
+                pass
+            elif missing is not None:
+                valid &= ~missing if issubclass(str, rule.python_type) else False
+            else:
+                valid &= np.fromiter(map(isinstance, values, repeat(rule.python_type)),
+                                     dtype=bool, count=n)
+        
+        str_values = None
+        if rule.has_regex or rule.check_length:
+            if missing is not None:
+                str_values = values
+                if missing.any():
+                    str_values = values.copy()
+                    str_values[missing] = [str(value) for value in values[missing]]
+            elif all(map(isinstance, values, repeat(str))):
+                str_values = values
+            else:
+                str_values = list(map(str, values))
+        
+        if rule.has_regex:
+            if rule.pattern is None:
+                matches = np.zeros(n, dtype=bool)
+            else:
+                matches = np.fromiter(map(bool, map(rule.pattern.match, str_values)), dtype=bool, count=n)
+            valid &= matches | is_none
+        
+        if rule.check_length:
+            lengths = np.fromiter(map(len, str_values), dtype=np.int64, count=n)
+            valid &= ~is_none
+            if rule.max_length is not None:
+                valid &= lengths <= rule.max_length
+            if rule.min_length is not None:
+                valid &= lengths >= rule.min_length
+        
+        if rule.check_range:
+            try:
+                numbers = np.asarray(values, dtype=float)
+                convertible = np.ones(n, dtype=bool)
+            except (ValueError, TypeError):
+                convertible = np.fromiter(map(self._is_number, values), dtype=bool, count=n)
+                numbers = np.array([float(value) if ok else np.nan
+                                    for value, ok in zip(values, convertible)], dtype=float)
+            valid &= ~is_none & convertible
+            # Igual que _validate_range, NaN no queda fuera de rango
+            with np.errstate(invalid='ignore'):
+                if rule.min_value is not None:
+                    valid &= ~(numbers < rule.min_value)
+                if rule.max_value is not None:
+                    valid &= ~(numbers > rule.max_value)
+        
+        if rule.has_allowed:
+            valid &= np.fromiter(map(rule.allows, values), dtype=bool, count=n)
+        
+        return valid
+    
+    @staticmethod
+    def _is_number(value: Any) -> bool:
+        try:
+            float(value)
+            return True
+        except (ValueError, TypeError):
+            return False
+    
+    def _series_mask(self, series: pd.Series, rule: FieldRule) -> np.ndarray:
+        """
+        Máscara de validez de una columna. Salvo en columnas object (donde
+        None y NaN se distinguen), las reglas se evalúan una vez por valor
+        distinto y el resultado se expande con los códigos de cada fila.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            # Columnas de valores casi únicos (títulos, enlaces): factorizar no compensa
+            sample = series.iloc[:self.FACTORIZE_SAMPLE_SIZE]
+            if series.dtype == object or sample.nunique(dropna=False) > len(sample) // 2:
+                values = series.to_numpy(dtype=object)
+                missing = None
+                if isinstance(series.dtype, pd.StringDtype):
+                    missing = ~np.fromiter(map(isinstance, values, repeat(str)), dtype=bool, count=len(values))
+                return self._column_mask(values, rule, missing)
+            codes, uniques = pd.factorize(series)
+        # Valores distintos + el faltante (código -1, NaN como en iterrows)
+        values = np.empty(len(uniques) + 1, dtype=object)
+        values[:-1] = np.asarray(uniques, dtype=object)
+        values[-1] = np.nan
+        return self._column_mask(values, rule)[codes]
+    
     def validate_dataframe(self, df: pd.DataFrame, verbose: bool = False) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Valida un DataFrame completo.
         
+        Cada regla se evalúa como una máscara sobre la columna entera (ver
+        _column_mask); el resultado es el mismo que validar fila a fila con
+        validate_record.
+        
         Args:
             df: DataFrame con los datos a validar
             verbose: Si mostrar mensajes detallados
@@ -314,31 +600,61 @@ class DataValidator:
                 'field_errors': {}
             }
         
-        validated_records = []
-        discarded_count = 0
-        field_errors = {}
+        n = len(df)
+        masks = {}
         
-        for idx, row in df.iterrows():
-            record = row.to_dict()
-            is_valid, validated_record, errors = self.validate_record(record, verbose=verbose)
-            
-            if is_valid:
-                validated_records.append(validated_record)
+        # Campos obligatorios: un campo ausente del DataFrame vale None
+        keep = np.ones(n, dtype=bool)
+        required_invalid = []
+        for field_name in self.required_fields:
+            rule = self.plan.fields.get(field_name)
+            if rule is None:
+                continue
+            if field_name in df.columns:
+                mask = masks[field_name] = self._series_mask(df[field_name], rule)
             else:
-                discarded_count += 1
-                if verbose:
-                    print(f"Registro {idx} descartado: {errors}")
-                
-                # Contar errores por campo
-                for error in errors:
-                    field_name = error.split(':')[0] if ':' in error else 'unknown'
-                    field_errors[field_name] = field_errors.get(field_name, 0) + 1
+                mask = self._column_mask(np.full(n, None, dtype=object), rule)
+            required_invalid.append((field_name, ~mask))
+            keep &= mask
         
-        validated_df = pd.DataFrame(validated_records)
+        discarded_count = int(n - keep.sum())
+        field_errors = {}
+        if discarded_count:
+            # Mismo conteo (y orden de aparición) que el recorrido fila a fila
+            first_seen = []
+            for position, (field_name, invalid) in enumerate(required_invalid):
+                count = int(invalid.sum())
+                if count:
+                    first_seen.append((int(invalid.argmax()), position, field_name, count))
+            first_discarded = int((~keep).argmax())
+            first_seen.append((first_discarded, len(required_invalid), 'Registro descartado', discarded_count))
+            for _, _, field_name, count in sorted(first_seen):
+                field_errors[field_name] = count
+            if verbose:
+                print(f"Registros descartados por campos obligatorios inválidos: {discarded_count}")
+        
+        if not keep.any():
+            validated_df = pd.DataFrame()
+        else:
+            validated_df = df[keep] if discarded_count else df
+            columns = {}
+            for field_name in validated_df.columns:
+                rule = self.plan.fields.get(field_name)
+                column = validated_df[field_name]
+                if rule is not None:
+                    mask = masks[field_name][keep] if field_name in masks else self._series_mask(column, rule)
+                    if not mask.all():
+                        # Campo no cumple: ponerlo a None
+                        column = column.where(mask, None)
+                        if verbose:
+                            print(f"Campo '{field_name}' inválido en {int((~mask).sum())} registros, "
+                                  f"establecido a NULL")
+                columns[field_name] = column.reset_index(drop=True)
+            validated_df = pd.DataFrame(columns, copy=False)
         
         stats = {
-            'total_records': len(df),
-            'valid_records': len(validated_records),
+            'total_records': n,
+            'valid_records': n - discarded_count,
             'discarded_records': discarded_count,
             'field_errors': field_errors
         }
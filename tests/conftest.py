@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Permite importar src/ al ejecutar pytest desde cualquier directorio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,81 @@
+"""
+Paridad del motor de clasificación (src/classification.py) con get_rtype_id de
+la versión original: primera palabra clave del dict (en orden) contenida en el
+título en minúsculas, o DEFAULT_RTYPE_ID.
+"""
+import random
+
+import pytest
+
+from src.classification import ClassificationEngine
+
+# Palabras clave y rtype_id por defecto de la versión original
+CLASSIFICATION_KEYWORDS = {
+    'resolución': 15,
+    'resolucion': 15,
+    'decreto': 14,
+}
+DEFAULT_RTYPE_ID = 14
+
+TITLES = [
+    'Resolución 123 de 2024',
+    'RESOLUCIÓN 20243030001 DEL 2 DE ENERO',
+    'Resolucion sin tilde',
+    'Decreto 1079 de 2015',
+    'decreto que modifica la resolución 45',
+    'Resolución que reglamenta el decreto 2',
+    'Circular externa 7',
+    'Acuerdo de la junta',
+    '',
+    'decretoresolucion pegados',
+    'Resolu ción partida',
+]
+
+
+def _original_rtype_id(title, keywords=CLASSIFICATION_KEYWORDS, default=DEFAULT_RTYPE_ID):
+    # get_rtype_id de la versión original
+    title_lower = title.lower()
+    for keyword, rtype_id in keywords.items():
+        if keyword in title_lower:
+            return rtype_id
+    return default
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return ClassificationEngine.from_keywords(CLASSIFICATION_KEYWORDS, DEFAULT_RTYPE_ID)
+
+
+def test_classify_matches_original(engine):
+    assert [engine.classify(title) for title in TITLES] == [_original_rtype_id(title) for title in TITLES]
+
+
+def test_classify_batch_matches_original(engine):
+    assert engine.classify_batch(TITLES) == [_original_rtype_id(title) for title in TITLES]
+
+
+def test_yaml_rules_match_original():
+    engine = ClassificationEngine.from_yaml()
+
+    assert engine.classify_batch(TITLES) == [_original_rtype_id(title) for title in TITLES]
+
+
+def test_missing_titles_use_default(engine):
+    assert engine.classify(None) == DEFAULT_RTYPE_ID
+    assert engine.classify_batch([None, 'Resolución 1', float('nan')]) == [
+        DEFAULT_RTYPE_ID, 15, DEFAULT_RTYPE_ID]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_overlapping_keywords_match_original(seed):
+    # Palabras que se solapan o se contienen entre sí, en cualquier orden
+    rng = random.Random(seed)
+    words = {''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(6)}
+    keywords = {word: rtype_id for rtype_id, word in enumerate(sorted(words, key=lambda _: rng.random()), 1)}
+    titles = [''.join(rng.choice('abc ') for _ in range(rng.randint(0, 12))) for _ in range(200)]
+    engine = ClassificationEngine.from_keywords(keywords, 0)
+
+    expected = [_original_rtype_id(title, keywords, 0) for title in titles]
+
+    assert [engine.classify(title) for title in titles] == expected
+    assert engine.classify_batch(titles) == expected
@@ -0,0 +1,87 @@
+"""
+Paridad entre content_hashes (src/persistence.py) y la columna generada
+content_hash de sql/create_regulations_table.sql.
+
+La expresión SQL se toma del script y se evalúa con la semántica de Postgres
+(|| con NULL da NULL, COALESCE, md5, substr y ::bit(64)::bigint), así que un
+campo sin COALESCE en el SQL produce un hash NULL y la prueba falla.
+"""
+import hashlib
+import os
+import re
+
+import pandas as pd
+import pytest
+
+from src.persistence import content_hashes
+
+SQL_PATH = os.path.join(os.path.dirname(__file__), '..', 'sql', 'create_regulations_table.sql')
+
+ENTITY = 'Agencia Nacional de Infraestructura'
+RECORDS = [
+    {'entity': ENTITY, 'title': 'Resolución 123 de 2024', 'created_at': '2024-05-10',
+     'external_link': 'https://www.ani.gov.co/resolucion-123'},
+    {'entity': ENTITY, 'title': 'Decreto ñandú – tildes', 'created_at': '2023-01-02',
+     'external_link': None},
+    {'entity': ENTITY, 'title': None, 'created_at': '2024-05-10',
+     'external_link': 'https://www.ani.gov.co/sin-titulo'},
+    {'entity': ENTITY, 'title': 'Circular 7', 'created_at': None,
+     'external_link': 'https://www.ani.gov.co/circular-7'},
+    {'entity': None, 'title': None, 'created_at': None, 'external_link': None},
+]
+
+
+def _md5_terms():
+    # Términos concatenados dentro de md5(...) de la columna generada
+    with open(SQL_PATH, encoding='utf-8') as f:
+        sql = f.read()
+    generated = re.search(r'content_hash BIGINT\s+GENERATED ALWAYS AS \((.*?)\) STORED', sql, re.S)
+    assert generated, 'No se encontró la columna generada content_hash'
+    expression = ' '.join(generated.group(1).split())
+    md5_args = re.search(r"md5\((.*)\), 1, 16\)", expression).group(1)
+    return [term.strip() for term in md5_args.split('||')]
+
+
+def _sql_term(term, record):
+    literal = re.fullmatch(r"'(.*)'", term)
+    if literal:
+        return literal.group(1)
+    coalesce = re.fullmatch(r"COALESCE\((\w+), '(.*)'\)", term)
+    if coalesce:
+        value = record[coalesce.group(1)]
+        return coalesce.group(2) if value is None else value
+    assert re.fullmatch(r'\w+', term), f'Término no soportado: {term}'
+    return record[term]
+
+
+def _sql_content_hash(record):
+    """
+    Evalúa la columna generada para un registro; None si el resultado es NULL.
+    """
+    parts = [_sql_term(term, record) for term in _md5_terms()]
+    if any(part is None for part in parts):
+        return None
+    digest = hashlib.md5(''.join(parts).encode('utf-8')).hexdigest()
+    # ('x' || substr(md5, 1, 16))::bit(64)::bigint: 64 bits con signo
+    return int.from_bytes(bytes.fromhex(digest[:16]), 'big', signed=True)
+
+
+def test_sql_hashes_every_key_field():
+    fields = [term for term in _md5_terms() if not term.startswith("'")]
+    assert fields == [f"COALESCE({field}, '')"
+                      for field in ('entity', 'title', 'created_at', 'external_link')]
+
+
+@pytest.mark.parametrize('record', RECORDS)
+def test_client_hash_matches_generated_column(record):
+    client_hash = content_hashes(pd.DataFrame([record])).view('int64')[0]
+
+    assert _sql_content_hash(record) == client_hash
+
+
+def test_batch_matches_single_records():
+    batch = content_hashes(pd.DataFrame(RECORDS))
+
+    assert [int(value) for value in batch] == [
+        int(content_hashes(pd.DataFrame([record]))[0]) for record in RECORDS
+    ]
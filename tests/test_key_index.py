@@ -0,0 +1,104 @@
+"""
+Índice local de claves (src/key_index.py): sincronización incremental por
+páginas contra una BD simulada y búsqueda de content_hash.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.key_index import KeyIndex
+from src.persistence import content_hashes
+
+ENTITY = 'Agencia Nacional de Infraestructura'
+
+
+class FakeDatabase:
+    """
+    Simula DatabaseManager.execute_query para la consulta de KeyIndex.sync
+    sobre filas (id, entity, content_hash).
+    """
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.queries = []
+
+    def execute_query(self, query, params):
+        entity, last_id, limit = params
+        self.queries.append(params)
+        matching = [(row_id, content_hash) for row_id, row_entity, content_hash in sorted(self.rows)
+                    if row_entity == entity and row_id > last_id and content_hash is not None]
+        return matching[:limit]
+
+
+def _records(count, start=0):
+    return pd.DataFrame([{
+        'entity': ENTITY,
+        'title': f'Resolución {number}',
+        'created_at': '2024-05-10',
+        'external_link': f'https://www.ani.gov.co/resolucion-{number}',
+    } for number in range(start, start + count)])
+
+
+def _db_rows(hashes, first_id=1, entity=ENTITY):
+    # content_hash es BIGINT: la BD devuelve enteros con signo
+    return [(first_id + i, entity, int(value)) for i, value in enumerate(hashes.view(np.int64))]
+
+
+@pytest.fixture
+def hashes():
+    return content_hashes(_records(7))
+
+
+def test_empty_index_contains_nothing(tmp_path, hashes):
+    index = KeyIndex(ENTITY, str(tmp_path))
+
+    assert len(index) == 0
+    assert not index.contains(hashes).any()
+
+
+def test_sync_pages_and_contains(tmp_path, hashes):
+    rows = _db_rows(hashes[:5]) + [(6, 'Otra entidad', 123), (7, ENTITY, None)]
+    db = FakeDatabase(rows)
+    index = KeyIndex(ENTITY, str(tmp_path))
+
+    assert index.sync(db, page_size=2) == 5
+    assert index.last_id == 5
+    # Tres páginas: 2 + 2 + 1 filas
+    assert [params[1] for params in db.queries] == [0, 2, 4]
+    assert index.contains(hashes).tolist() == [True] * 5 + [False] * 2
+
+
+def test_sync_reads_only_new_rows(tmp_path, hashes):
+    db = FakeDatabase(_db_rows(hashes[:3]))
+    index = KeyIndex(ENTITY, str(tmp_path))
+    index.sync(db)
+
+    db.rows += _db_rows(hashes[3:], first_id=10)
+    db.queries.clear()
+
+    assert index.sync(db) == 4
+    assert db.queries[0][1] == 3
+    assert index.last_id == 13
+    assert index.contains(hashes).all()
+    assert index.sync(db) == 0
+
+
+def test_contains_mixed_hashes(tmp_path, hashes):
+    index = KeyIndex(ENTITY, str(tmp_path))
+    index.sync(FakeDatabase(_db_rows(hashes[::2])))
+
+    probe = np.concatenate([hashes[::-1], np.array([0, np.iinfo(np.uint64).max], dtype=np.uint64)])
+
+    assert index.contains(probe).tolist() == [i % 2 == 0 for i in reversed(range(7))] + [False, False]
+
+
+def test_save_and_reload(tmp_path, hashes):
+    index = KeyIndex(ENTITY, str(tmp_path))
+    index.sync(FakeDatabase(_db_rows(hashes)))
+    index.save()
+
+    reloaded = KeyIndex(ENTITY, str(tmp_path))
+
+    assert reloaded.last_id == index.last_id
+    assert reloaded.contains(hashes).all()
+    assert len(KeyIndex('Otra entidad', str(tmp_path))) == 0
@@ -0,0 +1,99 @@
+"""
+Huellas de filas (row_fingerprint en src/extraction.py) y almacenes JSON
+(src/json_store.py, RowFingerprintStore, HttpValidatorStore).
+"""
+import json
+import os
+
+import pytest
+
+from src.extraction import PARSER_BACKENDS, get_parser_backend, parse_page_changes, row_fingerprint
+from src.http_cache import HttpValidatorStore
+from src.row_fingerprints import RowFingerprintStore
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'ani_normatividad_page.html')
+
+# HTML mal formado que cada backend repara distinto (<p> sin cerrar, <br>,
+# entidades, comillas simples, mayúsculas)
+MALFORMED_PAGE = b"""<html><body><table><tbody>
+<tr class='odd'><TD class="views-field views-field-title"><a href='/r1?a=1&amp;b=2'>Resoluci&oacute;n &quot;1&quot;<br>x</a></TD>
+<td class="views-field views-field-body"><p>Resumen&nbsp;uno<p>dos<img src="x.png"></td>
+<td class="views-field views-field-field-fecha--1"><span class="date-display-single" content="2024-05-10T00:00:00-05:00">10/05/2024</span></td></tr>
+</tbody></table></body></html>"""
+
+
+@pytest.fixture(scope='module')
+def page_content():
+    with open(FIXTURE_PATH, 'rb') as f:
+        return f.read()
+
+
+def _fingerprints(content, backend):
+    return [row_fingerprint(row) for row in get_parser_backend(backend)(content).find_all('tr')]
+
+
+@pytest.mark.parametrize('malformed', [False, True])
+def test_fingerprints_match_across_backends(page_content, malformed):
+    content = MALFORMED_PAGE if malformed else page_content
+    expected = _fingerprints(content, 'html.parser')
+
+    for backend in PARSER_BACKENDS:
+        assert _fingerprints(content, backend) == expected
+
+
+def test_fingerprint_key_is_row_link():
+    (key, fingerprint), = _fingerprints(MALFORMED_PAGE, 'table')
+
+    assert key == '/r1?a=1&b=2'
+    assert fingerprint != key
+
+
+def test_edited_row_changes_fingerprint():
+    edited_page = MALFORMED_PAGE.replace(b'Resumen&nbsp;uno', b'Resumen editado')
+
+    assert _fingerprints(edited_page, 'table')[0][0] == _fingerprints(MALFORMED_PAGE, 'table')[0][0]
+    assert _fingerprints(edited_page, 'table')[0][1] != _fingerprints(MALFORMED_PAGE, 'table')[0][1]
+
+
+def test_parse_page_changes_skips_known_and_reports_edited(page_content):
+    known = dict(_fingerprints(page_content, 'table'))
+    edited_key = next(key for key in known if key.startswith('/'))
+    known[edited_key] = known[edited_key][:-1] + '0'
+    legacy_key = next(key for key in known if key.startswith('/') and key != edited_key)
+    known[legacy_key] = 'a' * 32  # huella del formato anterior
+
+    status, page_data, changes = parse_page_changes(page_content, 0, known, parser_backend='lxml')
+
+    assert [record['external_link'] for record in changes['edited']] == [
+        'https://www.ani.gov.co' + edited_key]
+    # Una huella de otro formato no es una edición: la fila vuelve como nueva
+    assert [record['external_link'] for record in page_data] == ['https://www.ani.gov.co' + legacy_key]
+    assert changes['skipped'] == len(known) - 2
+
+
+def test_row_store_saves_pending_atomically(tmp_path):
+    path = str(tmp_path / 'state' / 'rows.json')
+    store = RowFingerprintStore(path)
+    store.apply({'skipped': 1, 'new': 1, 'fingerprints': {'/a': 'c1:1'}, 'edited': []})
+    store.merge({'/b': 'c1:2'})
+
+    assert RowFingerprintStore(path).known == {}
+    assert store.save() == 2
+    assert store.save() == 0
+    assert RowFingerprintStore(path).known == {'/a': 'c1:1', '/b': 'c1:2'}
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_stores_treat_corrupt_file_as_empty(tmp_path):
+    path = tmp_path / 'validators.json'
+    path.write_text('{no es json', encoding='utf-8')
+
+    store = HttpValidatorStore(str(path))
+    assert store.conditional_headers('https://www.ani.gov.co') == {}
+
+    store.stage('https://www.ani.gov.co', {'ETag': '"v1"'})
+    store.save()
+    assert json.loads(path.read_text(encoding='utf-8')) == {
+        'https://www.ani.gov.co': {'etag': '"v1"', 'last_modified': None}}
+    assert HttpValidatorStore(str(path)).conditional_headers('https://www.ani.gov.co') == {
+        'If-None-Match': '"v1"'}
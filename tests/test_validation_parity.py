@@ -0,0 +1,220 @@
+"""
+Paridad de la validación por columnas (DataValidator.validate_dataframe) y en
+streaming (DataValidator.iter_validate) con la validación fila a fila de la
+versión original, usando configs/validation_rules.yaml.
+
+Los registros cubren cada regla del YAML: tipo, regex, longitud, rango,
+valores permitidos, campos obligatorios ausentes o inválidos y valores NaN/None.
+"""
+import math
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.validation import DataValidator, find_config_path
+
+ENTITY = 'Agencia Nacional de Infraestructura'
+
+
+def _record(**overrides):
+    record = {
+        'title': 'Resolución 123 de 2024',
+        'created_at': '2024-05-10',
+        'update_at': '2024-05-11 10:00:00',
+        'is_active': True,
+        'entity': ENTITY,
+        'external_link': 'https://www.ani.gov.co/resolucion-123',
+        'gtype': 'link',
+        'rtype_id': 15,
+        'summary': 'Por la cual se adopta una medida',
+        'classification_id': 13,
+    }
+    record.update(overrides)
+    return record
+
+
+RECORDS = [
+    _record(),
+    _record(title='T' * 66),
+    _record(title='Resolución "123"'),
+    _record(title=None),
+    _record(created_at='10/05/2024'),
+    _record(created_at='2024-05-10 08:30:00'),
+    _record(entity='ANI 2024'),
+    _record(external_link='ftp://www.ani.gov.co/x'),
+    _record(external_link=None, title=None),
+    _record(update_at='2024-05-11'),
+    _record(is_active='true'),
+    _record(gtype='pdf'),
+    _record(gtype=None),
+    _record(rtype_id=0),
+    _record(rtype_id=101),
+    _record(rtype_id=None),
+    _record(summary='S' * 1001),
+    _record(summary='Dice "hola"'),
+    _record(summary=None),
+    _record(classification_id=250),
+    _record(update_at=None, summary='', gtype='link'),
+]
+
+
+def _original_validate_field(rules, value):
+    # validate_field de la versión original: True si el valor cumple
+    type_mapping = {'str': str, 'int': int, 'bool': bool, 'float': float}
+    if 'type' in rules:
+        if value is None:
+            return False
+        expected = type_mapping.get(rules['type'])
+        if expected is not None and not isinstance(value, expected):
+            return False
+    if 'regex' in rules and value is not None:
+        try:
+            if not re.match(rules['regex'], str(value)):
+                return False
+        except Exception:
+            return False
+    if 'max_length' in rules or 'min_length' in rules:
+        if value is None:
+            return False
+        length = len(str(value))
+        if rules.get('max_length') is not None and length > rules['max_length']:
+            return False
+        if rules.get('min_length') is not None and length < rules['min_length']:
+            return False
+    if 'min_value' in rules or 'max_value' in rules:
+        if value is None:
+            return False
+        try:
+            number = float(value)
+        except (ValueError, TypeError):
+            return False
+        if rules.get('min_value') is not None and number < rules['min_value']:
+            return False
+        if rules.get('max_value') is not None and number > rules['max_value']:
+            return False
+    if 'allowed_values' in rules:
+        return None in rules['allowed_values'] if value is None else value in rules['allowed_values']
+    return True
+
+
+def _original_validate_record(field_rules, required_fields, record):
+    # validate_record de la versión original: (registro o None, campos con error)
+    failed = [field_name for field_name in required_fields
+              if field_name in field_rules
+              and not _original_validate_field(field_rules[field_name], record.get(field_name))]
+    if failed:
+        return None, failed + ['Registro descartado']
+    validated = dict(record)
+    for field_name, value in record.items():
+        if field_name in field_rules and not _original_validate_field(field_rules[field_name], value):
+            validated[field_name] = None
+    return validated, []
+
+
+def _original_validate_dataframe(field_rules, required_fields, df):
+    # validate_dataframe de la versión original (iterrows + validate_record)
+    validated_records = []
+    field_errors = {}
+    for _, row in df.iterrows():
+        validated, errors = _original_validate_record(field_rules, required_fields, row.to_dict())
+        if validated is not None:
+            validated_records.append(validated)
+        for field_name in errors:
+            field_errors[field_name] = field_errors.get(field_name, 0) + 1
+    return pd.DataFrame(validated_records), {
+        'total_records': len(df),
+        'valid_records': len(validated_records),
+        'discarded_records': len(df) - len(validated_records),
+        'field_errors': field_errors,
+    }
+
+
+def _plain_records(df):
+    # NaN y None son el mismo NULL al escribir en la BD
+    return [{key: None if isinstance(value, float) and math.isnan(value) else value
+             for key, value in record.items()}
+            for record in df.to_dict('records')]
+
+
+@pytest.fixture(scope='module')
+def validator():
+    return DataValidator()
+
+
+@pytest.fixture(scope='module')
+def original_rules():
+    with open(find_config_path(), 'r', encoding='utf-8') as f:
+        fields = yaml.safe_load(f)['fields']
+    return fields, fields.get('required_fields', [])
+
+
+@pytest.mark.parametrize('records', [
+    RECORDS,
+    RECORDS[:1] * 3,
+    [record for record in RECORDS if record['title'] is None],
+    # Muchas filas: activa la factorización de columnas con pocos valores distintos
+    [RECORDS[i % len(RECORDS)] for i in range(2500)],
+], ids=['casos', 'todos-validos', 'todos-descartados', 'muchas-filas'])
+def test_validate_dataframe_matches_original(validator, original_rules, records):
+    df = pd.DataFrame(records)
+
+    validated_df, stats = validator.validate_dataframe(df)
+    expected_df, expected_stats = _original_validate_dataframe(*original_rules, df)
+
+    assert _plain_records(validated_df) == _plain_records(expected_df)
+    assert stats == expected_stats
+    # Mismo orden de aparición de los errores
+    assert list(stats['field_errors']) == list(expected_stats['field_errors'])
+
+
+def test_validate_dataframe_missing_required_column(validator, original_rules):
+    df = pd.DataFrame(RECORDS).drop(columns=['entity'])
+
+    validated_df, stats = validator.validate_dataframe(df)
+    expected_df, expected_stats = _original_validate_dataframe(*original_rules, df)
+
+    assert validated_df.empty and expected_df.empty
+    assert stats == expected_stats
+
+
+def test_validate_dataframe_numeric_columns(validator, original_rules):
+    # Enteros de numpy y NaN como los deja pandas en columnas numéricas
+    df = pd.DataFrame(RECORDS[:3])
+    df['rtype_id'] = np.array([15, 0, 200], dtype=np.int64)
+    df['classification_id'] = [13.0, np.nan, 13.0]
+
+    validated_df, stats = validator.validate_dataframe(df)
+    expected_df, expected_stats = _original_validate_dataframe(*original_rules, df)
+
+    assert _plain_records(validated_df) == _plain_records(expected_df)
+    assert stats == expected_stats
+
+
+def test_iter_validate_matches_original(validator, original_rules):
+    stats = {}
+    validated = list(validator.iter_validate(RECORDS, stats=stats))
+
+    expected = [_original_validate_record(*original_rules, record) for record in RECORDS]
+    expected_errors = {}
+    for _, errors in expected:
+        for field_name in errors:
+            expected_errors[field_name] = expected_errors.get(field_name, 0) + 1
+
+    assert validated == [record for record, _ in expected if record is not None]
+    assert stats == {
+        'total_records': len(RECORDS),
+        'valid_records': len(validated),
+        'discarded_records': len(RECORDS) - len(validated),
+        'field_errors': expected_errors,
+    }
+
+
+def test_iter_validate_does_not_modify_input(validator):
+    records = [dict(record) for record in RECORDS]
+
+    list(validator.iter_validate(records))
+
+    assert records == RECORDS